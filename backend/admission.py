@@ -0,0 +1,201 @@
+"""
+Admission control for NadavBot
+Bounds how many chat requests run at once. Excess requests wait in a bounded
+queue served round-robin across clients, and are turned away quickly with a
+Retry-After hint when the queue is full or they have waited too long, so a
+traffic spike serves some visitors promptly instead of timing out everyone.
+"""
+
+import asyncio
+import math
+import statistics
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+
+class AdmissionRejected(Exception):
+    """A request that was not admitted; maps to an HTTP error with Retry-After."""
+
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """
+    A held slot. release() may be called from every path that can end the
+    request; only the first call frees the slot.
+    """
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._start = time.monotonic()
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self._controller.release(time.monotonic() - self._start)
+
+
+class AdmissionController:
+    """
+    Concurrency limiter with a bounded, per-client fair wait queue.
+
+    Up to ``max_concurrent`` requests hold a slot at once. Others queue, at
+    most ``max_queue`` in total and ``max_queue_per_client`` per client; a
+    freed slot goes to the next client in round-robin order, so one client
+    sending a burst cannot starve the rest. Rejections:
+
+        503 queue_full          the whole queue is full
+        429 client_queue_full   this client already has its share queued
+        503 queue_timeout       waited ``queue_timeout_seconds`` without a slot
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        max_queue: int = 32,
+        max_queue_per_client: int = 4,
+        queue_timeout_seconds: float = 10.0,
+        wait_samples: int = 1000
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_queue_per_client = max_queue_per_client
+        self.queue_timeout_seconds = queue_timeout_seconds
+
+        self._active = 0
+        # client -> waiters in arrival order; dict order is the round-robin order
+        self._queues: "OrderedDict[str, Deque[Tuple[asyncio.Future, float]]]" = OrderedDict()
+        self._queued = 0
+        self._waits: Deque[float] = deque(maxlen=wait_samples)
+        # Moving average of how long a request holds its slot
+        self._service_seconds = 1.0
+
+        self.stats = {
+            "admitted": 0,
+            "admitted_immediately": 0,
+            "completed": 0,
+            "rejected": {"queue_full": 0, "client_queue_full": 0, "queue_timeout": 0}
+        }
+
+    @asynccontextmanager
+    async def slot(self, client: str) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block; raises AdmissionRejected."""
+        ticket = await self.admit(client)
+        try:
+            yield
+        finally:
+            ticket.release()
+
+    async def admit(self, client: str) -> AdmissionTicket:
+        """Acquire a slot and return the ticket that releases it; raises AdmissionRejected."""
+        await self.acquire(client)
+        return AdmissionTicket(self)
+
+    async def acquire(self, client: str):
+        if self._active < self.max_concurrent and not self._queued:
+            self._active += 1
+            self._admit(0.0, immediately=True)
+            return
+
+        if self._queued >= self.max_queue:
+            self._reject("queue_full", 503)
+        queue = self._queues.get(client)
+        if queue is not None and len(queue) >= self.max_queue_per_client:
+            self._reject("client_queue_full", 429)
+
+        future = asyncio.get_event_loop().create_future()
+        enqueued_at = time.monotonic()
+        self._queues.setdefault(client, deque()).append((future, enqueued_at))
+        self._queued += 1
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout_seconds)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done():
+                # The slot was handed over just as we gave up; pass it on
+                self.release()
+            else:
+                future.cancel()
+                self._remove(client, future)
+            if isinstance(e, asyncio.TimeoutError):
+                self._reject("queue_timeout", 503)
+            raise
+
+        self._admit(time.monotonic() - enqueued_at)
+
+    def release(self, held_seconds: Optional[float] = None):
+        """
+        Hand the slot to the next queued client, or free it. ``held_seconds``,
+        how long the request held the slot, feeds the Retry-After estimate.
+        """
+        if held_seconds is not None:
+            self._service_seconds += 0.2 * (held_seconds - self._service_seconds)
+        self.stats["completed"] += 1
+        while self._queues:
+            client, queue = next(iter(self._queues.items()))
+            future, _ = queue.popleft()
+            self._queued -= 1
+            if queue:
+                self._queues.move_to_end(client)
+            else:
+                del self._queues[client]
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    def _remove(self, client: str, future: asyncio.Future):
+        queue = self._queues.get(client)
+        if queue is None:
+            return
+        for entry in queue:
+            if entry[0] is future:
+                queue.remove(entry)
+                self._queued -= 1
+                break
+        if not queue:
+            del self._queues[client]
+
+    def _admit(self, waited: float, immediately: bool = False):
+        self.stats["admitted"] += 1
+        if immediately:
+            self.stats["admitted_immediately"] += 1
+        self._waits.append(waited)
+
+    def _reject(self, reason: str, status_code: int):
+        self.stats["rejected"][reason] += 1
+        raise AdmissionRejected(status_code, reason, self.retry_after())
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue is likely to have drained by one slot."""
+        return max(1, math.ceil(
+            (self._queued + 1) * self._service_seconds / self.max_concurrent))
+
+    def get_stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        return {
+            **self.stats,
+            "rejected": dict(self.stats["rejected"]),
+            "active": self._active,
+            "queued": self._queued,
+            "queued_clients": len(self._queues),
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "max_queue_per_client": self.max_queue_per_client,
+            "queue_timeout_seconds": self.queue_timeout_seconds,
+            "avg_service_seconds": round(self._service_seconds, 3),
+            "wait_ms": {
+                "p50": round(statistics.median(waits) * 1000, 1) if waits else 0.0,
+                "p95": round(waits[int(0.95 * (len(waits) - 1))] * 1000, 1) if waits else 0.0,
+                "max": round(waits[-1] * 1000, 1) if waits else 0.0
+            }
+        }
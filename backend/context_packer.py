@@ -0,0 +1,174 @@
+"""
+Context packing for NadavBot.
+Deduplicates retrieved chunks, ranks them and fits them to a token budget
+before they are sent to the LLM.
+"""
+
+import hashlib
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Tuple
+
+from history_budget import count_tokens, truncate_to_tokens
+
+Triplet = Tuple[str, str, str]
+
+_WORD_RE = re.compile(r"\w+")
+
+
+@dataclass
+class PackedContext:
+    """The chunks and triplets that made it into the prompt, plus what was cut."""
+    nodes: List[Dict[str, Any]] = field(default_factory=list)
+    triplets: List[Triplet] = field(default_factory=list)
+    tokens_used: int = 0
+    tokens_dropped: int = 0
+    duplicates_dropped: int = 0
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def _shingles(words: List[str], size: int) -> FrozenSet[Tuple[str, ...]]:
+    if len(words) <= size:
+        return frozenset([tuple(words)])
+    return frozenset(tuple(words[i:i + size]) for i in range(len(words) - size + 1))
+
+
+class ContextPacker:
+    """
+    Turns raw retrieval results into the context that fits the prompt.
+
+    Chunks with the same normalized text are dropped by hash; near-identical
+    chunks (the same resume section cut at different boundaries, or found by
+    both the graph and vector retrievers) are dropped when most of the
+    smaller chunk's word shingles also appear in a higher-ranked one.
+    Survivors are ranked by score, normalized per retriever so graph and
+    vector scores are comparable, and packed greedily into ``token_budget``.
+    Triplets get their own ``triplet_token_budget`` out of the total.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 1500,
+        triplet_token_budget: int = 200,
+        similarity_threshold: float = 0.8,
+        shingle_size: int = 5,
+        min_chunk_tokens: int = 50,
+        model: str = "gpt-3.5-turbo"
+    ):
+        self.token_budget = token_budget
+        self.triplet_token_budget = min(triplet_token_budget, token_budget)
+        self.similarity_threshold = similarity_threshold
+        self.shingle_size = shingle_size
+        self.min_chunk_tokens = min_chunk_tokens
+        self.model = model
+
+        self._lock = threading.Lock()
+        self.stats = {
+            "packs": 0,
+            "tokens_used": 0,
+            "tokens_dropped": 0,
+            "duplicates_dropped": 0
+        }
+
+    def pack(self, nodes: List[Dict[str, Any]], triplets: List[Triplet]) -> PackedContext:
+        """Deduplicate, rank and budget ``nodes`` and ``triplets``."""
+        packed = PackedContext()
+        remaining = self.token_budget
+
+        # Triplets are short and dense, so they go in first, up to their share
+        triplet_budget = self.triplet_token_budget
+        seen_triplets = set()
+        for triplet in triplets:
+            key = tuple(part.strip().lower() for part in triplet)
+            if key in seen_triplets:
+                packed.duplicates_dropped += 1
+                continue
+            seen_triplets.add(key)
+
+            tokens = count_tokens(" -> ".join(triplet), self.model)
+            if tokens > triplet_budget:
+                packed.tokens_dropped += tokens
+                continue
+            packed.triplets.append(triplet)
+            triplet_budget -= tokens
+            remaining -= tokens
+            packed.tokens_used += tokens
+
+        ranked, duplicates = self._dedupe(self._rank(nodes))
+        packed.duplicates_dropped += duplicates
+
+        for node in ranked:
+            text = node["text"].strip()
+            tokens = count_tokens(text, self.model)
+
+            if tokens <= remaining:
+                packed.nodes.append(node)
+                remaining -= tokens
+                packed.tokens_used += tokens
+            elif remaining >= self.min_chunk_tokens:
+                # Keep the start of a chunk that does not quite fit
+                packed.nodes.append({
+                    **node, "text": truncate_to_tokens(text, remaining, self.model)})
+                packed.tokens_used += remaining
+                packed.tokens_dropped += tokens - remaining
+                remaining = 0
+            else:
+                packed.tokens_dropped += tokens
+
+        with self._lock:
+            self.stats["packs"] += 1
+            self.stats["tokens_used"] += packed.tokens_used
+            self.stats["tokens_dropped"] += packed.tokens_dropped
+            self.stats["duplicates_dropped"] += packed.duplicates_dropped
+
+        return packed
+
+    def _rank(self, nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Sort by score, scaled to the best score of the same retriever."""
+        best: Dict[str, float] = {}
+        for node in nodes:
+            retriever = node.get("retriever", "")
+            best[retriever] = max(best.get(retriever, 0.0), node.get("score") or 0.0)
+
+        def relevance(node: Dict[str, Any]) -> float:
+            top = best.get(node.get("retriever", ""), 0.0)
+            return (node.get("score") or 0.0) / top if top > 0 else 0.0
+
+        return sorted(nodes, key=relevance, reverse=True)
+
+    def _dedupe(self, ranked: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """Drop exact and near duplicates, keeping the higher-ranked copy."""
+        kept: List[Dict[str, Any]] = []
+        kept_hashes = set()
+        kept_shingles: List[FrozenSet[Tuple[str, ...]]] = []
+        duplicates = 0
+
+        for node in ranked:
+            words = _words(node["text"])
+            digest = hashlib.sha1(" ".join(words).encode("utf-8")).hexdigest()
+            if digest in kept_hashes:
+                duplicates += 1
+                continue
+
+            shingles = _shingles(words, self.shingle_size)
+            if any(
+                len(shingles & other) / max(1, min(len(shingles), len(other)))
+                >= self.similarity_threshold
+                for other in kept_shingles
+            ):
+                duplicates += 1
+                continue
+
+            kept.append(node)
+            kept_hashes.add(digest)
+            kept_shingles.append(shingles)
+
+        return kept, duplicates
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
@@ -0,0 +1,163 @@
+"""
+Token-budgeted conversation history for NadavBot.
+Keeps recent messages within a token allowance and folds older ones into a
+rolling summary that is updated incrementally per conversation.
+"""
+
+import asyncio
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, List, Set, Tuple
+
+import tiktoken
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
+    """Count the tokens ``text`` takes up for ``model``."""
+    return len(_encoding(model).encode(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = "gpt-3.5-turbo") -> str:
+    """Cut ``text`` down to at most ``max_tokens`` tokens."""
+    encoding = _encoding(model)
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens]) + "..."
+
+
+def _message_hash(message: Dict[str, str]) -> str:
+    return hashlib.sha1(
+        f"{message['role']}\x00{message['content']}".encode("utf-8")).hexdigest()
+
+
+class HistoryBudgeter:
+    """
+    Splits history into recent messages that fit ``token_budget`` and older
+    messages that are folded into a rolling summary.
+
+    Summaries are kept in ``summary_store`` (the session store) together with
+    the last message they cover, so server workers sharing sessions also share
+    summaries. fit() never calls the summarizer: it returns whatever summary is
+    stored. update() folds newly evicted messages into it and is meant to run
+    in the background once a reply has been recorded, so by the next turn the
+    summary already covers everything that fell out of the window.
+    """
+
+    def __init__(
+        self,
+        summarize_fn: Callable[[str, List[Dict[str, str]]], Awaitable[str]],
+        summary_store,
+        token_budget: int = 800,
+        summary_token_budget: int = 200,
+        model: str = "gpt-3.5-turbo"
+    ):
+        self.summarize_fn = summarize_fn
+        # Anything with get_summary/set_summary of {"summary": str, "last_hash": str}
+        self.summary_store = summary_store
+        self.token_budget = token_budget
+        self.summary_token_budget = summary_token_budget
+        self.model = model
+
+        self._lock = threading.Lock()
+        self._updating: Set[str] = set()
+        self.stats = {"summarizations": 0, "summary_reuses": 0, "summary_lags": 0}
+
+    def split(self, history: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+        """Return (older, recent), where recent is the newest run of messages within budget."""
+        recent: List[Dict[str, str]] = []
+        used = 0
+
+        for message in reversed(history):
+            tokens = count_tokens(message["content"], self.model)
+            if used + tokens > self.token_budget:
+                if not recent:
+                    # Always keep the latest message, cut down to the budget
+                    recent.append({
+                        **message,
+                        "content": truncate_to_tokens(
+                            message["content"], self.token_budget, self.model)
+                    })
+                break
+            recent.append(message)
+            used += tokens
+
+        recent.reverse()
+        return history[:len(history) - len(recent)], recent
+
+    async def fit(
+        self,
+        conversation_id: str,
+        history: List[Dict[str, str]]
+    ) -> Tuple[List[Dict[str, str]], str]:
+        """Return the recent messages to include verbatim and the summary of older ones."""
+        older, recent = self.split(history)
+        if not older:
+            return recent, ""
+
+        cached = await self._cached(conversation_id)
+        if self._new_messages(older, cached):
+            # update() has not caught up yet (or failed); those messages are
+            # left out of this turn rather than delaying the reply
+            self.stats["summary_lags"] += 1
+        else:
+            self.stats["summary_reuses"] += 1
+        return recent, cached["summary"]
+
+    async def update(self, conversation_id: str, history: List[Dict[str, str]]):
+        """Fold messages of ``history`` that fall outside the budget into the summary."""
+        with self._lock:
+            if conversation_id in self._updating:
+                # The running update covers most of it; the next turn catches up
+                return
+            self._updating.add(conversation_id)
+
+        try:
+            older, _ = self.split(history)
+            cached = await self._cached(conversation_id)
+            new_messages = self._new_messages(older, cached)
+            if not new_messages:
+                return
+
+            summary = await self.summarize_fn(cached["summary"], new_messages)
+            summary = truncate_to_tokens(summary, self.summary_token_budget, self.model)
+            self.stats["summarizations"] += 1
+
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.summary_store.set_summary, conversation_id,
+                {"summary": summary, "last_hash": _message_hash(older[-1])})
+        finally:
+            with self._lock:
+                self._updating.discard(conversation_id)
+
+    async def _cached(self, conversation_id: str) -> Dict[str, str]:
+        # The session store may be SQLite, so read it off the event loop
+        stored = await asyncio.get_running_loop().run_in_executor(
+            None, self.summary_store.get_summary, conversation_id)
+        return stored or {"summary": "", "last_hash": ""}
+
+    def _new_messages(
+        self,
+        older: List[Dict[str, str]],
+        cached: Dict[str, str]
+    ) -> List[Dict[str, str]]:
+        """The messages of ``older`` that come after the last one the summary covers."""
+        # If its last message is gone, the whole covered prefix was dropped
+        # from the session, so every older message is new
+        hashes = [_message_hash(message) for message in older]
+        start = 0
+        if cached["last_hash"] in hashes:
+            start = len(hashes) - hashes[::-1].index(cached["last_hash"])
+        return older[start:]
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats)
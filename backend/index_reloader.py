@@ -0,0 +1,111 @@
+"""
+Hot reload of the portfolio indices for NadavBot
+Watches the data directory and rebuilds the indices in the background when
+it changes. The rebuilt indices live in a new builder generation that is
+swapped in with a single reference assignment, so requests already running
+finish on the old indices and later ones see the new ones.
+"""
+
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+sys.path.append(str(Path(__file__).parent.parent))
+from graph.data_watch import ChangeDetector  # noqa: E402
+
+
+class IndexReloader:
+    """
+    Poll ``data_dir`` every ``interval_seconds`` and rebuild on changes.
+
+    A change is only acted on once the directory has been quiet for a full
+    interval, so a burst of edits causes one rebuild. ``rebuild`` runs on a
+    dedicated thread (never the request executor) and returns the new
+    builder; ``swap`` is then awaited on the event loop to install it. A
+    failed rebuild keeps the current indices and is retried on the next change.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        rebuild: Callable[[], Any],
+        swap: Callable[[Any], Awaitable[None]],
+        interval_seconds: float = 5.0
+    ):
+        self.data_dir = Path(data_dir)
+        self.rebuild = rebuild
+        self.swap = swap
+        self.interval_seconds = interval_seconds
+
+        self._changes = ChangeDetector(self.data_dir)
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="nadavbot-reload")
+        self._task: Optional[asyncio.Task] = None
+        self.stats: Dict[str, Any] = {
+            "state": "idle",
+            "reloads": 0,
+            "failures": 0,
+            "last_error": None,
+            "last_rebuild_seconds": None,
+            "last_reload_at": None
+        }
+
+    def start(self):
+        """Start watching on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_event_loop().create_task(self._watch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._executor.shutdown(wait=False)
+
+    async def reload(self):
+        """Rebuild now and swap the result in; returns once the swap is done."""
+        loop = asyncio.get_event_loop()
+        self.stats["state"] = "rebuilding"
+        start = time.perf_counter()
+        try:
+            builder = await loop.run_in_executor(self._executor, self.rebuild)
+            await self.swap(builder)
+        except Exception as e:
+            self.stats["failures"] += 1
+            self.stats["last_error"] = str(e)
+            print(f"Error reloading indices: {e}")
+        else:
+            self.stats["reloads"] += 1
+            self.stats["last_error"] = None
+            self.stats["last_reload_at"] = time.time()
+            print("Reloaded indices from changed data files")
+        finally:
+            self.stats["last_rebuild_seconds"] = round(time.perf_counter() - start, 3)
+            self.stats["state"] = "idle"
+
+    async def _watch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            # One failed poll must not end the watcher; try again next interval
+            try:
+                settled = await loop.run_in_executor(self._executor, self._changes.poll)
+                if not settled:
+                    # Still changing; wait for it to settle
+                    self.stats["state"] = "change_pending" if self._changes.pending else "idle"
+                    continue
+
+                print("Data files changed; rebuilding indices in the background...")
+                await self.reload()
+            except Exception as e:
+                self.stats["last_error"] = str(e)
+                print(f"Error watching {self.data_dir}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "interval_seconds": self.interval_seconds}
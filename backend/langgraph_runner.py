@@ -3,8 +3,22 @@ LangGraph runner for NadavBot
 Implements the conversational AI workflow using LangGraph.
 """
 
-from prompt_templates import SYSTEM_PROMPT, format_context_prompt, format_conversation_history
-from graph.build_graph import NadavBotKnowledgeGraph
+from prompt_templates import (
+    SYSTEM_PROMPT,
+    format_context_prompt,
+    format_conversation_history,
+    format_summary_prompt,
+    format_retrieved_nodes,
+    get_canned_prompts,
+    should_use_context,
+    extract_intent
+)
+from response_cache import ResponseCache, normalize_query
+from session_store import create_session_store
+from history_budget import HistoryBudgeter
+from context_packer import ContextPacker
+from index_reloader import IndexReloader
+from single_flight import SingleFlight, request_key
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 from typing_extensions import Annotated, TypedDict
@@ -13,20 +27,120 @@ from langgraph.graph import StateGraph, END
 import os
 import sys
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator, Set, Tuple
 import asyncio
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime
 
 # Add parent directory to path for importing graph module
 sys.path.append(str(Path(__file__).parent.parent))
 
+# Retrieval fan-out settings
+RETRIEVAL_MODES = {
+    "graph": "knowledge_graph",
+    "vector": "vector_search",
+    "hybrid": "hybrid_search",
+    "structured": "structured_index"
+}
+# Full retrieval is one fused graph + vector call by default; with fusion off
+# the graph and vector modes are queried separately and side by side
+RETRIEVAL_FUSION = os.getenv("NADAVBOT_RETRIEVAL_FUSION", "true").lower() == "true"
+FULL_RETRIEVAL_MODES = ("hybrid",) if RETRIEVAL_FUSION else ("graph", "vector")
+RETRIEVAL_TIMEOUT_SECONDS = float(os.getenv("NADAVBOT_RETRIEVAL_TIMEOUT", "15"))
+RETRIEVAL_MAX_WORKERS = int(os.getenv("NADAVBOT_RETRIEVAL_WORKERS", "8"))
+
+# "nodes" feeds raw retrieved chunks and triplets to the single generation
+# call; "synthesized" asks each index's query engine for an LLM-written answer
+# first, which costs one extra LLM call per retrieval mode
+RETRIEVAL_STYLE = os.getenv("NADAVBOT_RETRIEVAL_STYLE", "nodes")
+
+# Ground answers in exact project/timeline facts from the structured index.
+# Questions those facts fully answer ("what did you build with React") skip
+# graph and vector retrieval, so they cost no embedding call.
+STRUCTURED_ANSWERS = os.getenv("NADAVBOT_STRUCTURED_ANSWERS", "true").lower() == "true"
+
+# Intents that only need a subset of documents, by their "source" metadata.
+# Anything not listed here goes through full graph + vector retrieval.
+INTENT_SOURCES = {
+    "skills": ("skills", "resume"),
+    "projects": ("projects",),
+    "experience": ("timeline", "resume"),
+    "frontend": ("skills", "projects"),
+    "backend": ("skills", "projects")
+}
+# What LlamaIndex query engines return when no nodes matched
+EMPTY_QUERY_RESPONSE = "Empty Response"
+NO_CONTEXT_NEEDED = "(No portfolio context was retrieved; this is a greeting.)"
+RETRIEVAL_ERROR_CONTEXT = "I apologize, but I'm having trouble accessing my knowledge base right now."
+
+# Response cache settings
+CACHE_MAX_SIZE = int(os.getenv("NADAVBOT_CACHE_SIZE", "256"))
+CACHE_TTL_SECONDS = float(os.getenv("NADAVBOT_CACHE_TTL", "3600"))
+CACHE_SIMILARITY_THRESHOLD = float(os.getenv("NADAVBOT_CACHE_SIMILARITY", "0.95"))
+
+# Startup warm-up of canned prompts. Full answers cost one completion per
+# prompt, so by default only retrieval contexts are precomputed
+WARMUP_BUDGET_SECONDS = float(os.getenv("NADAVBOT_WARMUP_BUDGET", "120"))
+WARMUP_MAX_PROMPTS = int(os.getenv("NADAVBOT_WARMUP_MAX_PROMPTS", "24"))
+WARMUP_FULL_ANSWERS = os.getenv("NADAVBOT_WARMUP_FULL_ANSWERS", "false").lower() == "true"
+
+# "async" runs the workflow natively on the event loop with ainvoke();
+# "thread" runs the blocking workflow in the default executor
+WORKFLOW_MODE = os.getenv("NADAVBOT_WORKFLOW_MODE", "async")
+
+# Conversation history allowance; older turns are folded into a rolling summary
+HISTORY_TOKEN_BUDGET = int(os.getenv("NADAVBOT_HISTORY_TOKEN_BUDGET", "800"))
+SUMMARY_TOKEN_BUDGET = int(os.getenv("NADAVBOT_SUMMARY_TOKEN_BUDGET", "200"))
+
+# Retrieved context allowance, after deduplication and ranking
+CONTEXT_TOKEN_BUDGET = int(os.getenv("NADAVBOT_CONTEXT_TOKEN_BUDGET", "1500"))
+CONTEXT_TRIPLET_TOKEN_BUDGET = int(os.getenv("NADAVBOT_CONTEXT_TRIPLET_TOKEN_BUDGET", "200"))
+CONTEXT_DEDUP_THRESHOLD = float(os.getenv("NADAVBOT_CONTEXT_DEDUP_THRESHOLD", "0.8"))
+
+# Concurrent /chat requests with the same query and history share one
+# cache lookup and workflow run
+SINGLE_FLIGHT = os.getenv("NADAVBOT_SINGLE_FLIGHT", "true").lower() == "true"
+
+# Swap in new indices without a restart; in-flight requests finish on the
+# previous ones. "true" rebuilds in this process when data/ changes;
+# "follow" reloads the snapshot whenever another process (graph/build_graph.py
+# --watch) persists a new one, which is how multi-worker serving stays in sync;
+# "false" disables both.
+HOT_RELOAD = os.getenv("NADAVBOT_HOT_RELOAD", "true").lower()
+HOT_RELOAD_INTERVAL_SECONDS = float(os.getenv("NADAVBOT_HOT_RELOAD_INTERVAL", "5"))
+
+GENERATION_ERROR_RESPONSE = "I apologize, but I'm having trouble generating a response right now. Please try again."
+
+
+def process_memory_stats() -> Dict[str, Any]:
+    """
+    This worker's PID and memory. ``rss_mb`` counts pages shared with other
+    workers (such as memory-mapped snapshot files) in full; ``pss_mb`` splits
+    them evenly between the processes mapping them, so it sums across workers.
+    Both are None where /proc is unavailable.
+    """
+    stats: Dict[str, Any] = {"pid": os.getpid(), "rss_mb": None, "pss_mb": None}
+    try:
+        with open("/proc/self/smaps_rollup", "r") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in ("Rss", "Pss"):
+                    stats[f"{name.lower()}_mb"] = round(int(value.split()[0]) / 1024, 1)
+    except OSError:
+        pass
+    return stats
+
 
 class ConversationState(TypedDict):
     """State structure for the conversation workflow."""
     messages: Annotated[list, add_messages]
     user_query: str
     retrieved_context: str
+    intent: str
     conversation_history: List[Dict[str, str]]
+    history_summary: str
     response: str
     sources: List[str]
     conversation_id: str
@@ -37,42 +151,186 @@ class NadavBotRunner:
     Main runner class that orchestrates the LangGraph workflow for NadavBot.
     """
 
-    def __init__(self):
-        self.llm = ChatOpenAI(
+    def __init__(self, llm=None):
+        # Any LangChain chat model works here; tests can pass a fake such as
+        # langchain_core's FakeListChatModel instead of hitting OpenAI.
+        self.llm = llm or ChatOpenAI(
             model="gpt-3.5-turbo",
             temperature=0.3,
             max_tokens=1000
         )
         self.kg_builder = None
         self.workflow = None
+        self.retrieval_workflow = None
+        self.async_workflow = None
+        self.async_retrieval_workflow = None
+        self.use_async_workflow = WORKFLOW_MODE == "async"
+        self.response_cache = None
+        self.index_reloader: Optional[IndexReloader] = None
+        self.single_flight = SingleFlight()
         self.ready = False
 
+        # Server-side histories, so clients only send the newest message
+        self.session_store = create_session_store()
+        self.history_budgeter = HistoryBudgeter(
+            self._summarize_history,
+            self.session_store,
+            token_budget=HISTORY_TOKEN_BUDGET,
+            summary_token_budget=SUMMARY_TOKEN_BUDGET
+        )
+        self.context_packer = ContextPacker(
+            token_budget=CONTEXT_TOKEN_BUDGET,
+            triplet_token_budget=CONTEXT_TRIPLET_TOKEN_BUDGET,
+            similarity_threshold=CONTEXT_DEDUP_THRESHOLD
+        )
+        # Summary updates running after replies; referenced so they are not collected
+        self._background_tasks: Set[asyncio.Task] = set()
+
+        # Startup progress: pending -> loading -> (building | waiting_for_indices)
+        # -> ready | failed
+        self.state = "pending"
+        self.state_error: Optional[str] = None
+        self.startup_timings: Dict[str, float] = {}
+
+        # Retrieval context precomputed for canned prompts, keyed by normalized query
+        self.precomputed_contexts: Dict[str, Dict[str, Any]] = {}
+        self.warmup_status: Dict[str, Any] = {"state": "pending"}
+
+        # Shared, bounded pool for running graph and vector retrieval side by side
+        self.retrieval_executor = ThreadPoolExecutor(
+            max_workers=RETRIEVAL_MAX_WORKERS,
+            thread_name_prefix="nadavbot-retrieval"
+        )
+
     async def initialize(self):
-        """Initialize the knowledge graph and build the workflow."""
+        """
+        Initialize the knowledge graph and build the workflow.
+
+        Index loading and building run in a worker thread, so the event loop
+        keeps serving requests (e.g. /health) while this is awaited in the
+        background. Progress is reported through ``state``.
+        """
+        loop = asyncio.get_event_loop()
+
         try:
             print("Initializing NadavBot Knowledge Graph...")
+            self.state = "loading"
 
             # Initialize knowledge graph
-            self.kg_builder = NadavBotKnowledgeGraph(
-                data_dir="../data",
-                storage_dir="../storage"
-            )
+            start = time.perf_counter()
+            self.kg_builder = await loop.run_in_executor(None, self._create_kg_builder)
+            self.startup_timings["create_kg_builder"] = time.perf_counter() - start
 
             # Load existing indices or build new ones
-            if not self.kg_builder.load_existing_indices():
+            start = time.perf_counter()
+            loaded = await loop.run_in_executor(
+                None, self.kg_builder.load_existing_indices)
+            self.startup_timings["load_indices"] = time.perf_counter() - start
+
+            if not loaded and HOT_RELOAD == "follow":
+                # Another process owns storage/; building here would race it,
+                # so wait for its first build instead
+                loaded = await self._wait_for_indices()
+            if not loaded:
                 print("Building knowledge graph (this may take a few minutes)...")
-                self.kg_builder.build_knowledge_graph()
+                self.state = "building"
+                start = time.perf_counter()
+                await loop.run_in_executor(None, self.kg_builder.build_knowledge_graph)
+                self.startup_timings["build_indices"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+
+            # Cache whole responses in front of the workflow; entries are
+            # dropped automatically when anything under data/ changes
+            self.response_cache = ResponseCache(
+                max_size=CACHE_MAX_SIZE,
+                ttl_seconds=CACHE_TTL_SECONDS,
+                similarity_threshold=CACHE_SIMILARITY_THRESHOLD,
+                embed_fn=self.kg_builder.embed_model.get_query_embedding,
+                aembed_fn=self.kg_builder.embed_model.aget_query_embedding,
+                watch_dir=self.kg_builder.data_dir
+            )
+            self.response_cache.add_clear_listener(self.precomputed_contexts.clear)
 
             # Build the LangGraph workflow
             self._build_workflow()
+            self.startup_timings["build_workflow"] = time.perf_counter() - start
 
             self.ready = True
+            self.state = "ready"
             print("NadavBot initialization complete!")
 
+            if HOT_RELOAD in ("true", "follow"):
+                follow = HOT_RELOAD == "follow"
+                self.index_reloader = IndexReloader(
+                    self.kg_builder.index_dir if follow else self.kg_builder.data_dir,
+                    rebuild=self._reload_indices if follow else self._rebuild_indices,
+                    swap=self._swap_kg_builder,
+                    interval_seconds=HOT_RELOAD_INTERVAL_SECONDS
+                )
+                self.index_reloader.start()
+
         except Exception as e:
+            self.state = "failed"
+            self.state_error = str(e)
             print(f"Error initializing NadavBot: {e}")
             raise e
 
+    async def _wait_for_indices(self) -> bool:
+        """Poll until the builder process has persisted indices, then load them."""
+        loop = asyncio.get_event_loop()
+        self.state = "waiting_for_indices"
+        print(f"No indices in {self.kg_builder.index_dir} yet; "
+              "waiting for graph/build_graph.py to persist them...")
+        while True:
+            await asyncio.sleep(HOT_RELOAD_INTERVAL_SECONDS)
+            try:
+                if await loop.run_in_executor(None, self.kg_builder.load_existing_indices):
+                    self.state = "loading"
+                    return True
+            except Exception as e:
+                # A build still being written; try again on the next poll
+                print(f"Indices not loadable yet: {e}")
+
+    def _create_kg_builder(self):
+        """Import and construct the knowledge graph builder (slow; run off the event loop)."""
+        # Imported here because pulling in LlamaIndex takes seconds
+        from graph.build_graph import NadavBotKnowledgeGraph
+
+        return NadavBotKnowledgeGraph(
+            data_dir="../data",
+            storage_dir="../storage"
+        )
+
+    def _rebuild_indices(self):
+        """
+        Build the next generation of indices from the current data files
+        (blocking; run by the IndexReloader on its own thread). Only changed
+        documents are re-embedded and re-extracted.
+        """
+        kg_builder = self.kg_builder.new_generation()
+        kg_builder.build_knowledge_graph(incremental=True)
+        return kg_builder
+
+    def _reload_indices(self):
+        """Load the indices another process persisted into a new builder generation."""
+        kg_builder = self.kg_builder.new_generation()
+        if not kg_builder.load_existing_indices():
+            raise RuntimeError(f"No indices found in {kg_builder.index_dir}")
+        return kg_builder
+
+    async def _swap_kg_builder(self, kg_builder):
+        """Install rebuilt indices; responses and contexts from the old ones are dropped."""
+        # Retrieval reads self.kg_builder once per request, so this single
+        # assignment is the whole swap
+        self.kg_builder = kg_builder
+        self.response_cache.clear()
+        # Contexts only: regenerating every canned answer would spend a batch
+        # of completions on each data edit
+        task = asyncio.get_running_loop().create_task(self.warm_up(full_answers=False))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
     def _build_workflow(self):
         """Build the LangGraph workflow for conversation processing."""
 
@@ -89,55 +347,68 @@ class NadavBotRunner:
 
             return {
                 **state,
-                "user_query": user_query
+                "user_query": user_query,
+                "intent": extract_intent(user_query)
             }
 
-        def retrieve_context(state: ConversationState) -> ConversationState:
-            """Retrieve relevant context from the knowledge graph."""
+        def route_query(state: ConversationState) -> str:
+            """
+            Pick the retrieval node: none for greetings, the structured index
+            for questions it fully answers, targeted for known intents.
+            """
+            if not should_use_context(state["user_query"]):
+                return "skip_retrieval"
+            structured = self._structured_result(state["user_query"])
+            if structured is not None and structured["complete"]:
+                return "structured_retrieval"
+            if state["intent"] in INTENT_SOURCES:
+                return "targeted_retrieval"
+            return "retrieve_context"
+
+        def skip_retrieval(state: ConversationState) -> ConversationState:
+            """Answer without touching the indices."""
+            return {
+                **state,
+                "retrieved_context": NO_CONTEXT_NEEDED,
+                "sources": []
+            }
+
+        def structured_retrieval(state: ConversationState) -> ConversationState:
+            """Answer from the structured project/timeline index alone."""
+            structured = self._structured_result(state["user_query"])
+            return {**state, **self._context_update(
+                {"structured": structured} if structured else {})}
+
+        def targeted_retrieval(state: ConversationState) -> ConversationState:
+            """Retrieve from the vector index, restricted to the intent's documents."""
             user_query = state["user_query"]
 
-            try:
-                # Query both graph and vector indices for comprehensive retrieval
-                graph_context = self.kg_builder.query_graph(
-                    user_query, mode="graph")
-                vector_context = self.kg_builder.query_graph(
-                    user_query, mode="vector")
+            precomputed = self.precomputed_contexts.get(normalize_query(user_query))
+            if precomputed is not None:
+                return {**state, **precomputed}
 
-                # Combine contexts
-                combined_context = f"Graph Context:\n{graph_context}\n\nVector Context:\n{vector_context}"
+            update = self._context_update(self._retrieve_concurrently(
+                user_query, modes=("vector",), sources=INTENT_SOURCES[state["intent"]]))
 
-                return {
-                    **state,
-                    "retrieved_context": combined_context,
-                    "sources": ["knowledge_graph", "vector_search"]
-                }
+            # Fall back to full retrieval if the filtered search found nothing
+            if not update["sources"]:
+                update = self._context_update(self._retrieve_concurrently(user_query))
 
-            except Exception as e:
-                print(f"Error retrieving context: {e}")
-                return {
-                    **state,
-                    "retrieved_context": "I apologize, but I'm having trouble accessing my knowledge base right now.",
-                    "sources": []
-                }
+            return {**state, **update}
 
-        def generate_response(state: ConversationState) -> ConversationState:
-            """Generate the final response using the LLM."""
+        def retrieve_context(state: ConversationState) -> ConversationState:
+            """Retrieve relevant context from the knowledge graph."""
             user_query = state["user_query"]
-            retrieved_context = state["retrieved_context"]
-            conversation_history = state.get("conversation_history", [])
-
-            # Format the prompt with context and history
-            formatted_prompt = format_context_prompt(
-                context=retrieved_context,
-                conversation_history=conversation_history,
-                user_query=user_query
-            )
 
-            # Create messages for the LLM
-            messages = [
-                SystemMessage(content=SYSTEM_PROMPT),
-                HumanMessage(content=formatted_prompt)
-            ]
+            precomputed = self.precomputed_contexts.get(normalize_query(user_query))
+            if precomputed is not None:
+                return {**state, **precomputed}
+
+            return {**state, **self._context_update(self._retrieve_concurrently(user_query))}
+
+        def generate_response(state: ConversationState) -> ConversationState:
+            """Generate the final response using the LLM."""
+            messages = self._build_generation_messages(state)
 
             try:
                 # Generate response
@@ -153,63 +424,339 @@ class NadavBotRunner:
                 print(f"Error generating response: {e}")
                 return {
                     **state,
-                    "response": "I apologize, but I'm having trouble generating a response right now. Please try again."
+                    "response": GENERATION_ERROR_RESPONSE
                 }
 
-        # Build the workflow graph
-        workflow = StateGraph(ConversationState)
+        # Async counterparts. LangGraph runs plain functions in a thread pool
+        # under ainvoke(), so even the trivial nodes get async wrappers.
+        async def aextract_query(state: ConversationState) -> ConversationState:
+            return extract_query(state)
+
+        async def aroute_query(state: ConversationState) -> str:
+            return route_query(state)
+
+        async def askip_retrieval(state: ConversationState) -> ConversationState:
+            return skip_retrieval(state)
+
+        async def astructured_retrieval(state: ConversationState) -> ConversationState:
+            return structured_retrieval(state)
+
+        async def atargeted_retrieval(state: ConversationState) -> ConversationState:
+            user_query = state["user_query"]
+
+            precomputed = self.precomputed_contexts.get(normalize_query(user_query))
+            if precomputed is not None:
+                return {**state, **precomputed}
+
+            update = self._context_update(await self._aretrieve_concurrently(
+                user_query, modes=("vector",), sources=INTENT_SOURCES[state["intent"]]))
+
+            if not update["sources"]:
+                update = self._context_update(
+                    await self._aretrieve_concurrently(user_query))
+
+            return {**state, **update}
+
+        async def aretrieve_context(state: ConversationState) -> ConversationState:
+            user_query = state["user_query"]
+
+            precomputed = self.precomputed_contexts.get(normalize_query(user_query))
+            if precomputed is not None:
+                return {**state, **precomputed}
+
+            return {**state, **self._context_update(
+                await self._aretrieve_concurrently(user_query))}
+
+        async def agenerate_response(state: ConversationState) -> ConversationState:
+            try:
+                response = await self.llm.ainvoke(self._build_generation_messages(state))
+                return {**state, "response": response.content}
+
+            except Exception as e:
+                print(f"Error generating response: {e}")
+                return {**state, "response": GENERATION_ERROR_RESPONSE}
+
+        def add_retrieval_stage(graph: StateGraph, next_node: str, nodes: Dict[str, Any]):
+            """Add query extraction and routed retrieval, ending at next_node."""
+            graph.add_node("extract_query", nodes["extract_query"])
+            graph.add_node("skip_retrieval", nodes["skip_retrieval"])
+            graph.add_node("structured_retrieval", nodes["structured_retrieval"])
+            graph.add_node("targeted_retrieval", nodes["targeted_retrieval"])
+            graph.add_node("retrieve_context", nodes["retrieve_context"])
+
+            graph.set_entry_point("extract_query")
+            graph.add_conditional_edges(
+                "extract_query",
+                nodes["route_query"],
+                {
+                    "skip_retrieval": "skip_retrieval",
+                    "structured_retrieval": "structured_retrieval",
+                    "targeted_retrieval": "targeted_retrieval",
+                    "retrieve_context": "retrieve_context"
+                }
+            )
+            for node in ("skip_retrieval", "structured_retrieval",
+                         "targeted_retrieval", "retrieve_context"):
+                graph.add_edge(node, next_node)
+
+        def compile_workflows(nodes: Dict[str, Any]):
+            """Compile the full workflow and its retrieval-only variant."""
+            workflow = StateGraph(ConversationState)
+            add_retrieval_stage(workflow, "generate_response", nodes)
+            workflow.add_node("generate_response", nodes["generate_response"])
+            workflow.add_edge("generate_response", END)
+
+            # Retrieval-only variant used by the streaming path, which runs
+            # generation itself so tokens can be forwarded as they arrive
+            retrieval_workflow = StateGraph(ConversationState)
+            add_retrieval_stage(retrieval_workflow, END, nodes)
+
+            return workflow.compile(), retrieval_workflow.compile()
+
+        # Thread-pool workflows, driven with invoke() from an executor
+        self.workflow, self.retrieval_workflow = compile_workflows({
+            "extract_query": extract_query,
+            "route_query": route_query,
+            "skip_retrieval": skip_retrieval,
+            "structured_retrieval": structured_retrieval,
+            "targeted_retrieval": targeted_retrieval,
+            "retrieve_context": retrieve_context,
+            "generate_response": generate_response
+        })
+
+        # Async-native workflows, driven with ainvoke() on the event loop
+        self.async_workflow, self.async_retrieval_workflow = compile_workflows({
+            "extract_query": aextract_query,
+            "route_query": aroute_query,
+            "skip_retrieval": askip_retrieval,
+            "structured_retrieval": astructured_retrieval,
+            "targeted_retrieval": atargeted_retrieval,
+            "retrieve_context": aretrieve_context,
+            "generate_response": agenerate_response
+        })
+
+    def _context_update(self, contexts: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Turn per-mode retrieval results into the retrieved_context/sources state update.
+
+        Results from whichever branches came back in time are merged, then
+        deduplicated, ranked and fitted to the context token budget.
+        """
+        if not contexts:
+            return {
+                "retrieved_context": RETRIEVAL_ERROR_CONTEXT,
+                "sources": []
+            }
+
+        packed = self.context_packer.pack(
+            [node for result in contexts.values() for node in result["nodes"]],
+            [triplet for result in contexts.values() for triplet in result["triplets"]]
+        )
+        if packed.tokens_dropped or packed.duplicates_dropped:
+            print(f"Context packed to {packed.tokens_used} tokens: dropped "
+                  f"{packed.tokens_dropped} tokens and {packed.duplicates_dropped} duplicates")
+
+        return {
+            "retrieved_context": format_retrieved_nodes({
+                "facts": [fact for result in contexts.values() for fact in result.get("facts", [])],
+                "nodes": packed.nodes,
+                "triplets": packed.triplets
+            }),
+            "sources": [RETRIEVAL_MODES[mode] for mode in contexts]
+        }
+
+    def _structured_result(self, user_query: str, kg_builder=None) -> Optional[Dict[str, Any]]:
+        """
+        Structured index facts for the query, in the retrieval result shape
+        plus "facts" and "complete", or None if it matched nothing.
+        """
+        kg_builder = kg_builder or self.kg_builder
+        if not STRUCTURED_ANSWERS or kg_builder is None:
+            return None
+        try:
+            structured = kg_builder.lookup_structured(user_query)
+        except Exception as e:
+            print(f"Error looking up structured facts: {e}")
+            return None
+        if not structured or not structured["facts"]:
+            return None
+        return {"nodes": [], "triplets": [], **structured}
+
+    def _retrieve_concurrently(
+        self,
+        user_query: str,
+        modes: Tuple[str, ...] = FULL_RETRIEVAL_MODES,
+        sources: Optional[Tuple[str, ...]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Query the retrieval modes in parallel.
+
+        All branches share one deadline, so total latency is bounded by the
+        slower branch (or the timeout). Branches that fail, time out or come
+        back empty are dropped and the rest are returned. Every branch reads
+        the same indices even if a hot reload swaps them part way through.
+        """
+        kg_builder = self.kg_builder
+        futures = {
+            mode: self.retrieval_executor.submit(
+                self._query_mode, kg_builder, user_query, mode, sources)
+            for mode in modes
+        }
+        deadline = time.monotonic() + RETRIEVAL_TIMEOUT_SECONDS
+
+        contexts = {}
+        for mode, future in futures.items():
+            try:
+                remaining = max(0.0, deadline - time.monotonic())
+                result = future.result(timeout=remaining)
+                if result["nodes"] or result["triplets"]:
+                    contexts[mode] = result
+            except FutureTimeoutError:
+                future.cancel()
+                print(f"Retrieval timed out for {mode} mode after {RETRIEVAL_TIMEOUT_SECONDS}s")
+            except Exception as e:
+                print(f"Error retrieving {mode} context: {e}")
+
+        structured = self._structured_result(user_query, kg_builder)
+        if structured is not None:
+            contexts["structured"] = structured
+
+        return contexts
+
+    async def _aretrieve_concurrently(
+        self,
+        user_query: str,
+        modes: Tuple[str, ...] = FULL_RETRIEVAL_MODES,
+        sources: Optional[Tuple[str, ...]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Async variant of _retrieve_concurrently()."""
+        kg_builder = self.kg_builder
+
+        async def query_mode(mode: str) -> Dict[str, Any]:
+            return await asyncio.wait_for(
+                self._aquery_mode(kg_builder, user_query, mode, sources),
+                timeout=RETRIEVAL_TIMEOUT_SECONDS
+            )
+
+        results = await asyncio.gather(
+            *(query_mode(mode) for mode in modes), return_exceptions=True)
+
+        contexts = {}
+        for mode, result in zip(modes, results):
+            if isinstance(result, asyncio.TimeoutError):
+                print(f"Retrieval timed out for {mode} mode after {RETRIEVAL_TIMEOUT_SECONDS}s")
+            elif isinstance(result, Exception):
+                print(f"Error retrieving {mode} context: {result}")
+            elif result["nodes"] or result["triplets"]:
+                contexts[mode] = result
+
+        structured = self._structured_result(user_query, kg_builder)
+        if structured is not None:
+            contexts["structured"] = structured
+
+        return contexts
+
+    def _query_mode(
+        self,
+        kg_builder,
+        user_query: str,
+        mode: str,
+        sources: Optional[Tuple[str, ...]] = None
+    ) -> Dict[str, Any]:
+        """
+        Retrieve nodes and triplets for one mode from ``kg_builder``, in the
+        configured RETRIEVAL_STYLE.
+        """
+        if RETRIEVAL_STYLE == "synthesized":
+            return self._synthesized_result(
+                mode, kg_builder.query_graph(user_query, mode, sources=sources))
+        return kg_builder.retrieve_nodes(user_query, mode, sources=sources)
 
-        # Add nodes
-        workflow.add_node("extract_query", extract_query)
-        workflow.add_node("retrieve_context", retrieve_context)
-        workflow.add_node("generate_response", generate_response)
+    async def _aquery_mode(
+        self,
+        kg_builder,
+        user_query: str,
+        mode: str,
+        sources: Optional[Tuple[str, ...]] = None
+    ) -> Dict[str, Any]:
+        """Async variant of _query_mode()."""
+        if RETRIEVAL_STYLE == "synthesized":
+            return self._synthesized_result(
+                mode, await kg_builder.aquery_graph(user_query, mode, sources=sources))
+        return await kg_builder.aretrieve_nodes(user_query, mode, sources=sources)
 
-        # Add edges
-        workflow.set_entry_point("extract_query")
-        workflow.add_edge("extract_query", "retrieve_context")
-        workflow.add_edge("retrieve_context", "generate_response")
-        workflow.add_edge("generate_response", END)
+    @staticmethod
+    def _synthesized_result(mode: str, answer: str) -> Dict[str, Any]:
+        """Wrap a query engine's answer in the shape retrieve_nodes() returns."""
+        if not answer or answer == EMPTY_QUERY_RESPONSE:
+            return {"nodes": [], "triplets": []}
+        return {
+            "nodes": [{
+                "node_id": f"{mode}-answer",
+                "text": answer,
+                "score": 1.0,
+                "metadata": {"source": RETRIEVAL_MODES[mode]},
+                "retriever": mode
+            }],
+            "triplets": []
+        }
+
+    def _build_generation_messages(self, state: ConversationState) -> List:
+        """Build the system and user messages sent to the LLM for generation."""
+        formatted_prompt = format_context_prompt(
+            context=state["retrieved_context"],
+            conversation_history=state.get("conversation_history", []),
+            user_query=state["user_query"],
+            history_summary=state.get("history_summary", ""),
+            # History was already fitted to the token budget
+            max_history_messages=None
+        )
 
-        # Compile the workflow
-        self.workflow = workflow.compile()
+        return [
+            SystemMessage(content=SYSTEM_PROMPT),
+            HumanMessage(content=formatted_prompt)
+        ]
 
     async def process_message(
         self,
         message: str,
-        conversation_history: List[Dict[str, str]] = None
+        conversation_history: List[Dict[str, str]] = None,
+        conversation_id: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Process a user message through the LangGraph workflow."""
+        """
+        Process a user message through the LangGraph workflow.
+
+        With a known ``conversation_id`` the history is read from the session
+        store and ``conversation_history`` can be left empty. Otherwise a new
+        session is started, seeded with any history the client sent.
+        """
 
         if not self.ready:
             raise RuntimeError(
                 "NadavBot is not initialized. Call initialize() first.")
 
-        if conversation_history is None:
-            conversation_history = []
+        conversation_id, conversation_history = await self._resolve_session(
+            conversation_id, conversation_history)
+        conversation_history, history_summary = await self.history_budgeter.fit(
+            conversation_id, conversation_history)
 
-        # Create initial state
-        initial_state = ConversationState(
-            messages=[HumanMessage(content=message)],
-            user_query="",
-            retrieved_context="",
-            conversation_history=conversation_history,
-            response="",
-            sources=[],
-            conversation_id=self._generate_conversation_id()
-        )
+        def answer():
+            return self._answer(
+                message, conversation_history, conversation_id, history_summary)
 
         try:
-            # Run the workflow
-            result = await asyncio.get_event_loop().run_in_executor(
-                None,
-                self.workflow.invoke,
-                initial_state
-            )
+            if SINGLE_FLIGHT:
+                result = await self.single_flight.run(
+                    request_key(message, conversation_history, history_summary), answer)
+            else:
+                result = await answer()
+
+            await self._record_turn(conversation_id, message, result["response"])
 
             return {
                 "response": result["response"],
                 "sources": result["sources"],
-                "conversation_id": result["conversation_id"]
+                "conversation_id": conversation_id
             }
 
         except Exception as e:
@@ -217,9 +764,296 @@ class NadavBotRunner:
             return {
                 "response": "I apologize, but I encountered an error processing your message. Please try again.",
                 "sources": [],
-                "conversation_id": self._generate_conversation_id()
+                "conversation_id": conversation_id
+            }
+
+    async def _answer(
+        self,
+        message: str,
+        conversation_history: List[Dict[str, str]],
+        conversation_id: str,
+        history_summary: str
+    ) -> Dict[str, Any]:
+        """Response and sources for one turn, from the cache or the workflow."""
+        cache_lookup = await self._lookup_response_cache(
+            message, conversation_history)
+        if cache_lookup.response is not None:
+            return cache_lookup.response
+
+        initial_state = self._initial_state(
+            message, conversation_history, conversation_id, history_summary)
+        result = await self._run_workflow(
+            self.async_workflow, self.workflow, initial_state)
+
+        self._cache_response(
+            cache_lookup, result["response"], result["sources"])
+        return {"response": result["response"], "sources": result["sources"]}
+
+    async def stream_message(
+        self,
+        message: str,
+        conversation_history: List[Dict[str, str]] = None,
+        conversation_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a user message and yield response frames as they are produced.
+
+        Yields {"type": "token", "content": ...} for each chunk from the LLM,
+        followed by a single {"type": "done", "sources": ..., "conversation_id": ...}
+        frame, or {"type": "error", ...} if generation fails part way through.
+        Sessions and request coalescing work as in process_message().
+        """
+
+        if not self.ready:
+            raise RuntimeError(
+                "NadavBot is not initialized. Call initialize() first.")
+
+        conversation_id, conversation_history = await self._resolve_session(
+            conversation_id, conversation_history)
+        conversation_history, history_summary = await self.history_budgeter.fit(
+            conversation_id, conversation_history)
+
+        def answer_stream():
+            return self._answer_stream(
+                message, conversation_history, conversation_id, history_summary)
+
+        try:
+            if SINGLE_FLIGHT:
+                # Identical concurrent requests share one generation; each
+                # caller still gets every token from the first one
+                frames = self.single_flight.stream(
+                    request_key(message, conversation_history, history_summary),
+                    answer_stream)
+            else:
+                frames = answer_stream()
+
+            chunks = []
+            async for frame in frames:
+                if frame["type"] == "token":
+                    chunks.append(frame["content"])
+                    yield frame
+                    continue
+
+                await self._record_turn(conversation_id, message, "".join(chunks))
+                yield {**frame, "conversation_id": conversation_id}
+
+        except Exception as e:
+            print(f"Error streaming message: {e}")
+            yield {
+                "type": "error",
+                "response": "I apologize, but I encountered an error processing your message. Please try again.",
+                "conversation_id": conversation_id
             }
 
+    async def _answer_stream(
+        self,
+        message: str,
+        conversation_history: List[Dict[str, str]],
+        conversation_id: str,
+        history_summary: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Token frames and a final {"type": "done", "sources": ...} frame for one
+        turn, from the cache or the retrieval workflow and a streamed generation.
+        """
+        cache_lookup = await self._lookup_response_cache(
+            message, conversation_history)
+        if cache_lookup.response is not None:
+            yield {"type": "token", "content": cache_lookup.response["response"]}
+            yield {"type": "done", "sources": cache_lookup.response["sources"]}
+            return
+
+        initial_state = self._initial_state(
+            message, conversation_history, conversation_id, history_summary)
+
+        # Retrieval still goes through the LangGraph workflow
+        state = await self._run_workflow(
+            self.async_retrieval_workflow, self.retrieval_workflow, initial_state)
+
+        chunks = []
+        async for chunk in self.llm.astream(self._build_generation_messages(state)):
+            if chunk.content:
+                chunks.append(chunk.content)
+                yield {"type": "token", "content": chunk.content}
+
+        self._cache_response(cache_lookup, "".join(chunks), state["sources"])
+        yield {"type": "done", "sources": state["sources"]}
+
+    async def _session_call(self, fn, *args):
+        """Run a session store call in the default executor; SQLite reads and commits block."""
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def _resolve_session(
+        self,
+        conversation_id: Optional[str],
+        conversation_history: Optional[List[Dict[str, str]]]
+    ) -> Tuple[str, List[Dict[str, str]]]:
+        """Return the conversation ID and the history to use for this turn."""
+        if conversation_id:
+            stored_history = await self._session_call(
+                self.session_store.get, conversation_id)
+            if stored_history is not None:
+                return conversation_id, stored_history
+
+        # New (or expired) session: seed it with whatever the client sent
+        conversation_id = conversation_id or self._generate_conversation_id()
+        conversation_history = conversation_history or []
+        if conversation_history:
+            await self._session_call(
+                self.session_store.append, conversation_id, conversation_history)
+
+        return conversation_id, conversation_history
+
+    async def _summarize_history(
+        self,
+        previous_summary: str,
+        messages: List[Dict[str, str]]
+    ) -> str:
+        """Fold messages that fell out of the history budget into the summary."""
+        try:
+            response = await self.llm.ainvoke([
+                HumanMessage(content=format_summary_prompt(previous_summary, messages))
+            ])
+            return response.content
+        except Exception as e:
+            print(f"Error summarizing conversation history: {e}")
+            return previous_summary
+
+    async def _record_turn(self, conversation_id: str, message: str, response: str):
+        """
+        Append the user message and the reply to the session history, then
+        fold anything that fell out of the history budget into the summary in
+        the background, off this request's path.
+        """
+        await self._session_call(self.session_store.append, conversation_id, [
+            {"role": "user", "content": message},
+            {"role": "assistant", "content": response}
+        ])
+
+        history = await self._session_call(self.session_store.get, conversation_id) or []
+        task = asyncio.get_running_loop().create_task(
+            self.history_budgeter.update(conversation_id, history))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _lookup_response_cache(
+        self,
+        message: str,
+        conversation_history: List[Dict[str, str]]
+    ):
+        """Look up the response cache without blocking the event loop."""
+        if self.use_async_workflow:
+            return await self.response_cache.alookup(message, conversation_history)
+
+        return await asyncio.get_event_loop().run_in_executor(
+            None,
+            self.response_cache.lookup,
+            message,
+            conversation_history
+        )
+
+    async def _run_workflow(self, async_workflow, sync_workflow, state: ConversationState):
+        """Run a workflow natively with ainvoke() or on the default executor."""
+        if self.use_async_workflow:
+            return await async_workflow.ainvoke(state)
+
+        return await asyncio.get_event_loop().run_in_executor(
+            None, sync_workflow.invoke, state)
+
+    async def warm_up(
+        self,
+        prompts: Optional[List[str]] = None,
+        budget_seconds: float = WARMUP_BUDGET_SECONDS,
+        max_prompts: int = WARMUP_MAX_PROMPTS,
+        full_answers: bool = WARMUP_FULL_ANSWERS
+    ):
+        """
+        Precompute retrieval context, and optionally full answers, for canned prompts.
+
+        Prompts are processed one at a time so warm-up never competes with live
+        traffic for more than one worker thread. No new prompt is started once
+        the time budget is spent.
+        """
+        if not self.ready:
+            return
+
+        prompts = (prompts if prompts is not None else get_canned_prompts())[:max_prompts]
+        workflow = self.workflow if full_answers else self.retrieval_workflow
+        loop = asyncio.get_event_loop()
+        start = time.monotonic()
+
+        self.warmup_status = {
+            "state": "running",
+            "total": len(prompts),
+            "completed": 0,
+            "full_answers": full_answers
+        }
+
+        for prompt in prompts:
+            if time.monotonic() - start > budget_seconds:
+                self.warmup_status["state"] = "budget_exhausted"
+                break
+
+            try:
+                cache_lookup = await loop.run_in_executor(
+                    None, self.response_cache.lookup, prompt, [])
+                if cache_lookup.response is not None:
+                    self.warmup_status["completed"] += 1
+                    continue
+
+                result = await loop.run_in_executor(
+                    None,
+                    workflow.invoke,
+                    self._initial_state(prompt, [], "")
+                )
+
+                if result["sources"]:
+                    self.precomputed_contexts[normalize_query(prompt)] = {
+                        "retrieved_context": result["retrieved_context"],
+                        "sources": result["sources"]
+                    }
+                if full_answers:
+                    self._cache_response(
+                        cache_lookup, result["response"], result["sources"])
+
+                self.warmup_status["completed"] += 1
+
+            except Exception as e:
+                print(f"Error warming up prompt '{prompt}': {e}")
+
+        if self.warmup_status["state"] == "running":
+            self.warmup_status["state"] = "complete"
+        self.warmup_status["seconds"] = round(time.monotonic() - start, 3)
+        print(f"Warm-up finished: {self.warmup_status}")
+
+    def _initial_state(
+        self,
+        message: str,
+        conversation_history: List[Dict[str, str]],
+        conversation_id: str,
+        history_summary: str = ""
+    ) -> ConversationState:
+        """Create the starting workflow state for a user message."""
+        return ConversationState(
+            messages=[HumanMessage(content=message)],
+            user_query="",
+            retrieved_context="",
+            intent="",
+            conversation_history=conversation_history,
+            history_summary=history_summary,
+            response="",
+            sources=[],
+            conversation_id=conversation_id
+        )
+
+    def _cache_response(self, cache_lookup, response: str, sources: List[str]):
+        """Store a response unless it came from a retrieval or generation fallback."""
+        if not sources or not response or response == GENERATION_ERROR_RESPONSE:
+            return
+
+        self.response_cache.store(
+            cache_lookup, {"response": response, "sources": sources})
+
     def is_ready(self) -> bool:
         """Check if the runner is ready to process messages."""
         return self.ready and self.kg_builder is not None and self.workflow is not None
@@ -228,17 +1062,53 @@ class NadavBotRunner:
         """Get debug information about the current state."""
         return {
             "ready": self.ready,
+            "state": self.state,
+            "process": process_memory_stats(),
+            "error": self.state_error,
+            "startup_timings": {
+                step: round(seconds, 3)
+                for step, seconds in self.startup_timings.items()
+            },
             "kg_builder_initialized": self.kg_builder is not None,
             "workflow_built": self.workflow is not None,
+            "retrieval_style": RETRIEVAL_STYLE,
             "indices_loaded": (
                 self.kg_builder.kg_index is not None and
                 self.kg_builder.vector_index is not None
-            ) if self.kg_builder else False
+            ) if self.kg_builder else False,
+            "query_engines": (
+                self.kg_builder.get_query_engine_stats()
+                if self.kg_builder else None
+            ),
+            "structured_index": (
+                self.kg_builder.structured_index.get_stats()
+                if self.kg_builder and self.kg_builder.structured_index else None
+            ),
+            "embedding_cache": (
+                self.kg_builder.embedding_cache.get_stats()
+                if self.kg_builder else None
+            ),
+            "sessions": self.session_store.get_stats(),
+            "history_budget": self.history_budgeter.get_stats(),
+            "context_packing": self.context_packer.get_stats(),
+            "response_cache": (
+                self.response_cache.get_stats()
+                if self.response_cache else None
+            ),
+            "single_flight": self.single_flight.get_stats(),
+            "hot_reload": (
+                self.index_reloader.get_stats()
+                if self.index_reloader else None
+            ),
+            "warmup": {
+                **self.warmup_status,
+                "precomputed_contexts": len(self.precomputed_contexts)
+            }
         }
 
     def _generate_conversation_id(self) -> str:
         """Generate a unique conversation ID."""
-        return f"conv_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        return f"conv_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
 
 # Example usage for testing
 
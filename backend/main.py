@@ -3,15 +3,25 @@ FastAPI backend for NadavBot Portfolio
 Integrates with LangGraph for conversational AI functionality.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+import asyncio
+import importlib
+import json
 import os
+import time
 from dotenv import load_dotenv
 
-from langgraph_runner import NadavBotRunner
-from prompt_templates import SYSTEM_PROMPT, format_context_prompt
+from admission import AdmissionController, AdmissionRejected, AdmissionTicket
+from prompt_templates import (
+    SYSTEM_PROMPT,
+    format_context_prompt,
+    get_starter_prompts,
+    get_info_example_questions
+)
 
 # Load environment variables
 load_dotenv()
@@ -34,6 +44,22 @@ app.add_middleware(
 # Global chatbot runner instance
 chatbot_runner = None
 
+# /chat and /chat/stream admission control: concurrent requests, then a bounded wait queue
+# shared fairly between clients, with a deadline on time spent queued
+admission = AdmissionController(
+    max_concurrent=int(os.getenv("NADAVBOT_CHAT_MAX_CONCURRENT", "8")),
+    max_queue=int(os.getenv("NADAVBOT_CHAT_QUEUE_SIZE", "32")),
+    max_queue_per_client=int(os.getenv("NADAVBOT_CHAT_QUEUE_PER_CLIENT", "4")),
+    queue_timeout_seconds=float(os.getenv("NADAVBOT_CHAT_QUEUE_TIMEOUT", "10"))
+)
+
+# Startup progress before the runner exists: not_configured | importing | failed
+startup_state = "not_configured"
+startup_error: Optional[str] = None
+# Held so the background initialization is not garbage collected mid-run and
+# can be cancelled on shutdown
+startup_task: Optional[asyncio.Task] = None
+
 
 class ChatMessage(BaseModel):
     role: str  # "user" or "assistant"
@@ -43,6 +69,10 @@ class ChatMessage(BaseModel):
 
 class ChatRequest(BaseModel):
     message: str
+    # With a known conversation_id the stored history is used and
+    # conversation_history is ignored; otherwise it seeds the new session, so
+    # clients can send a short tail to recover from a lost session
+    conversation_id: Optional[str] = None
     conversation_history: List[ChatMessage] = []
 
 
@@ -55,23 +85,64 @@ class ChatResponse(BaseModel):
 class HealthResponse(BaseModel):
     status: str
     message: str
+    state: Optional[str] = None
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize the chatbot runner on startup."""
-    global chatbot_runner
+    """Start initializing the chatbot runner without blocking startup."""
+    global startup_task
 
     # Check for required environment variables
     if not os.getenv("OPENAI_API_KEY"):
         print("Warning: OPENAI_API_KEY not found. Chatbot functionality will be limited.")
         return
 
+    # The server starts listening right away; /health reports progress
+    startup_task = asyncio.get_running_loop().create_task(initialize_chatbot())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Cancel an unfinished initialization and stop watching the data directory."""
+    global startup_task
+
+    if startup_task is not None:
+        startup_task.cancel()
+        try:
+            await startup_task
+        except asyncio.CancelledError:
+            pass
+        startup_task = None
+
+    if chatbot_runner and chatbot_runner.index_reloader:
+        await chatbot_runner.index_reloader.stop()
+
+
+async def initialize_chatbot():
+    """Import, initialize and warm up the chatbot runner in the background."""
+    global chatbot_runner, startup_state, startup_error
+
+    loop = asyncio.get_running_loop()
+    startup_state = "importing"
+
     try:
-        chatbot_runner = NadavBotRunner()
+        # LangChain/LangGraph imports are slow, so load them off the event loop
+        start = time.perf_counter()
+        runner_module = await loop.run_in_executor(
+            None, importlib.import_module, "langgraph_runner")
+        import_seconds = time.perf_counter() - start
+
+        chatbot_runner = runner_module.NadavBotRunner()
+        chatbot_runner.startup_timings["import_runner"] = import_seconds
         await chatbot_runner.initialize()
         print("NadavBot initialized successfully!")
+
+        # Precompute canned prompts in the background; /health is already ready
+        await chatbot_runner.warm_up()
     except Exception as e:
+        startup_state = "failed"
+        startup_error = str(e)
         print(f"Failed to initialize NadavBot: {e}")
 
 
@@ -87,25 +158,30 @@ async def root():
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Detailed health check including chatbot status."""
-    global chatbot_runner
+    state = chatbot_runner.state if chatbot_runner else startup_state
 
     if chatbot_runner and chatbot_runner.is_ready():
         return HealthResponse(
             status="healthy",
-            message="NadavBot API and chatbot are ready!"
+            message="NadavBot API and chatbot are ready!",
+            state=state
+        )
+    elif state in ("importing", "pending", "loading", "building", "waiting_for_indices"):
+        return HealthResponse(
+            status="starting",
+            message=f"API is running; chatbot is {state}",
+            state=state
         )
     else:
         return HealthResponse(
             status="degraded",
-            message="API is running but chatbot is not initialized"
+            message="API is running but chatbot is not initialized",
+            state=state
         )
 
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest):
-    """Main chat endpoint for conversing with NadavBot."""
-    global chatbot_runner
-
+def _require_ready_runner():
+    """Raise a 503 unless the chatbot runner can take requests."""
     if not chatbot_runner:
         raise HTTPException(
             status_code=503,
@@ -118,25 +194,117 @@ async def chat_endpoint(request: ChatRequest):
             detail="Chatbot is not ready. Please try again in a moment."
         )
 
-    try:
-        # Process the chat request through LangGraph
-        response = await chatbot_runner.process_message(
-            message=request.message,
-            conversation_history=request.conversation_history
-        )
 
-        return ChatResponse(
-            response=response["response"],
-            sources=response.get("sources", []),
-            conversation_id=response.get("conversation_id")
-        )
+def _client_key(http_request: Request) -> str:
+    """
+    Identify the caller for fair queueing. X-Forwarded-For is not read here,
+    since any client can set it; behind a reverse proxy, uvicorn's
+    --proxy-headers with --forwarded-allow-ips set to the proxy's address
+    rewrites the client address from that header for trusted hops only.
+    """
+    return http_request.client.host if http_request.client else "unknown"
+
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(http_request: Request, exc: AdmissionRejected):
+    """Turn a rejected chat request into a fast 429/503 with Retry-After."""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": "NadavBot is busy right now. Please try again shortly.",
+                 "reason": exc.reason},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
 
-    except Exception as e:
-        print(f"Error processing chat request: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error processing your message: {str(e)}"
-        )
+
+def _history_as_dicts(history: List[ChatMessage]) -> List[Dict[str, str]]:
+    """Convert request history models to the plain dicts the runner expects."""
+    return [{"role": msg.role, "content": msg.content} for msg in history]
+
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat_endpoint(request: ChatRequest, http_request: Request):
+    """Main chat endpoint for conversing with NadavBot."""
+    _require_ready_runner()
+
+    async with admission.slot(_client_key(http_request)):
+        try:
+            # Process the chat request through LangGraph
+            response = await chatbot_runner.process_message(
+                message=request.message,
+                conversation_history=_history_as_dicts(request.conversation_history),
+                conversation_id=request.conversation_id
+            )
+
+            return ChatResponse(
+                response=response["response"],
+                sources=response.get("sources", []),
+                conversation_id=response.get("conversation_id")
+            )
+
+        except Exception as e:
+            print(f"Error processing chat request: {e}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error processing your message: {str(e)}"
+            )
+
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest, http_request: Request):
+    """
+    Streaming chat endpoint.
+
+    Responds with newline-delimited JSON: one {"type": "token"} frame per chunk
+    from the LLM, then a final {"type": "done"} frame carrying sources and
+    conversation_id.
+    """
+    _require_ready_runner()
+
+    # Admit before the response starts, so a rejection is still a plain
+    # 429/503; the slot is held until the last frame has been sent
+    ticket = await admission.admit(_client_key(http_request))
+    if await http_request.is_disconnected():
+        # Gave up while queued; nobody is left to stream to
+        ticket.release()
+        return Response(status_code=499)
+
+    async def frame_stream():
+        try:
+            async for frame in chatbot_runner.stream_message(
+                message=request.message,
+                conversation_history=_history_as_dicts(request.conversation_history),
+                conversation_id=request.conversation_id
+            ):
+                yield json.dumps(frame) + "\n"
+        finally:
+            ticket.release()
+
+    return AdmittedStreamingResponse(
+        frame_stream(),
+        ticket,
+        media_type="application/x-ndjson",
+        # Stop reverse proxies from buffering the whole body
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that returns its admission slot when the response ends.
+    The body generator's own finally never runs if the client disconnects
+    before the first frame, or the response is cancelled, so the slot is
+    released here as well; the ticket frees it only once.
+    """
+
+    def __init__(self, content, ticket: AdmissionTicket, **kwargs):
+        super().__init__(content, **kwargs)
+        self.ticket = ticket
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.ticket.release()
 
 
 @app.get("/info")
@@ -151,14 +319,7 @@ async def get_bot_info():
             "Discuss technical expertise and career timeline",
             "Share insights about values and working style"
         ],
-        "example_questions": [
-            "What are Nadav's main technical skills?",
-            "Tell me about Nadav's AI projects",
-            "What technologies does Nadav use for frontend development?",
-            "When did Nadav start working with AI?",
-            "What's Nadav's experience with React?",
-            "Tell me about Nadav's recent projects"
-        ],
+        "example_questions": get_info_example_questions(),
         "limitations": [
             "Only provides information about Nadav",
             "Cannot answer general questions unrelated to Nadav",
@@ -171,16 +332,7 @@ async def get_bot_info():
 async def get_conversation_starters():
     """Get suggested conversation starters."""
     return {
-        "starters": [
-            "Hi! Tell me about yourself.",
-            "What are your core technical skills?",
-            "Show me your most recent projects.",
-            "What's your experience with AI and machine learning?",
-            "How do you approach full-stack development?",
-            "What technologies do you prefer to work with?",
-            "Tell me about your career journey.",
-            "What are you passionate about in tech?"
-        ]
+        "starters": get_starter_prompts()
     }
 
 
@@ -190,16 +342,69 @@ async def debug_graph_status():
     global chatbot_runner
 
     if not chatbot_runner:
-        return {"status": "not_initialized", "error": "Chatbot runner not created"}
+        return {
+            "status": "not_initialized",
+            "state": startup_state,
+            "error": startup_error or "Chatbot runner not created"
+        }
 
     return chatbot_runner.get_debug_info()
 
-if __name__ == "__main__":
+
+@app.get("/debug/admission")
+async def debug_admission():
+    """Queue depth, wait times and rejection counts for /chat."""
+    return admission.get_stats()
+
+
+def serve(workers: int = 1, host: str = "0.0.0.0", port: int = 8000):
+    """
+    Run the API server.
+
+    One worker reloads on code changes, for development. With several
+    workers the indices are loaded once rather than once per copy: every
+    worker memory-maps the same persisted snapshot, so embeddings and node
+    text are shared through the page cache. Only one process may then write
+    storage/, so a single ``graph/build_graph.py --watch`` process rebuilds
+    on data changes and the workers follow the snapshots it persists.
+    Workers wait for its first build if there are no indices yet, and keep
+    conversation sessions in the shared SQLite store.
+    """
+    import subprocess
+    import sys
+    from pathlib import Path
+
     import uvicorn
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
+
+    if workers <= 1:
+        uvicorn.run("main:app", host=host, port=port, reload=True, log_level="info")
+        return
+
+    os.environ.setdefault("NADAVBOT_HOT_RELOAD", "follow")
+    os.environ.setdefault("NADAVBOT_EMBED_CACHE_READ_ONLY", "true")
+    # Each request may land on a different worker, so sessions must be shared
+    os.environ.setdefault("NADAVBOT_SESSION_BACKEND", "sqlite")
+
+    builder = None
+    if os.environ["NADAVBOT_HOT_RELOAD"] == "follow":
+        root = Path(__file__).parent.parent
+        builder = subprocess.Popen(
+            [
+                sys.executable, str(root / "graph" / "build_graph.py"), "--incremental",
+                "--watch", os.getenv("NADAVBOT_HOT_RELOAD_INTERVAL", "5")
+            ],
+            cwd=str(root),
+            # The builder writes the cache the workers only read
+            env={**os.environ, "NADAVBOT_EMBED_CACHE_READ_ONLY": "false"}
+        )
+
+    try:
+        uvicorn.run("main:app", host=host, port=port, workers=workers, log_level="info")
+    finally:
+        if builder is not None:
+            builder.terminate()
+            builder.wait()
+
+
+if __name__ == "__main__":
+    serve(workers=int(os.getenv("NADAVBOT_WORKERS", "1")))
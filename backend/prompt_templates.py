@@ -2,7 +2,8 @@
 Prompt templates and formatting utilities for NadavBot.
 """
 
-from typing import List, Dict, Any
+import re
+from typing import List, Dict, Any, Optional
 
 SYSTEM_PROMPT = """You are NadavBot, an AI assistant representing Nadav, a skilled software engineer and AI enthusiast.
 
@@ -38,14 +39,17 @@ RESPONSE STYLE:
 def format_context_prompt(
     context: str,
     conversation_history: List[Dict[str, str]],
-    user_query: str
+    user_query: str,
+    history_summary: str = "",
+    max_history_messages: Optional[int] = 6
 ) -> str:
     """
     Format the final prompt with context, conversation history, and current query.
     """
 
     # Format conversation history
-    history_text = format_conversation_history(conversation_history)
+    history_text = format_conversation_history(
+        conversation_history, history_summary, max_history_messages)
 
     prompt = f"""RELEVANT CONTEXT FROM NADAV'S PORTFOLIO:
 {context}
@@ -60,18 +64,27 @@ Please respond as Nadav, using the context provided above. Stay in character and
     return prompt
 
 
-def format_conversation_history(conversation_history: List[Dict[str, str]]) -> str:
+def format_conversation_history(
+    conversation_history: List[Dict[str, str]],
+    history_summary: str = "",
+    max_messages: Optional[int] = 6
+) -> str:
     """
     Format conversation history for inclusion in prompts.
+    Pass max_messages=None when the history has already been trimmed to a token budget.
     """
-    if not conversation_history:
+    if not conversation_history and not history_summary:
         return "CONVERSATION HISTORY:\n(This is the start of our conversation)\n"
 
     history_text = "CONVERSATION HISTORY:\n"
 
-    # Only include last 6 messages (3 exchanges) to keep context manageable
-    recent_history = conversation_history[-6:] if len(
-        conversation_history) > 6 else conversation_history
+    if history_summary:
+        history_text += f"Summary of earlier conversation: {history_summary}\n"
+
+    # By default only include last 6 messages (3 exchanges) to keep context manageable
+    recent_history = conversation_history
+    if max_messages is not None and len(conversation_history) > max_messages:
+        recent_history = conversation_history[-max_messages:]
 
     for message in recent_history:
         role = message["role"]
@@ -86,6 +99,44 @@ def format_conversation_history(conversation_history: List[Dict[str, str]]) -> s
     return history_text
 
 
+def format_summary_prompt(previous_summary: str, messages: List[Dict[str, str]]) -> str:
+    """
+    Format the prompt that folds older messages into the rolling conversation summary.
+    """
+    transcript = "\n".join(
+        f"{'User' if message['role'] == 'user' else 'Nadav'}: {message['content']}"
+        for message in messages
+    )
+
+    return f"""Update the running summary of a conversation between a visitor and Nadav's portfolio assistant.
+
+CURRENT SUMMARY:
+{previous_summary or "(none yet)"}
+
+NEW MESSAGES TO FOLD IN:
+{transcript}
+
+Write the updated summary in at most 120 words. Keep the topics the visitor asked about and any facts already given, and drop small talk."""
+
+
+def format_retrieved_nodes(retrieval: Dict[str, Any]) -> str:
+    """
+    Format raw retrieval results (structured facts, graph triplets and scored
+    chunks) as prompt context. Returns an empty string when nothing was retrieved.
+    """
+    lines = [f"[fact] {fact}" for fact in retrieval.get("facts", [])]
+
+    for subject, relation, obj in retrieval.get("triplets", []):
+        lines.append(f"- {subject} -> {relation} -> {obj}")
+
+    for node in retrieval.get("nodes", []):
+        metadata = node["metadata"]
+        label = metadata.get("project_name") or metadata.get("source") or "document"
+        lines.append(f"[{label}] {node['text'].strip()}")
+
+    return "\n".join(lines)
+
+
 def get_greeting_prompt() -> str:
     """
     Get a prompt for generating a greeting message.
@@ -111,6 +162,48 @@ def get_example_questions() -> List[str]:
     ]
 
 
+def get_starter_prompts() -> List[str]:
+    """
+    Get the suggested conversation starters shown in the UI.
+    """
+    return [
+        "Hi! Tell me about yourself.",
+        "What are your core technical skills?",
+        "Show me your most recent projects.",
+        "What's your experience with AI and machine learning?",
+        "How do you approach full-stack development?",
+        "What technologies do you prefer to work with?",
+        "Tell me about your career journey.",
+        "What are you passionate about in tech?"
+    ]
+
+
+def get_info_example_questions() -> List[str]:
+    """
+    Get the example questions advertised by the /info endpoint.
+    """
+    return [
+        "What are Nadav's main technical skills?",
+        "Tell me about Nadav's AI projects",
+        "What technologies does Nadav use for frontend development?",
+        "When did Nadav start working with AI?",
+        "What's Nadav's experience with React?",
+        "Tell me about Nadav's recent projects"
+    ]
+
+
+def get_canned_prompts() -> List[str]:
+    """
+    Get every prompt the UI offers ahead of time, without duplicates.
+    Starters come first since they are the most likely to be clicked.
+    """
+    prompts = []
+    for prompt in get_starter_prompts() + get_info_example_questions() + get_example_questions():
+        if prompt not in prompts:
+            prompts.append(prompt)
+    return prompts
+
+
 def format_error_response(error_type: str = "general") -> str:
     """
     Format error responses in character.
@@ -128,37 +221,48 @@ def format_error_response(error_type: str = "general") -> str:
 def should_use_context(user_query: str) -> bool:
     """
     Determine if a user query requires context retrieval.
-    Simple keyword-based approach for now.
+    Only a bare greeting ("hi", "hello there", "hey Nadav!") skips it; the
+    greeting words are matched as whole words, so "Which projects?" retrieves.
     """
-    greeting_keywords = ["hi", "hello", "hey", "greetings"]
-    query_lower = user_query.lower().strip()
+    greeting_keywords = {"hi", "hello", "hey", "greetings", "hiya", "howdy"}
+    filler_words = {"there", "nadav", "nadavbot", "all", "everyone", "again"}
+    words = re.findall(r"[a-z]+", user_query.lower())
 
     # If it's just a greeting, we might not need heavy context retrieval
-    if any(keyword in query_lower for keyword in greeting_keywords) and len(query_lower.split()) <= 3:
+    if (words and len(words) <= 3 and greeting_keywords.intersection(words)
+            and all(word in greeting_keywords | filler_words for word in words)):
         return False
 
     return True
 
 
+def _mentions_any(query_lower: str, keywords: list) -> bool:
+    """Whole-word (or whole-phrase) match, allowing a plural "s"."""
+    pattern = r"\b(?:" + "|".join(re.escape(keyword) for keyword in keywords) + r")s?\b"
+    return re.search(pattern, query_lower) is not None
+
+
 def extract_intent(user_query: str) -> str:
     """
     Extract the likely intent from a user query.
+    Keywords are matched as whole words, so "quickly" is not "ui" and
+    "fintech" is not "tech".
     """
     query_lower = user_query.lower()
 
-    if any(word in query_lower for word in ["skill", "technology", "tech", "programming", "language"]):
+    if _mentions_any(query_lower, ["skill", "technology", "technologies", "tech", "programming", "language"]):
         return "skills"
-    elif any(word in query_lower for word in ["project", "work", "built", "developed", "created"]):
+    elif _mentions_any(query_lower, ["project", "work", "build", "built", "developed", "created"]):
         return "projects"
-    elif any(word in query_lower for word in ["experience", "career", "job", "work", "timeline"]):
+    elif _mentions_any(query_lower, ["experience", "career", "job", "work", "timeline"]):
         return "experience"
-    elif any(word in query_lower for word in ["ai", "machine learning", "ml", "artificial intelligence"]):
+    elif _mentions_any(query_lower, ["ai", "machine learning", "ml", "artificial intelligence"]):
         return "ai"
-    elif any(word in query_lower for word in ["frontend", "react", "javascript", "ui", "interface"]):
+    elif _mentions_any(query_lower, ["frontend", "react", "javascript", "ui", "interface"]):
         return "frontend"
-    elif any(word in query_lower for word in ["backend", "api", "server", "database"]):
+    elif _mentions_any(query_lower, ["backend", "api", "server", "database"]):
         return "backend"
-    elif any(word in query_lower for word in ["hello", "hi", "hey", "intro", "about"]):
+    elif _mentions_any(query_lower, ["hello", "hi", "hey", "intro", "about"]):
         return "greeting"
     else:
         return "general"
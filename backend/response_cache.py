@@ -0,0 +1,304 @@
+"""
+Response cache for NadavBot.
+Serves repeated questions without running the retrieval and generation workflow.
+"""
+
+import hashlib
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+from graph.data_watch import data_fingerprint  # noqa: E402
+
+
+@dataclass
+class CacheLookup:
+    """Result of a cache lookup, reused when storing the computed response."""
+    key: str
+    history_fingerprint: str
+    response: Optional[Dict[str, Any]] = None
+    embedding: Optional[List[float]] = None
+    match: str = "miss"  # "exact", "semantic" or "miss"
+
+
+@dataclass
+class _CacheEntry:
+    response: Dict[str, Any]
+    history_fingerprint: str
+    # Row of the entry's normalized query embedding in ResponseCache._vectors
+    row: Optional[int]
+    created_at: float
+
+
+def normalize_query(query: str) -> str:
+    """
+    Lowercase, drop punctuation and collapse whitespace. "+" and "#" are kept,
+    so questions about C++, C# and C stay distinct.
+    """
+    query = re.sub(r"[^\w\s+#]", " ", query.lower())
+    return " ".join(query.split())
+
+
+def _normalized(embedding: List[float]) -> Optional[np.ndarray]:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else None
+
+
+class ResponseCache:
+    """
+    Two-level response cache with TTL and LRU eviction.
+
+    Lookups first try an exact match on the normalized query plus a fingerprint
+    of the recent conversation history. On a miss, and if an embedding function
+    is configured, the query embedding is compared against cached entries that
+    share the same history fingerprint and the closest one above the similarity
+    threshold is returned. Embeddings are kept as rows of one normalized
+    matrix, so this is a single matrix-vector product.
+
+    The whole cache is cleared when any file under ``watch_dir`` changes.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 256,
+        ttl_seconds: float = 3600.0,
+        similarity_threshold: float = 0.95,
+        history_window: int = 2,
+        embed_fn: Optional[Callable[[str], List[float]]] = None,
+        aembed_fn: Optional[Callable[[str], Awaitable[List[float]]]] = None,
+        watch_dir: Optional[Path] = None,
+        watch_interval_seconds: float = 2.0
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.history_window = history_window
+        self.embed_fn = embed_fn
+        self.aembed_fn = aembed_fn
+        self.watch_dir = Path(watch_dir) if watch_dir else None
+        self.watch_interval_seconds = watch_interval_seconds
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._vectors: Optional[np.ndarray] = None  # (max_size, dim), allocated on first store
+        self._row_keys: List[Optional[str]] = [None] * max_size
+        self._free_rows = list(range(max_size - 1, -1, -1))
+        self._lock = threading.Lock()
+        self._data_fingerprint = data_fingerprint(self.watch_dir) if self.watch_dir else None
+        self._last_watch_check = time.monotonic()
+        self._clear_listeners: List[Callable[[], None]] = []
+
+        self.stats = {
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0
+        }
+
+    def history_fingerprint(self, conversation_history: List[Dict[str, str]]) -> str:
+        """Hash the messages from history that can influence the answer."""
+        if not conversation_history or self.history_window <= 0:
+            return ""
+
+        recent = conversation_history[-self.history_window:]
+        joined = "\n".join(
+            f"{msg['role']}:{normalize_query(msg['content'])}" for msg in recent)
+        return hashlib.sha1(joined.encode("utf-8")).hexdigest()
+
+    def lookup(
+        self,
+        query: str,
+        conversation_history: List[Dict[str, str]] = None
+    ) -> CacheLookup:
+        """Look up a cached response for the query and history."""
+        lookup = self._exact_lookup(query, conversation_history)
+        if lookup.match == "exact":
+            return lookup
+
+        if self.embed_fn is not None:
+            try:
+                lookup.embedding = self.embed_fn(query)
+            except Exception as e:
+                print(f"Error embedding query for cache lookup: {e}")
+
+        return self._semantic_lookup(lookup)
+
+    async def alookup(
+        self,
+        query: str,
+        conversation_history: List[Dict[str, str]] = None
+    ) -> CacheLookup:
+        """Async variant of lookup() that awaits ``aembed_fn`` for the embedding."""
+        lookup = self._exact_lookup(query, conversation_history)
+        if lookup.match == "exact":
+            return lookup
+
+        if self.aembed_fn is not None:
+            try:
+                lookup.embedding = await self.aembed_fn(query)
+            except Exception as e:
+                print(f"Error embedding query for cache lookup: {e}")
+
+        return self._semantic_lookup(lookup)
+
+    def _exact_lookup(
+        self,
+        query: str,
+        conversation_history: Optional[List[Dict[str, str]]]
+    ) -> CacheLookup:
+        self._check_data_changes()
+
+        history_fp = self.history_fingerprint(conversation_history or [])
+        key = f"{history_fp}|{normalize_query(query)}"
+        lookup = CacheLookup(key=key, history_fingerprint=history_fp)
+
+        with self._lock:
+            entry = self._get_live_entry(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["exact_hits"] += 1
+                lookup.response = entry.response
+                lookup.match = "exact"
+        return lookup
+
+    def _semantic_lookup(self, lookup: CacheLookup) -> CacheLookup:
+        with self._lock:
+            if lookup.embedding is not None:
+                best_key, best_score = self._nearest_entry(
+                    lookup.embedding, lookup.history_fingerprint)
+                if best_key is not None and best_score >= self.similarity_threshold:
+                    self._entries.move_to_end(best_key)
+                    self.stats["semantic_hits"] += 1
+                    lookup.response = self._entries[best_key].response
+                    lookup.match = "semantic"
+                    return lookup
+
+            self.stats["misses"] += 1
+            return lookup
+
+    def store(self, lookup: CacheLookup, response: Dict[str, Any]):
+        """Store a freshly computed response under a previous lookup's key."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            previous = self._entries.pop(lookup.key, None)
+            if previous is not None:
+                self._release_row(previous)
+            while len(self._entries) >= self.max_size:
+                self._release_row(self._entries.popitem(last=False)[1])
+                self.stats["evictions"] += 1
+
+            self._entries[lookup.key] = _CacheEntry(
+                response=response,
+                history_fingerprint=lookup.history_fingerprint,
+                row=self._store_vector(lookup.key, lookup.embedding),
+                created_at=time.monotonic()
+            )
+            self.stats["stores"] += 1
+
+    def _store_vector(self, key: str, embedding: Optional[List[float]]) -> Optional[int]:
+        """Put the normalized embedding in a free matrix row and return the row."""
+        vector = _normalized(embedding) if embedding is not None else None
+        if vector is None or not self._free_rows:
+            return None
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_size, len(vector)), dtype=np.float32)
+        elif self._vectors.shape[1] != len(vector):
+            return None
+
+        row = self._free_rows.pop()
+        self._vectors[row] = vector
+        self._row_keys[row] = key
+        return row
+
+    def _release_row(self, entry: _CacheEntry):
+        if entry.row is not None:
+            self._vectors[entry.row] = 0.0
+            self._row_keys[entry.row] = None
+            self._free_rows.append(entry.row)
+
+    def add_clear_listener(self, listener: Callable[[], None]):
+        """Register a callback run whenever the cache is cleared."""
+        self._clear_listeners.append(listener)
+
+    def clear(self):
+        """Drop every cached response."""
+        with self._lock:
+            for entry in self._entries.values():
+                self._release_row(entry)
+            self._entries.clear()
+            self.stats["invalidations"] += 1
+
+        for listener in self._clear_listeners:
+            listener()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            lookups = (self.stats["exact_hits"] + self.stats["semantic_hits"] +
+                       self.stats["misses"])
+            hits = self.stats["exact_hits"] + self.stats["semantic_hits"]
+            return {
+                **self.stats,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hit_rate": hits / lookups if lookups else 0.0
+            }
+
+    def _get_live_entry(self, key: str) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.created_at > self.ttl_seconds:
+            self._release_row(self._entries.pop(key))
+            self.stats["expirations"] += 1
+            return None
+        return entry
+
+    def _nearest_entry(
+        self, embedding: List[float], history_fp: str
+    ) -> Tuple[Optional[str], float]:
+        query = _normalized(embedding)
+        if query is None or self._vectors is None or len(query) != self._vectors.shape[1]:
+            return None, -1.0
+
+        # Free rows are all zeros, so they score 0 and are skipped below
+        scores = self._vectors @ query
+        for row in np.argsort(-scores):
+            score = float(scores[row])
+            if score < self.similarity_threshold:
+                break
+            key = self._row_keys[row]
+            if key is None:
+                continue
+            entry = self._get_live_entry(key)
+            if entry is not None and entry.history_fingerprint == history_fp:
+                return key, score
+        return None, -1.0
+
+    def _check_data_changes(self):
+        """Clear the cache if the watched data files changed since last check."""
+        if self.watch_dir is None:
+            return
+
+        now = time.monotonic()
+        if now - self._last_watch_check < self.watch_interval_seconds:
+            return
+        self._last_watch_check = now
+
+        fingerprint = data_fingerprint(self.watch_dir)
+        if fingerprint != self._data_fingerprint:
+            self._data_fingerprint = fingerprint
+            print("Data files changed; clearing response cache")
+            self.clear()
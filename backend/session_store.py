@@ -0,0 +1,226 @@
+"""
+Server-side conversation sessions for NadavBot.
+Lets clients send only the new message instead of the whole history each turn.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class InMemorySessionStore:
+    """
+    Conversation histories kept in process memory.
+
+    Bounded by ``max_sessions`` (least recently used sessions are dropped
+    first), by ``ttl_seconds`` of inactivity and by ``max_messages`` per
+    session, so memory use stays flat no matter how long chats run.
+    """
+
+    def __init__(self, max_sessions: int = 10000, ttl_seconds: float = 3600.0, max_messages: int = 50):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+
+        self._sessions: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, conversation_id: str) -> Optional[List[Dict[str, str]]]:
+        """Return the stored history, or None if the session is unknown or expired."""
+        with self._lock:
+            session = self._sessions.get(conversation_id)
+            if session is None:
+                return None
+            if time.monotonic() - session["updated_at"] > self.ttl_seconds:
+                del self._sessions[conversation_id]
+                return None
+
+            self._sessions.move_to_end(conversation_id)
+            return list(session["messages"])
+
+    def get_summary(self, conversation_id: str) -> Optional[Dict[str, str]]:
+        """Return the session's stored history summary, if any."""
+        with self._lock:
+            session = self._sessions.get(conversation_id)
+            if session is None or session.get("summary") is None:
+                return None
+            return dict(session["summary"])
+
+    def set_summary(self, conversation_id: str, summary: Dict[str, str]):
+        """Store the history summary of an existing session."""
+        with self._lock:
+            session = self._sessions.get(conversation_id)
+            if session is not None:
+                session["summary"] = dict(summary)
+
+    def append(self, conversation_id: str, messages: List[Dict[str, str]]):
+        """Append messages to a session, creating it if needed."""
+        with self._lock:
+            session = self._sessions.get(conversation_id)
+            if session is None:
+                session = {"messages": deque(maxlen=self.max_messages), "summary": None}
+                self._sessions[conversation_id] = session
+
+            session["messages"].extend(
+                {"role": msg["role"], "content": msg["content"]} for msg in messages)
+            session["updated_at"] = time.monotonic()
+            self._sessions.move_to_end(conversation_id)
+
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"backend": "memory", "sessions": len(self._sessions)}
+
+
+class SQLiteSessionStore:
+    """
+    Conversation histories kept in a local SQLite database, so sessions survive
+    restarts and are shared by every server worker, along with their history
+    summaries. Messages are appended as rows and each session is trimmed to its
+    last ``max_messages`` on write. Sessions idle for longer than
+    ``ttl_seconds`` are pruned at startup and then at most once every
+    ``prune_interval_seconds``, by whichever write comes next.
+    """
+
+    def __init__(self, db_path: Path, ttl_seconds: float = 86400.0, max_messages: int = 50,
+                 prune_interval_seconds: float = 300.0):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+        self.prune_interval_seconds = prune_interval_seconds
+        self._last_prune = 0.0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        # WAL lets server workers sharing the file read while another writes
+        self._conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS sessions (
+                conversation_id TEXT PRIMARY KEY,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS messages (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                conversation_id TEXT NOT NULL,
+                message TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS messages_by_conversation
+                ON messages (conversation_id, seq);
+            CREATE TABLE IF NOT EXISTS summaries (
+                conversation_id TEXT PRIMARY KEY,
+                summary TEXT NOT NULL
+            );
+        """)
+        self._conn.commit()
+        with self._lock:
+            self._prune()
+
+    def get(self, conversation_id: str) -> Optional[List[Dict[str, str]]]:
+        """Return the stored history, or None if the session is unknown or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT updated_at FROM sessions WHERE conversation_id = ?",
+                (conversation_id,)
+            ).fetchone()
+            if row is None or time.time() - row[0] > self.ttl_seconds:
+                return None
+
+            rows = self._conn.execute(
+                "SELECT message FROM messages WHERE conversation_id = ? "
+                "ORDER BY seq DESC LIMIT ?",
+                (conversation_id, self.max_messages)
+            ).fetchall()
+            return [json.loads(message) for (message,) in reversed(rows)]
+
+    def get_summary(self, conversation_id: str) -> Optional[Dict[str, str]]:
+        """Return the session's stored history summary, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summaries.summary, sessions.updated_at FROM summaries "
+                "JOIN sessions USING (conversation_id) WHERE conversation_id = ?",
+                (conversation_id,)
+            ).fetchone()
+            if row is None or time.time() - row[1] > self.ttl_seconds:
+                return None
+            return json.loads(row[0])
+
+    def set_summary(self, conversation_id: str, summary: Dict[str, str]):
+        """Store the history summary of a session."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO summaries (conversation_id, summary) VALUES (?, ?) "
+                "ON CONFLICT(conversation_id) DO UPDATE SET summary = excluded.summary",
+                (conversation_id, json.dumps(summary))
+            )
+            self._conn.commit()
+
+    def append(self, conversation_id: str, messages: List[Dict[str, str]]):
+        """Append messages to a session, creating it if needed."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions (conversation_id, updated_at) VALUES (?, ?) "
+                "ON CONFLICT(conversation_id) DO UPDATE SET updated_at = excluded.updated_at",
+                (conversation_id, time.time())
+            )
+            self._conn.executemany(
+                "INSERT INTO messages (conversation_id, message) VALUES (?, ?)",
+                [
+                    (conversation_id, json.dumps({"role": msg["role"], "content": msg["content"]}))
+                    for msg in messages
+                ]
+            )
+            # Drop everything older than the last max_messages rows
+            self._conn.execute(
+                "DELETE FROM messages WHERE conversation_id = ? AND seq <= "
+                "(SELECT seq FROM messages WHERE conversation_id = ? "
+                "ORDER BY seq DESC LIMIT 1 OFFSET ?)",
+                (conversation_id, conversation_id, self.max_messages)
+            )
+            if time.time() - self._last_prune >= self.prune_interval_seconds:
+                self._prune()
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            (sessions,) = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()
+            return {"backend": "sqlite", "sessions": sessions}
+
+    def _prune(self):
+        """Delete sessions (and their messages and summaries) idle past the TTL. Caller holds the lock."""
+        self._last_prune = time.time()
+        cutoff = self._last_prune - self.ttl_seconds
+        for table in ("messages", "summaries"):
+            self._conn.execute(
+                f"DELETE FROM {table} WHERE conversation_id IN "
+                "(SELECT conversation_id FROM sessions WHERE updated_at < ?)",
+                (cutoff,)
+            )
+        self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,))
+        self._conn.commit()
+
+
+def create_session_store():
+    """Create the session store selected by NADAVBOT_SESSION_BACKEND (memory or sqlite)."""
+    ttl_seconds = float(os.getenv("NADAVBOT_SESSION_TTL", "3600"))
+    max_messages = int(os.getenv("NADAVBOT_SESSION_MAX_MESSAGES", "50"))
+
+    if os.getenv("NADAVBOT_SESSION_BACKEND", "memory") == "sqlite":
+        return SQLiteSessionStore(
+            Path(os.getenv("NADAVBOT_SESSION_DB", "../storage/sessions.db")),
+            ttl_seconds=ttl_seconds,
+            max_messages=max_messages
+        )
+
+    return InMemorySessionStore(
+        max_sessions=int(os.getenv("NADAVBOT_SESSION_MAX", "10000")),
+        ttl_seconds=ttl_seconds,
+        max_messages=max_messages
+    )
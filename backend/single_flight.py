@@ -0,0 +1,162 @@
+"""
+Request coalescing for NadavBot
+Concurrent requests for the same answer share one execution instead of each
+running retrieval and generation, e.g. when many visitors click the same
+starter prompt at once. Streamed answers are shared too: every caller gets
+the whole token stream, from the first token, however late it joined.
+"""
+
+import asyncio
+import hashlib
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from response_cache import normalize_query
+
+T = TypeVar("T")
+
+
+def request_key(
+    query: str,
+    conversation_history: List[Dict[str, str]],
+    history_summary: str = ""
+) -> str:
+    """
+    Fingerprint of everything the answer depends on: the normalized query,
+    the whole history that will be sent to the LLM and its rolling summary.
+    """
+    digest = hashlib.sha1(normalize_query(query).encode("utf-8"))
+    for message in conversation_history:
+        digest.update(f"\x00{message['role']}\x00{message['content']}".encode("utf-8"))
+    digest.update(f"\x00summary\x00{history_summary}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class _StreamFlight:
+    """Items produced so far by one shared stream, and whether it has ended."""
+
+    def __init__(self):
+        self.items: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.waiters = 1
+        self.task: Optional[asyncio.Future] = None
+        self._changed = asyncio.Event()
+
+    def notify(self):
+        # Wake everyone waiting on the current event; later waits use a new one
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def pump(self, iterator: AsyncIterator[Any]):
+        try:
+            async for item in iterator:
+                self.items.append(item)
+                self.notify()
+        except BaseException as e:
+            self.error = e
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            self.done = True
+            self.notify()
+
+    async def replay(self) -> AsyncIterator[Any]:
+        index = 0
+        while True:
+            while index < len(self.items):
+                yield self.items[index]
+                index += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            # Nothing awaited since the checks above, so no item can be missed
+            await self._changed.wait()
+
+
+class SingleFlight:
+    """
+    At most one in-flight execution per key on an event loop.
+
+    The first caller for a key starts ``fn``; callers arriving before it
+    finishes await the same task and receive its result, or its exception.
+    The task is shielded, so a caller that goes away (a client disconnect)
+    does not cancel it for the others.
+
+    stream() does the same for async generators: one task consumes the
+    generator into a buffer and every caller replays that buffer.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._waiters: Dict[str, int] = {}
+        self._streams: Dict[str, _StreamFlight] = {}
+        self.stats = {
+            "requests": 0,
+            "executions": 0,
+            "coalesced": 0,
+            "failures": 0,
+            "max_waiters": 0
+        }
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        self.stats["requests"] += 1
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            self._waiters[key] = 1
+            self.stats["executions"] += 1
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self._waiters[key] += 1
+            self.stats["coalesced"] += 1
+            self.stats["max_waiters"] = max(self.stats["max_waiters"], self._waiters[key])
+
+        return await asyncio.shield(task)
+
+    async def stream(self, key: str, fn: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """
+        Yield every item of ``fn()``, starting it only if no stream for ``key``
+        is running; otherwise replay the running one from its first item.
+        """
+        self.stats["requests"] += 1
+
+        flight = self._streams.get(key)
+        if flight is None:
+            flight = _StreamFlight()
+            flight.task = asyncio.ensure_future(flight.pump(fn()))
+            self._streams[key] = flight
+            self.stats["executions"] += 1
+            flight.task.add_done_callback(lambda done: self._finish_stream(key, flight))
+        else:
+            flight.waiters += 1
+            self.stats["coalesced"] += 1
+            self.stats["max_waiters"] = max(self.stats["max_waiters"], flight.waiters)
+
+        async for item in flight.replay():
+            yield item
+
+    def _finish_stream(self, key: str, flight: _StreamFlight):
+        if self._streams.get(key) is flight:
+            del self._streams[key]
+        if isinstance(flight.error, Exception):
+            self.stats["failures"] += 1
+
+    def _finish(self, key: str, task: asyncio.Future):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+            del self._waiters[key]
+        # Marks the exception retrieved even if every caller went away
+        if not task.cancelled() and task.exception() is not None:
+            self.stats["failures"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.stats["requests"]
+        return {
+            **self.stats,
+            "in_flight": len(self._in_flight) + len(self._streams),
+            # Share of requests that did not trigger their own execution
+            "saved_rate": self.stats["coalesced"] / requests if requests else 0.0
+        }
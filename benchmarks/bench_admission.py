@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Check that /chat/stream always returns its admission slot.
+
+Drives the FastAPI app directly over ASGI with a fake runner and one
+admission slot, and ends requests every way a client or server can:
+
+    completed            the stream runs to its last frame
+    gone_while_queued    the client disconnects while waiting for the slot
+    gone_before_body     the client disconnects before the first frame is sent
+    cancelled_queued     the request task is cancelled while queued
+    cancelled_admitted   the request task is cancelled mid-stream
+
+After each one the slot must be free again and released exactly once. Needs
+the backend requirements but no API key or indices:
+
+    python benchmarks/bench_admission.py
+"""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+FRAME_DELAY_SECONDS = 0.05
+
+
+class FakeRunner:
+    """Streams three token frames and a done frame, FRAME_DELAY_SECONDS apart."""
+
+    def is_ready(self) -> bool:
+        return True
+
+    async def stream_message(self, message, conversation_history=None, conversation_id=None):
+        for token in ("one ", "two ", "three"):
+            await asyncio.sleep(FRAME_DELAY_SECONDS)
+            yield {"type": "token", "content": token}
+        yield {"type": "done", "sources": [], "conversation_id": "c1"}
+
+
+class Client:
+    """One ASGI request against /chat/stream, disconnected or cancelled on demand."""
+
+    def __init__(self, app, host: str = "10.0.0.1", block_send: bool = False):
+        self.app = app
+        self.host = host
+        self.block_send = block_send
+        self.disconnected = asyncio.Event()
+        self.status = None
+        self.body = b""
+        self._sent_request = False
+
+    async def receive(self):
+        if not self._sent_request:
+            self._sent_request = True
+            body = json.dumps({"message": "What have you built?"}).encode("utf-8")
+            return {"type": "http.request", "body": body, "more_body": False}
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            if self.block_send:
+                # A client that never reads: the body is not reached before
+                # the disconnect cancels the response
+                await asyncio.Event().wait()
+        elif message["type"] == "http.response.body":
+            self.body += message.get("body", b"")
+
+    def start(self) -> asyncio.Task:
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": "/chat/stream",
+            "raw_path": b"/chat/stream",
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"content-type", b"application/json"), (b"host", b"testserver")],
+            "client": (self.host, 50000),
+            "server": ("testserver", 80),
+        }
+        return asyncio.get_running_loop().create_task(self.app(scope, self.receive, self.send))
+
+
+async def settle():
+    await asyncio.sleep(FRAME_DELAY_SECONDS / 5)
+
+
+async def completed(app):
+    client = Client(app)
+    await client.start()
+    assert client.status == 200, client.status
+    assert client.body.count(b"\n") == 4, client.body
+
+
+async def gone_while_queued(app):
+    holder, queued = Client(app), Client(app, host="10.0.0.2")
+    holder_task = holder.start()
+    await settle()
+    # Gone before its turn, but the disconnect is only noticed once admitted
+    queued.disconnected.set()
+    await queued.start()
+    await holder_task
+    assert queued.status == 499, queued.status
+
+
+async def gone_before_body(app):
+    client = Client(app, block_send=True)
+    task = client.start()
+    await settle()
+    client.disconnected.set()
+    await task
+    assert client.body == b"", client.body
+
+
+async def cancelled_queued(app):
+    holder, queued = Client(app), Client(app, host="10.0.0.2")
+    holder_task = holder.start()
+    await settle()
+    queued_task = queued.start()
+    await settle()
+    queued_task.cancel()
+    await asyncio.gather(queued_task, return_exceptions=True)
+    await holder_task
+
+
+async def cancelled_admitted(app):
+    task = Client(app).start()
+    await asyncio.sleep(FRAME_DELAY_SECONDS * 1.5)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+async def main():
+    import main as server
+    from admission import AdmissionController
+
+    server.chatbot_runner = FakeRunner()
+    server.admission = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout_seconds=5)
+
+    print(f"{'case':<22}{'ms':>8}  check")
+    print("-" * 44)
+    for case in (completed, gone_while_queued, gone_before_body, cancelled_queued, cancelled_admitted):
+        before = server.admission.stats["completed"]
+        admitted_before = server.admission.stats["admitted"]
+        start = time.perf_counter()
+        await case(server.app)
+        await settle()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        stats = server.admission.get_stats()
+        assert stats["active"] == 0, f"{case.__name__}: slot not returned ({stats['active']} active)"
+        assert stats["queued"] == 0, f"{case.__name__}: {stats['queued']} left queued"
+        admitted = stats["admitted"] - admitted_before
+        released = stats["completed"] - before
+        assert released == admitted, f"{case.__name__}: {admitted} admitted, {released} released"
+        print(f"{case.__name__:<22}{elapsed_ms:>8.1f}  slot returned")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
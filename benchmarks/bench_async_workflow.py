@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent chats on the thread-pool workflow vs the async workflow.
+
+Retrieval and generation are replaced by fakes that sleep for a fixed time,
+so the numbers reflect how many chats one worker can carry at once rather
+than OpenAI latency. No API key or built indices are needed:
+
+    python benchmarks/bench_async_workflow.py --concurrency 10 50 100 200
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from langchain_core.messages import AIMessage, AIMessageChunk  # noqa: E402
+
+from langgraph_runner import NadavBotRunner  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+
+
+class FakeChatModel:
+    """Stands in for ChatOpenAI with a fixed generation latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def invoke(self, messages):
+        time.sleep(self.latency)
+        return AIMessage(content="fake answer")
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(self.latency)
+        return AIMessage(content="fake answer")
+
+    async def astream(self, messages):
+        await asyncio.sleep(self.latency)
+        yield AIMessageChunk(content="fake answer")
+
+
+class FakeKnowledgeGraph:
+    """Stands in for NadavBotKnowledgeGraph with a fixed retrieval latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def query_graph(self, query, mode="hybrid", sources=None):
+        time.sleep(self.latency)
+        return f"{mode} context for {query}"
+
+    async def aquery_graph(self, query, mode="hybrid", sources=None):
+        await asyncio.sleep(self.latency)
+        return f"{mode} context for {query}"
+
+    def retrieve_nodes(self, query, mode="hybrid", sources=None):
+        time.sleep(self.latency)
+        return self._nodes(query, mode)
+
+    async def aretrieve_nodes(self, query, mode="hybrid", sources=None):
+        await asyncio.sleep(self.latency)
+        return self._nodes(query, mode)
+
+    def lookup_structured(self, query):
+        # No structured facts, so routing and retrieval take their usual paths
+        return None
+
+    @staticmethod
+    def _nodes(query, mode):
+        return {
+            "nodes": [{"node_id": mode, "text": f"{mode} context for {query}",
+                       "score": 1.0, "metadata": {"source": mode}, "retriever": mode}],
+            "triplets": []
+        }
+
+
+def make_runner(use_async: bool, retrieval_latency: float, llm_latency: float) -> NadavBotRunner:
+    runner = NadavBotRunner(llm=FakeChatModel(llm_latency))
+    runner.kg_builder = FakeKnowledgeGraph(retrieval_latency)
+    # A zero-size cache never hits, so every chat runs the workflow
+    runner.response_cache = ResponseCache(max_size=0)
+    runner.use_async_workflow = use_async
+    runner._build_workflow()
+    runner.ready = True
+    return runner
+
+
+async def run_chats(runner: NadavBotRunner, concurrency: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        runner.process_message(f"What are you passionate about, question {i}?")
+        for i in range(concurrency)
+    ))
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--retrieval-latency", type=float, default=0.3)
+    parser.add_argument("--llm-latency", type=float, default=0.7)
+    args = parser.parse_args()
+
+    thread_runner = make_runner(False, args.retrieval_latency, args.llm_latency)
+    async_runner = make_runner(True, args.retrieval_latency, args.llm_latency)
+
+    header = f"{'chats':>8}{'thread s':>12}{'async s':>12}{'thread/s':>12}{'async/s':>12}"
+    print(header)
+    print("-" * len(header))
+
+    for concurrency in args.concurrency:
+        thread_seconds = await run_chats(thread_runner, concurrency)
+        async_seconds = await run_chats(async_runner, concurrency)
+        print(f"{concurrency:>8}{thread_seconds:>12.2f}{async_seconds:>12.2f}"
+              f"{concurrency / thread_seconds:>12.1f}{concurrency / async_seconds:>12.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark entity lookup and k-hop traversal: SimpleGraphStore vs IndexedGraphStore.
+
+The baseline does what graph retrieval had to do with SimpleGraphStore:
+scan every entity name to match one case-insensitively, and scan the whole
+triplet dict at each hop to follow incoming edges. Triplets are synthetic
+(skewed entity popularity, a handful of relations), so no API key or built
+indices are needed:
+
+    python benchmarks/bench_graph_store.py --triplets 1000 10000 100000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "graph"))
+
+from llama_index.core.graph_stores import SimpleGraphStore  # noqa: E402
+
+from indexed_graph_store import IndexedGraphStore  # noqa: E402
+
+RELATIONS = ["uses", "learned in", "built with", "related to", "part of", "worked at"]
+
+
+def make_triplets(count: int, rng: random.Random):
+    entities = [f"Entity {i}" for i in range(max(2, count // 3))]
+    # Popular technologies show up in many triplets, most entities in few
+    weights = [1.0 / (rank + 1) for rank in range(len(entities))]
+    subjects = rng.choices(entities, weights=weights, k=count)
+    objects = rng.choices(entities, weights=weights, k=count)
+    return entities, [
+        (subj, rng.choice(RELATIONS), obj) for subj, obj in zip(subjects, objects)
+    ]
+
+
+def simple_find(store: SimpleGraphStore, name: str):
+    name = name.lower()
+    return [entity for entity in store._data.graph_dict if entity.lower() == name]
+
+
+def simple_traverse(store: SimpleGraphStore, start: str, depth: int, limit: int):
+    """Both-direction BFS over the plain dict; incoming edges need a full scan per hop."""
+    graph_dict = store._data.graph_dict
+    visited, frontier, triplets, crossed = {start}, [start], [], set()
+    for _ in range(depth):
+        next_frontier = []
+        frontier_set = set(frontier)
+        for subj, relations in graph_dict.items():
+            for rel, obj in relations:
+                if subj in frontier_set or obj in frontier_set:
+                    if (subj, rel, obj) in crossed:
+                        continue
+                    crossed.add((subj, rel, obj))
+                    triplets.append((subj, rel, obj))
+                    if len(triplets) >= limit:
+                        return triplets
+                    for entity in (subj, obj):
+                        if entity not in visited:
+                            visited.add(entity)
+                            next_frontier.append(entity)
+        frontier = next_frontier
+    return triplets
+
+
+def build(store_cls, triplets):
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = store_cls()
+    for triplet in triplets:
+        store.upsert_triplet(*triplet)
+    # IndexedGraphStore builds its adjacency arrays on the first read
+    store.get(triplets[0][0])
+    elapsed = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return store, elapsed, memory
+
+
+def median_ms(fn, args_list) -> float:
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--triplets", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--limit", type=int, default=30,
+                        help="Triplets returned per traversal (MAX_RETRIEVED_TRIPLETS)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"depth={args.depth} limit={args.limit} queries={args.queries}")
+    print(f"{'triplets':>9}{'store':>9}{'build s':>9}{'mem MB':>8}"
+          f"{'find ms':>10}{'get ms':>9}{'k-hop ms':>10}")
+    print("-" * 64)
+
+    for count in args.triplets:
+        entities, triplets = make_triplets(count, rng)
+        # Query names are upper-cased, so lookups must be case-insensitive
+        names = [rng.choice(entities) for _ in range(args.queries)]
+        recased = [(name.upper(),) for name in names]
+
+        simple, simple_build, simple_memory = build(SimpleGraphStore, triplets)
+        indexed, indexed_build, indexed_memory = build(IndexedGraphStore, triplets)
+
+        rows = [
+            ("simple", simple_build, simple_memory,
+             median_ms(lambda name: simple_find(simple, name), recased),
+             median_ms(simple.get, [(name,) for name in names]),
+             median_ms(lambda name: simple_traverse(simple, name, args.depth, args.limit),
+                       [(name,) for name in names])),
+            ("indexed", indexed_build, indexed_memory,
+             median_ms(indexed.find_entities, recased),
+             median_ms(indexed.get, [(name,) for name in names]),
+             median_ms(lambda name: indexed.traverse([name], args.depth, limit=args.limit),
+                       [(name,) for name in names]))
+        ]
+        for name, build_s, memory, find_ms, get_ms, hop_ms in rows:
+            print(f"{count:>9}{name:>9}{build_s:>9.2f}{memory / 1e6:>8.1f}"
+                  f"{find_ms:>10.3f}{get_ms:>9.4f}{hop_ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
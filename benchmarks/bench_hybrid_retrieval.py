@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark fused hybrid retrieval against the two-call graph + vector path.
+
+The two-call path queries the graph and vector modes side by side, as the
+runner did before fusion; the hybrid path makes one retrieve_nodes() /
+query_graph() call in "hybrid" mode. Pass --synthesized to also time the
+query-engine path, which makes LLM calls and costs tokens.
+
+Requires OPENAI_API_KEY and built indices. Run from the repository root:
+    python benchmarks/bench_hybrid_retrieval.py [--synthesized]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+QUERIES = [
+    "What are your main technical skills?",
+    "Tell me about your AI projects",
+    "Which frontend frameworks have you used?",
+    "When did you start working with machine learning?",
+    "What backend and API work have you done?"
+]
+REPEATS = 3
+
+
+def time_call(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--synthesized", action="store_true",
+                        help="Also time query_graph(), which calls the LLM")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    if not os.getenv("OPENAI_API_KEY"):
+        print("OPENAI_API_KEY is required to run this benchmark.")
+        return
+
+    from graph.build_graph import NadavBotKnowledgeGraph
+
+    kg = NadavBotKnowledgeGraph(
+        data_dir=str(ROOT_DIR / "data"),
+        storage_dir=str(ROOT_DIR / "storage")
+    )
+    if not kg.load_existing_indices():
+        print("Build the indices first: python graph/build_graph.py")
+        return
+
+    executor = ThreadPoolExecutor(max_workers=2)
+
+    def two_calls(fn, query):
+        futures = [executor.submit(fn, query, mode) for mode in ("graph", "vector")]
+        return [future.result() for future in futures]
+
+    paths = {
+        "two-call nodes": lambda q: two_calls(kg.retrieve_nodes, q),
+        "hybrid nodes": lambda q: kg.retrieve_nodes(q, "hybrid")
+    }
+    if args.synthesized:
+        paths["two-call synthesized"] = lambda q: two_calls(kg.query_graph, q)
+        paths["hybrid synthesized"] = lambda q: kg.query_graph(q, "hybrid")
+
+    # Warm the embedding cache so both paths embed the same queries for free
+    for query in QUERIES:
+        kg.retrieve_nodes(query, "vector")
+
+    print(f"{'path':<24}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}")
+    print("-" * 54)
+    for name, fn in paths.items():
+        samples = sorted(
+            time_call(fn, query) for query in QUERIES for _ in range(REPEATS))
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        print(f"{name:<24}{statistics.median(samples):>10.1f}{p95:>10.1f}"
+              f"{statistics.mean(samples):>10.1f}")
+
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
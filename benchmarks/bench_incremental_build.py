@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark incremental knowledge graph builds and check that edits are applied.
+
+Builds the indices over a copy of data/ plus one extra note, edits the note,
+and rebuilds with ``incremental=True``. The edited document's old triplets
+must be gone from the graph store and its new ones present, for both graph
+store backends. A last run builds a snapshot and then rebuilds as JSON, which
+must keep every docstore node and leave no snapshot files behind. Embeddings and triplet extraction are faked, so no API key is
+needed:
+
+    python benchmarks/bench_incremental_build.py
+"""
+
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+REPO_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(REPO_DIR / "graph"))
+sys.path.insert(0, str(BENCH_DIR))
+
+from bench_index_storage import mock_service_context  # noqa: E402
+
+NOTE_FILE = "notes.md"
+OLD_NOTE = "I spent a summer volunteering in Zanzibar."
+NEW_NOTE = "I spent a summer volunteering in Kyoto."
+
+
+def fake_extract_triplets(self, text: str):
+    """One (Nadav, mentions, X) triplet per capitalized word of the chunk."""
+    words = sorted(set(re.findall(r"\b[A-Z][a-z]{3,}\b", text)))
+    return [("Nadav", "mentions", word) for word in words]
+
+
+def graph_triplets(graph_store):
+    return {
+        (subj, rel, obj)
+        for subj, pairs in graph_store.to_dict()["graph_dict"].items()
+        for rel, obj in pairs
+    }
+
+
+def run(backend: str, root: Path, storage_formats=("snapshot", "snapshot")):
+    import build_graph
+    from llama_index.core import KnowledgeGraphIndex
+
+    build_graph.GRAPH_STORE_BACKEND = backend
+    build_graph.STORAGE_FORMAT = storage_formats[0]
+    KnowledgeGraphIndex._extract_triplets = fake_extract_triplets
+
+    data_dir, storage_dir = root / "data", root / "storage"
+    shutil.copytree(REPO_DIR / "data", data_dir)
+    (data_dir / NOTE_FILE).write_text(OLD_NOTE + "\n", encoding="utf-8")
+
+    def builder():
+        kg_builder = build_graph.NadavBotKnowledgeGraph(str(data_dir), str(storage_dir))
+        kg_builder.service_context = mock_service_context(64)
+        return kg_builder
+
+    start = time.perf_counter()
+    kg_builder = builder()
+    kg_builder.build_knowledge_graph(incremental=True)
+    full_s = time.perf_counter() - start
+    node_count = len(kg_builder.storage_context.docstore.docs)
+
+    build_graph.STORAGE_FORMAT = storage_formats[1]
+    (data_dir / NOTE_FILE).write_text(NEW_NOTE + "\n", encoding="utf-8")
+    kg_builder = builder()
+    start = time.perf_counter()
+    kg_builder.build_knowledge_graph(incremental=True)
+    incremental_s = time.perf_counter() - start
+
+    triplets = graph_triplets(kg_builder.kg_index.graph_store)
+    assert ("Nadav", "mentions", "Zanzibar") not in triplets, "old triplet survived the edit"
+    assert ("Nadav", "mentions", "Kyoto") in triplets, "new triplet is missing"
+
+    # And after a reload from disk
+    reloaded = builder()
+    assert reloaded.load_existing_indices()
+    triplets = graph_triplets(reloaded.kg_index.graph_store)
+    assert ("Nadav", "mentions", "Zanzibar") not in triplets, "old triplet was persisted"
+    reloaded_count = len(reloaded.storage_context.docstore.docs)
+    assert reloaded_count == node_count, f"{node_count} docstore nodes reloaded as {reloaded_count}"
+    if storage_formats[1] == "json":
+        leftovers = [path.name for path in kg_builder.index_dir.iterdir()
+                     if path.name.startswith(("snapshot", "nodes-", "graph-", "vector_store-"))]
+        assert not leftovers, f"snapshot files left behind: {leftovers}"
+    return full_s, incremental_s
+
+
+def main():
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+    print(f"{'graph store':>12}{'storage':>22}{'full s':>10}{'incremental s':>15}  check")
+    print("-" * 68)
+    runs = [
+        ("simple", ("snapshot", "snapshot")),
+        ("indexed", ("snapshot", "snapshot")),
+        ("simple", ("snapshot", "json")),
+    ]
+    for backend, storage_formats in runs:
+        root = Path(tempfile.mkdtemp(prefix="bench-incremental-"))
+        try:
+            full_s, incremental_s = run(backend, root, storage_formats)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+        storage = " -> ".join(storage_formats)
+        print(f"{backend:>12}{storage:>22}{full_s:>10.2f}{incremental_s:>15.2f}  old triplets removed")
+
+
+if __name__ == "__main__":
+    main()
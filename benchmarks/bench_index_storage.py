@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark on-disk size, load time and memory of the index storage layouts.
+
+    separate   what builds did before: each document chunked twice (once per
+               index) and the shared storage context persisted as JSON into
+               both storage/kg_index and storage/vector_index
+    shared     one set of nodes referenced by both indices, persisted as JSON
+               once
+    snapshot   one set of nodes, persisted as a memory-mapped binary snapshot
+               (graph/snapshot.py)
+
+Indices are built from synthetic chunks with a mock embedding and generated
+triplets, so no API key is needed. Each load runs in a fresh subprocess so
+peak RSS covers only that load:
+
+    python benchmarks/bench_index_storage.py --chunks 1000 5000
+"""
+
+import argparse
+import json
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+GRAPH_DIR = Path(__file__).parent.parent / "graph"
+sys.path.insert(0, str(GRAPH_DIR))
+
+LAYOUTS = ("separate", "shared", "snapshot")
+WORDS = [f"term{i}" for i in range(5000)]
+
+
+def mock_service_context(dim: int):
+    from llama_index.core import MockEmbedding, ServiceContext
+    from llama_index.core.llms import MockLLM
+
+    return ServiceContext.from_defaults(llm=MockLLM(), embed_model=MockEmbedding(embed_dim=dim))
+
+
+def make_nodes(count: int, dim: int, rng: random.Random):
+    from llama_index.core.schema import TextNode
+
+    nodes = []
+    for i in range(count):
+        text = " ".join(rng.choice(WORDS) for _ in range(180))
+        nodes.append(TextNode(
+            id_=f"chunk-{i}",
+            text=text,
+            metadata={"source": "benchmark", "file_name": f"doc-{i // 4}.txt"},
+            embedding=[rng.uniform(-1, 1) for _ in range(dim)]
+        ))
+    return nodes
+
+
+def build_storage_context(layout: str, count: int, dim: int):
+    """Both indices over ``count`` synthetic chunks, in one storage context."""
+    from llama_index.core import KnowledgeGraphIndex, StorageContext, VectorStoreIndex
+
+    from numpy_vector_store import NumpyVectorStore
+
+    rng = random.Random(0)
+    service_context = mock_service_context(dim)
+    storage_context = StorageContext.from_defaults(
+        vector_store=NumpyVectorStore() if layout == "snapshot" else None)
+
+    vector_nodes = make_nodes(count, dim, rng)
+    # Chunks as the node parser returns them; the docstore never holds embeddings
+    kg_nodes = [node.copy() for node in vector_nodes]
+    for node in kg_nodes:
+        node.embedding = None
+        if layout == "separate":
+            # The KG index used to re-chunk each document into nodes of its own
+            node.id_ = f"kg-{node.id_}"
+
+    vector_index = VectorStoreIndex(
+        nodes=vector_nodes, storage_context=storage_context, service_context=service_context)
+    kg_index = KnowledgeGraphIndex(
+        nodes=[], storage_context=storage_context, service_context=service_context)
+    storage_context.docstore.add_documents(kg_nodes, allow_update=True)
+    # Same graph store and keyword table upsert_triplet_and_node() produces,
+    # without re-serializing the index struct after every triplet
+    for node in kg_nodes:
+        for _ in range(3):
+            subject, obj = rng.choice(WORDS), rng.choice(WORDS)
+            kg_index.upsert_triplet((subject, "related to", obj))
+            kg_index.index_struct.add_node([subject, obj], node)
+    storage_context.index_store.add_index_struct(kg_index.index_struct)
+    return storage_context
+
+
+def build(layout: str, count: int, dim: int, persist_root: Path):
+    from snapshot import save_snapshot
+
+    storage_context = build_storage_context(layout, count, dim)
+    if layout == "separate":
+        for name in ("kg_index", "vector_index"):
+            storage_context.persist(persist_dir=str(persist_root / name))
+    elif layout == "shared":
+        storage_context.persist(persist_dir=str(persist_root / "index"))
+    else:
+        save_snapshot(storage_context, persist_root / "index")
+
+
+def load(layout: str, persist_root: Path) -> dict:
+    """Load indices the way NadavBotKnowledgeGraph does and report time and RSS."""
+    from llama_index.core import StorageContext, load_indices_from_storage
+
+    from snapshot import load_snapshot
+
+    service_context = mock_service_context(1)
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if layout == "separate":
+        # The old loader opened both directories
+        contexts = [
+            StorageContext.from_defaults(persist_dir=str(persist_root / name))
+            for name in ("kg_index", "vector_index")
+        ]
+    elif layout == "shared":
+        contexts = [StorageContext.from_defaults(persist_dir=str(persist_root / "index"))]
+    else:
+        contexts = [load_snapshot(persist_root / "index")]
+    indices = [
+        load_indices_from_storage(context, service_context=service_context)
+        for context in contexts
+    ]
+    elapsed = time.perf_counter() - start
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "load_s": elapsed,
+        "rss_mb": (peak_kb - baseline_kb) / 1024,
+        "indices": sum(len(found) for found in indices)
+    }
+
+
+def disk_bytes(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--dim", type=int, default=1536,
+                        help="Embedding size (text-embedding-ada-002 is 1536)")
+    parser.add_argument("--load", nargs=2, metavar=("LAYOUT", "DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.load:
+        print(json.dumps(load(args.load[0], Path(args.load[1]))))
+        return
+
+    print(f"dim={args.dim}")
+    print(f"{'chunks':>8}{'layout':>10}{'disk MB':>10}{'load s':>9}{'load RSS MB':>13}")
+    print("-" * 50)
+    for count in args.chunks:
+        for layout in LAYOUTS:
+            persist_root = Path(tempfile.mkdtemp(prefix=f"bench-{layout}-"))
+            try:
+                build(layout, count, args.dim, persist_root)
+                result = json.loads(subprocess.run(
+                    [sys.executable, __file__, "--load", layout, str(persist_root)],
+                    check=True, capture_output=True, text=True
+                ).stdout.strip().splitlines()[-1])
+                print(f"{count:>8}{layout:>10}{disk_bytes(persist_root) / 1e6:>10.1f}"
+                      f"{result['load_s']:>9.2f}{result['rss_mb']:>13.1f}")
+            finally:
+                shutil.rmtree(persist_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark retrieval latency saved by intent-based routing.
+
+For each intent class, compares the routed retrieval workflow (greetings skip
+retrieval, known intents query a filtered vector index) against the full
+graph + vector retrieval every query used to pay for.
+
+Requires OPENAI_API_KEY and built indices. Run from the repository root:
+    python benchmarks/bench_routing.py
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR.parent))
+
+QUERIES_BY_INTENT = {
+    "greeting": ["Hi!", "hello there", "hey"],
+    "skills": ["What are your main technical skills?", "Which programming languages do you know?"],
+    "projects": ["Tell me about a project you built", "What have you developed recently?"],
+    "experience": ["What is your career experience?", "Walk me through your timeline"],
+    "frontend": ["How do you use React?", "Tell me about your UI and interface work"],
+    "backend": ["What backend and API work have you done?", "Which databases have you used?"],
+    "general": ["What are you passionate about?", "Tell me about yourself"]
+}
+# Short questions that contain "hi"/"hey" inside other words must still retrieve
+SHORT_QUESTIONS = ["Which projects?", "Which React projects?", "Your architecture?",
+                   "What about history?", "They?"]
+# Keywords hidden inside other words must not route a query
+MISROUTE_CHECKS = {
+    "How quickly can you start?": "general",
+    "What are your requirements for a new role?": "general",
+    "Tell me about your build pipeline": "projects",
+    "What did you build for the fintech startup?": "projects",
+}
+REPEATS = 3
+
+
+def check_greeting_detection():
+    """Greetings skip retrieval; short questions never do; intents match whole words."""
+    from prompt_templates import extract_intent, should_use_context
+
+    for query in QUERIES_BY_INTENT["greeting"]:
+        assert not should_use_context(query), f"{query!r} should skip retrieval"
+    for query in SHORT_QUESTIONS:
+        assert should_use_context(query), f"{query!r} should retrieve"
+    for query, intent in MISROUTE_CHECKS.items():
+        assert extract_intent(query) == intent, f"{query!r} routed to {extract_intent(query)}"
+    print(f"Greeting detection OK ({len(SHORT_QUESTIONS)} short questions retrieve)")
+    print(f"Intent routing OK ({len(MISROUTE_CHECKS)} embedded-keyword queries)")
+
+
+def time_call(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+async def main():
+    from dotenv import load_dotenv
+    load_dotenv()
+    check_greeting_detection()
+
+    if not os.getenv("OPENAI_API_KEY"):
+        print("OPENAI_API_KEY is required to run this benchmark.")
+        return
+
+    from langgraph_runner import NadavBotRunner
+
+    # Paths in the runner are relative to backend/
+    os.chdir(BACKEND_DIR)
+    runner = NadavBotRunner()
+    await runner.initialize()
+
+    print(f"{'intent':<12}{'routed ms':>12}{'full ms':>12}{'saved ms':>12}")
+    print("-" * 48)
+
+    for intent, queries in QUERIES_BY_INTENT.items():
+        routed, full = [], []
+        for query in queries:
+            for _ in range(REPEATS):
+                routed.append(time_call(
+                    runner.retrieval_workflow.invoke,
+                    runner._initial_state(query, [], "bench")
+                ))
+                full.append(time_call(runner._retrieve_concurrently, query))
+
+        routed_ms = statistics.median(routed)
+        full_ms = statistics.median(full)
+        print(f"{intent:<12}{routed_ms:>12.1f}{full_ms:>12.1f}{full_ms - routed_ms:>12.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
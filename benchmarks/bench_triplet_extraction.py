@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent triplet extraction against a local fake LLM server.
+
+The fake server speaks just enough of the OpenAI chat completions API to
+answer extraction prompts after a fixed delay, and can answer a fraction of
+requests with 429 + Retry-After to exercise backoff. No API key is needed.
+
+    python benchmarks/bench_triplet_extraction.py --latency 0.2 --chunks 8 32 128
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "graph"))
+
+from parallel_extraction import RateLimiter, extract_triplets_parallel  # noqa: E402
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    latency = 0.2
+    rate_limit_ratio = 0.0
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+
+        if random.random() < self.rate_limit_ratio:
+            self.send_response(429)
+            self.send_header("Retry-After", "0.05")
+            self.end_headers()
+            return
+
+        time.sleep(self.latency)
+        body = json.dumps({
+            "choices": [{
+                "message": {
+                    "role": "assistant",
+                    "content": "(Nadav, uses, Python)\n(Nadav, built, NadavBot)"
+                }
+            }]
+        }).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 refuses connections at high concurrency
+    request_queue_size = 256
+    daemon_threads = True
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, response):
+        super().__init__("rate limited")
+        self.response = response
+
+
+def make_extract_fn(url: str):
+    def extract(text: str):
+        request = urllib.request.Request(
+            url,
+            data=json.dumps({"messages": [{"role": "user", "content": text}]}).encode("utf-8"),
+            headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                content = json.load(response)["choices"][0]["message"]["content"]
+        except urllib.error.HTTPError as e:
+            if e.code == 429:
+                raise FakeRateLimitError(e)
+            raise
+
+        triplets = []
+        for line in content.splitlines():
+            parts = [part.strip() for part in line.strip("()").split(",")]
+            if len(parts) == 3:
+                triplets.append(tuple(parts))
+        return triplets
+
+    return extract
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM latency in seconds")
+    parser.add_argument("--chunks", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0,
+                        help="fraction of requests answered with 429")
+    args = parser.parse_args()
+
+    FakeLLMHandler.latency = args.latency
+    FakeLLMHandler.rate_limit_ratio = args.rate_limit_ratio
+    server = FakeLLMServer(("127.0.0.1", 0), FakeLLMHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    extract_fn = make_extract_fn(
+        f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions")
+
+    header = f"{'chunks':>8}" + "".join(f"{f'c={c} s':>12}" for c in args.concurrency) + f"{'speedup':>10}"
+    print(header)
+    print("-" * len(header))
+
+    for chunk_count in args.chunks:
+        texts = [f"chunk {i}" for i in range(chunk_count)]
+        timings = []
+        for concurrency in args.concurrency:
+            start = time.perf_counter()
+            results = extract_triplets_parallel(
+                texts,
+                extract_fn,
+                max_concurrency=concurrency,
+                base_delay=0.05,
+                rate_limiter=RateLimiter()
+            )
+            timings.append(time.perf_counter() - start)
+            assert len(results) == chunk_count
+
+        row = f"{chunk_count:>8}" + "".join(f"{t:>12.2f}" for t in timings)
+        print(row + f"{timings[0] / timings[-1]:>9.1f}x")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark top-k vector search: SimpleVectorStore-style scan vs NumPy matrix vs HNSW.
+
+The baseline mirrors what LlamaIndex's SimpleVectorStore does per query:
+convert the stored embedding lists to an array, then score each vector in a
+Python loop with a heap. The matrix path is graph/vector_search.py's exact
+search; HNSW runs only when hnswlib is installed. Embeddings are synthetic
+(clustered, like real embeddings, with queries near stored chunks), so no
+API key or built indices are needed:
+
+    python benchmarks/bench_vector_search.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import heapq
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "graph"))
+
+from vector_search import EmbeddingMatrix, hnswlib  # noqa: E402
+
+
+def simple_store_top_k(query, embeddings, ids, top_k):
+    """Per-query work done by SimpleVectorStore.query() in LlamaIndex."""
+    embeddings_np = np.array(embeddings)
+    query_np = np.array(query)
+    heap = []
+    for i, embedding in enumerate(embeddings_np):
+        similarity = np.dot(query_np, embedding) / (
+            np.linalg.norm(query_np) * np.linalg.norm(embedding))
+        if len(heap) < top_k:
+            heapq.heappush(heap, (similarity, i))
+        else:
+            heapq.heappushpop(heap, (similarity, i))
+    return [ids[i] for _, i in sorted(heap, reverse=True)]
+
+
+def time_queries(fn, queries) -> list:
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def recall(approximate, exact) -> float:
+    hits = sum(len(set(a) & set(e)) for a, e in zip(approximate, exact))
+    return hits / sum(len(e) for e in exact)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--dim", type=int, default=1536,
+                        help="Embedding size (text-embedding-ada-002 is 1536)")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--baseline-queries", type=int, default=3,
+                        help="Queries for the slow baseline at each size")
+    parser.add_argument("--baseline-max-size", type=int, default=20000,
+                        help="Skip the baseline above this size; its Python lists need ~50 bytes per float")
+    parser.add_argument("--top-k", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"dim={args.dim} top_k={args.top_k} hnswlib={'yes' if hnswlib else 'no'}")
+    print(f"{'chunks':>8}{'simple ms':>12}{'matrix ms':>12}{'batch ms/q':>12}"
+          f"{'hnsw ms':>10}{'hnsw build s':>14}{'recall':>8}")
+    print("-" * 76)
+
+    for size in args.sizes:
+        centers = rng.standard_normal((max(1, size // 100), args.dim), dtype=np.float32)
+        embeddings = centers[rng.integers(0, len(centers), size)]
+        embeddings += 0.5 * rng.standard_normal((size, args.dim), dtype=np.float32)
+        queries = embeddings[rng.integers(0, size, args.queries)]
+        queries = queries + 0.3 * rng.standard_normal(queries.shape, dtype=np.float32)
+        ids = [f"node-{i}" for i in range(size)]
+
+        matrix = EmbeddingMatrix()
+        matrix.add(ids, embeddings)
+
+        simple_ms = "-"
+        if size <= args.baseline_max_size:
+            embedding_lists = embeddings.tolist()
+            simple = time_queries(
+                lambda q: simple_store_top_k(q.tolist(), embedding_lists, ids, args.top_k),
+                queries[:args.baseline_queries])
+            simple_ms = f"{statistics.median(simple):.1f}"
+            del embedding_lists
+        exact = time_queries(lambda q: matrix.search(q, args.top_k), queries)
+
+        start = time.perf_counter()
+        exact_ids, _ = matrix.search_batch(queries, args.top_k)
+        batch_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        hnsw_ms, build_s, hnsw_recall = "-", "-", "-"
+        if hnswlib is not None:
+            ann = EmbeddingMatrix(ann=True, ann_min_size=0)
+            ann.add(ids, embeddings)
+            start = time.perf_counter()
+            ann.search(queries[0], args.top_k)  # builds the index
+            build_s = f"{time.perf_counter() - start:.2f}"
+            hnsw_ms = f"{statistics.median(time_queries(lambda q: ann.search(q, args.top_k), queries)):.3f}"
+            ann_ids, _ = ann.search_batch(queries, args.top_k)
+            hnsw_recall = f"{recall(ann_ids, exact_ids):.2f}"
+
+        print(f"{size:>8}{simple_ms:>12}{statistics.median(exact):>12.3f}"
+              f"{batch_ms:>12.3f}{hnsw_ms:>10}{build_s:>14}{hnsw_recall:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-worker memory and retrieval throughput as server workers are added.
+
+Each worker is a separate process that loads the persisted indices the way
+NadavBotKnowledgeGraph does and then runs vector retrieval in a loop, like
+`python backend/main.py` with NADAVBOT_WORKERS set. Two storage formats are
+compared:
+
+    json       LlamaIndex JSON plus the numpy vector store; every worker reads
+               its own private copy of nodes and embeddings
+    snapshot   the binary snapshot (graph/snapshot.py); embeddings and node
+               records are memory-mapped, so workers share one copy of them
+               through the page cache
+
+RSS counts shared pages in every worker; PSS divides them between the
+workers mapping them, so the PSS column sums to the real total. "index"
+columns are measured from just before the load. Indices are synthetic with a
+mock embedding, so no API key is needed:
+
+    python benchmarks/bench_workers.py --chunks 5000 --workers 1 2 4
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR.parent / "graph"))
+sys.path.insert(0, str(BENCH_DIR))
+
+from bench_index_storage import build_storage_context, mock_service_context  # noqa: E402
+
+FORMATS = ("json", "snapshot")
+
+
+def memory_mb() -> dict:
+    """Current RSS and PSS of this process, from /proc/self/smaps_rollup."""
+    values = {}
+    with open("/proc/self/smaps_rollup", "r") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in ("Rss", "Pss"):
+                values[name.lower()] = int(value.split()[0]) / 1024
+    return values
+
+
+def load_indices(storage_format: str, index_dir: Path, service_context):
+    """Load both indices as NadavBotKnowledgeGraph._load_storage_context() does."""
+    from llama_index.core import StorageContext, load_indices_from_storage
+
+    from indexed_graph_store import IndexedGraphStore
+    from numpy_vector_store import NumpyVectorStore
+    from snapshot import load_snapshot
+
+    if storage_format == "snapshot":
+        storage_context = load_snapshot(index_dir, indexed_graph=True)
+    else:
+        storage_context = StorageContext.from_defaults(
+            persist_dir=str(index_dir),
+            graph_store=IndexedGraphStore.from_persist_dir(str(index_dir)),
+            vector_store=NumpyVectorStore.from_persist_path(
+                str(index_dir / "default__vector_store.json"))
+        )
+    return load_indices_from_storage(storage_context, service_context=service_context)
+
+
+def worker(storage_format: str, index_dir: Path, dim: int, seconds: float):
+    """Load, report ready, wait for the start signal, then retrieve until time is up."""
+    from llama_index.core import VectorStoreIndex
+    from llama_index.core.indices.knowledge_graph import KnowledgeGraphIndex  # noqa: F401
+    from llama_index.core.retrievers import VectorIndexRetriever  # noqa: F401
+
+    import indexed_graph_store, numpy_vector_store, snapshot  # noqa: F401,E401
+
+    # Only count what loading and querying the indices adds, not imports and models
+    service_context = mock_service_context(dim)
+    before = memory_mb()
+    start = time.perf_counter()
+    indices = load_indices(storage_format, index_dir, service_context)
+    load_s = time.perf_counter() - start
+    retriever = next(
+        index for index in indices if isinstance(index, VectorStoreIndex)
+    ).as_retriever(similarity_top_k=4)
+
+    print("ready", flush=True)
+    sys.stdin.readline()
+
+    queries = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        # Reads the embedding matrix and the matched node records
+        retriever.retrieve(f"query {queries}")
+        queries += 1
+
+    after = memory_mb()
+    print(json.dumps({
+        "load_s": load_s,
+        "queries": queries,
+        "rss_mb": after["rss"],
+        "pss_mb": after["pss"],
+        "index_rss_mb": after["rss"] - before["rss"],
+        "index_pss_mb": after["pss"] - before["pss"]
+    }), flush=True)
+
+
+def run_workers(storage_format: str, index_dir: Path, count: int, dim: int, seconds: float):
+    """Start ``count`` workers together; returns their results and total queries/s."""
+    procs = [
+        subprocess.Popen(
+            [sys.executable, __file__, "--worker", storage_format, str(index_dir),
+             "--dim", str(dim), "--seconds", str(seconds)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+        )
+        for _ in range(count)
+    ]
+    # Everyone has loaded before anyone starts querying
+    for proc in procs:
+        while proc.stdout.readline().strip() != "ready":
+            pass
+    for proc in procs:
+        proc.stdin.write("go\n")
+        proc.stdin.flush()
+
+    results = []
+    for proc in procs:
+        output, _ = proc.communicate()
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results, sum(result["queries"] for result in results) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--dim", type=int, default=1536,
+                        help="Embedding size (text-embedding-ada-002 is 1536)")
+    parser.add_argument("--seconds", type=float, default=5.0,
+                        help="How long every worker runs queries")
+    parser.add_argument("--worker", nargs=2, metavar=("FORMAT", "DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker[0], Path(args.worker[1]), args.dim, args.seconds)
+        return
+
+    from snapshot import save_snapshot
+
+    root = Path(tempfile.mkdtemp(prefix="bench-workers-"))
+    try:
+        storage_context = build_storage_context("snapshot", args.chunks, args.dim)
+        storage_context.persist(persist_dir=str(root / "json"))
+        save_snapshot(storage_context, root / "snapshot")
+        del storage_context
+
+        print(f"chunks={args.chunks} dim={args.dim} seconds={args.seconds}")
+        print(f"{'format':>9}{'workers':>8}{'load s':>8}{'RSS MB':>8}{'PSS MB':>8}"
+              f"{'index RSS':>10}{'index PSS':>10}{'total PSS':>10}{'q/s':>9}")
+        print("-" * 80)
+        for storage_format in FORMATS:
+            for count in args.workers:
+                results, throughput = run_workers(
+                    storage_format, root / storage_format, count, args.dim, args.seconds)
+
+                def mean(key):
+                    return sum(result[key] for result in results) / len(results)
+
+                print(f"{storage_format:>9}{count:>8}{mean('load_s'):>8.2f}"
+                      f"{mean('rss_mb'):>8.1f}{mean('pss_mb'):>8.1f}"
+                      f"{mean('index_rss_mb'):>10.1f}{mean('index_pss_mb'):>10.1f}"
+                      f"{sum(result['pss_mb'] for result in results):>10.1f}"
+                      f"{throughput:>9.1f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ export const useChat = () => {
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  const conversationIdRef = useRef<string | null>(null);
 
   const scrollToBottom = useCallback(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
@@ -43,14 +44,29 @@ export const useChat = () => {
     setMessages(prev => [...prev, loadingMessage]);
 
     try {
-      const response: ChatResponse = await apiClient.sendMessage(
+      // Fill the loading bubble in as tokens arrive
+      const response: ChatResponse = await apiClient.streamMessage(
         content,
+        conversationIdRef.current,
+        token => {
+          setMessages(prev => prev.map(msg =>
+            msg.id === loadingMessage.id
+              ? { ...msg, content: msg.content + token, isLoading: false }
+              : msg
+          ));
+        },
         messages
       );
 
-      // Remove loading message and add actual response
+      if (response.conversation_id) {
+        conversationIdRef.current = response.conversation_id;
+      }
+
+      // Replace the streamed bubble with the final response
       setMessages(prev => {
-        const filteredMessages = prev.filter(msg => !msg.isLoading);
+        const filteredMessages = prev.filter(
+          msg => !msg.isLoading && msg.id !== loadingMessage.id
+        );
         const assistantMessage: ChatMessage = {
           id: generateId(),
           role: 'assistant',
@@ -65,7 +81,9 @@ export const useChat = () => {
       
       // Remove loading message and add error message
       setMessages(prev => {
-        const filteredMessages = prev.filter(msg => !msg.isLoading);
+        const filteredMessages = prev.filter(
+          msg => !msg.isLoading && msg.id !== loadingMessage.id
+        );
         const errorMessage: ChatMessage = {
           id: generateId(),
           role: 'assistant',
@@ -80,6 +98,7 @@ export const useChat = () => {
   }, [isLoading, messages]);
 
   const clearMessages = useCallback(() => {
+    conversationIdRef.current = null;
     setMessages([]);
     setError(null);
   }, []);
@@ -12,6 +12,11 @@ export interface ChatResponse {
   conversation_id?: string;
 }
 
+export type ChatStreamFrame =
+  | { type: 'token'; content: string }
+  | { type: 'done'; sources: string[]; conversation_id: string }
+  | { type: 'error'; response: string; conversation_id?: string };
+
 export interface BotInfo {
   name: string;
   description: string;
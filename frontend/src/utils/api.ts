@@ -1,16 +1,27 @@
-import { ChatMessage, ChatResponse, BotInfo, ConversationStarter } from '../types';
+import { ChatMessage, ChatResponse, ChatStreamFrame, BotInfo, ConversationStarter } from '../types';
 
 const API_BASE_URL = process.env.NODE_ENV === 'development' 
   ? 'http://localhost:8000' 
   : 'https://your-backend-domain.com';
 
-export class ApiClient {
-  async sendMessage(message: string, conversationHistory: ChatMessage[]): Promise<ChatResponse> {
-    const formattedHistory = conversationHistory.map(msg => ({
-      role: msg.role,
-      content: msg.content
-    }));
+// Most recent messages sent along with each turn
+const HISTORY_SEED_MESSAGES = 10;
+
+const historySeed = (history: ChatMessage[]) =>
+  history
+    .filter(msg => !msg.isLoading && msg.content)
+    .slice(-HISTORY_SEED_MESSAGES)
+    .map(({ role, content }) => ({ role, content }));
 
+export class ApiClient {
+  // The backend keeps conversation history per conversation_id. The last few
+  // messages go along too: they are ignored while the session exists and
+  // reseed it if the server lost it (restart, expiry, another worker's memory)
+  async sendMessage(
+    message: string,
+    conversationId: string | null,
+    history: ChatMessage[] = []
+  ): Promise<ChatResponse> {
     const response = await fetch(`${API_BASE_URL}/chat`, {
       method: 'POST',
       headers: {
@@ -18,7 +29,8 @@ export class ApiClient {
       },
       body: JSON.stringify({
         message,
-        conversation_history: formattedHistory
+        conversation_id: conversationId,
+        conversation_history: historySeed(history)
       }),
     });
 
@@ -29,6 +41,60 @@ export class ApiClient {
     return await response.json();
   }
 
+  async streamMessage(
+    message: string,
+    conversationId: string | null,
+    onToken: (token: string) => void,
+    history: ChatMessage[] = []
+  ): Promise<ChatResponse> {
+    const response = await fetch(`${API_BASE_URL}/chat/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        message,
+        conversation_id: conversationId,
+        conversation_history: historySeed(history)
+      }),
+    });
+
+    if (!response.ok || !response.body) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffered = '';
+    let text = '';
+
+    // The body is newline-delimited JSON frames
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+
+      buffered += decoder.decode(value, { stream: true });
+      const lines = buffered.split('\n');
+      buffered = lines.pop() ?? '';
+
+      for (const line of lines) {
+        if (!line.trim()) continue;
+        const frame: ChatStreamFrame = JSON.parse(line);
+
+        if (frame.type === 'token') {
+          text += frame.content;
+          onToken(frame.content);
+        } else if (frame.type === 'done') {
+          return { response: text, sources: frame.sources, conversation_id: frame.conversation_id };
+        } else {
+          throw new Error(frame.response);
+        }
+      }
+    }
+
+    return { response: text, conversation_id: conversationId ?? undefined };
+  }
+
   async getBotInfo(): Promise<BotInfo> {
     const response = await fetch(`${API_BASE_URL}/info`);
     
@@ -3,29 +3,134 @@ Graph RAG Builder for NadavBot Portfolio
 Uses LlamaIndex and LangGraph to build a knowledge graph from personal data.
 """
 
+import asyncio
+import copy
+import hashlib
 import json
 import yaml
 import os
+import shutil
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Set, Tuple
 
 from llama_index.core import (
     VectorStoreIndex,
     SimpleDirectoryReader,
     StorageContext,
     KnowledgeGraphIndex,
-    ServiceContext
+    ServiceContext,
+    load_indices_from_storage
 )
 from llama_index.core.node_parser import SimpleNodeParser
+from llama_index.core.query_engine import RetrieverQueryEngine
+from llama_index.core.schema import MetadataMode, NodeWithScore
 from llama_index.core.storage.docstore import SimpleDocumentStore
 from llama_index.core.storage.index_store import SimpleIndexStore
-from llama_index.core.vector_stores import SimpleVectorStore
+from llama_index.core.vector_stores import (
+    SimpleVectorStore,
+    MetadataFilters,
+    MetadataFilter,
+    FilterCondition
+)
 from llama_index.core.graph_stores import SimpleGraphStore
 
 # For OpenAI integration
 from llama_index.llms.openai import OpenAI
 from llama_index.embeddings.openai import OpenAIEmbedding
 
+# Works both as graph.build_graph and when run as a script
+try:
+    from .embedding_cache import EmbeddingCache, CachedEmbedding
+    from .hybrid_retrieval import HybridFusionRetriever
+    from .indexed_graph_store import IndexedGraphStore
+    from .numpy_vector_store import NumpyVectorStore
+    from .parallel_extraction import RateLimiter, extract_triplets_parallel
+    from .data_watch import ChangeDetector
+    from .snapshot import is_snapshot, load_snapshot, remove_snapshot, save_snapshot
+    from .structured_index import StructuredIndex
+except ImportError:
+    from embedding_cache import EmbeddingCache, CachedEmbedding
+    from hybrid_retrieval import HybridFusionRetriever
+    from indexed_graph_store import IndexedGraphStore
+    from numpy_vector_store import NumpyVectorStore
+    from parallel_extraction import RateLimiter, extract_triplets_parallel
+    from data_watch import ChangeDetector
+    from snapshot import is_snapshot, load_snapshot, remove_snapshot, save_snapshot
+    from structured_index import StructuredIndex
+
+EMBEDDING_MODEL = "text-embedding-ada-002"
+EMBEDDING_CACHE_MAX_ENTRIES = int(
+    os.getenv("NADAVBOT_EMBED_CACHE_MAX_ENTRIES", "100000"))
+# Server workers that share storage/ with a separate builder process must
+# not write the embedding cache themselves
+EMBEDDING_CACHE_READ_ONLY = os.getenv(
+    "NADAVBOT_EMBED_CACHE_READ_ONLY", "false").lower() == "true"
+
+# "numpy" scores queries with one matrix product (optionally through an HNSW
+# index, which needs hnswlib); "simple" is LlamaIndex's pure-Python store.
+# Persisted stores are always loaded in the format they were written in.
+VECTOR_STORE_BACKEND = os.getenv("NADAVBOT_VECTOR_STORE", "numpy")
+VECTOR_ANN = os.getenv("NADAVBOT_VECTOR_ANN", "false").lower() == "true"
+VECTOR_ANN_MIN_SIZE = int(os.getenv("NADAVBOT_VECTOR_ANN_MIN_SIZE", "20000"))
+# File name StorageContext.persist() uses for the default vector store
+VECTOR_STORE_FILE = "default__vector_store.json"
+
+# "indexed" keeps triplets in adjacency arrays with a case-insensitive entity
+# name index and multi-hop traversal; "simple" is LlamaIndex's dict store.
+# Both persist the same JSON/snapshot records, so either loads the other's.
+GRAPH_STORE_BACKEND = os.getenv("NADAVBOT_GRAPH_STORE", "indexed")
+# Hops followed from matched entities (both edge directions) when collecting
+# triplets for retrieval; 1 returns only their direct relations
+GRAPH_TRAVERSAL_DEPTH = int(os.getenv("NADAVBOT_GRAPH_TRAVERSAL_DEPTH", "2"))
+
+# "snapshot" persists indices as memory-mapped binary files (numpy vector
+# store only); "json" uses LlamaIndex's StorageContext.persist()
+STORAGE_FORMAT = os.getenv("NADAVBOT_STORAGE_FORMAT", "snapshot")
+
+# Both indices share one storage context, persisted once under this directory.
+# Older builds kept a full copy per index in kg_index/ and vector_index/.
+INDEX_STORAGE_DIR = "index"
+LEGACY_STORAGE_DIRS = ("kg_index", "vector_index")
+
+# Incremental build manifest, stored next to index/
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+MAX_TRIPLETS_PER_CHUNK = 3
+
+# Triplet extraction concurrency and rate limiting
+KG_EXTRACT_CONCURRENCY = int(os.getenv("NADAVBOT_KG_EXTRACT_CONCURRENCY", "8"))
+KG_EXTRACT_RETRIES = int(os.getenv("NADAVBOT_KG_EXTRACT_RETRIES", "4"))
+KG_REQUESTS_PER_MINUTE = int(os.getenv("NADAVBOT_KG_REQUESTS_PER_MINUTE", "0"))
+
+# Retriever-only mode: how many chunks and triplets to return per query
+DEFAULT_RETRIEVAL_TOP_K = int(os.getenv("NADAVBOT_RETRIEVAL_TOP_K", "4"))
+MAX_RETRIEVED_TRIPLETS = int(os.getenv("NADAVBOT_MAX_RETRIEVED_TRIPLETS", "30"))
+
+# Most project/timeline facts returned by lookup_structured()
+STRUCTURED_MAX_FACTS = int(os.getenv("NADAVBOT_STRUCTURED_MAX_FACTS", "12"))
+
+# Hybrid mode: reciprocal rank fusion of graph and vector results
+HYBRID_GRAPH_WEIGHT = float(os.getenv("NADAVBOT_HYBRID_GRAPH_WEIGHT", "1.0"))
+HYBRID_VECTOR_WEIGHT = float(os.getenv("NADAVBOT_HYBRID_VECTOR_WEIGHT", "1.0"))
+HYBRID_RRF_K = int(os.getenv("NADAVBOT_HYBRID_RRF_K", "60"))
+
+# Words ignored when matching a query against knowledge graph entities
+QUERY_STOPWORDS = {
+    "a", "about", "an", "and", "any", "are", "as", "at", "be", "by", "can",
+    "did", "do", "does", "for", "from", "has", "have", "he", "his", "how",
+    "i", "in", "is", "it", "me", "my", "of", "on", "or", "tell", "that",
+    "the", "their", "to", "use", "uses", "was", "what", "when", "where",
+    "which", "who", "with", "you", "your", "nadav", "nadav's"
+}
+
+# Reader metadata that changes without the content changing
+VOLATILE_METADATA_KEYS = {
+    "file_path", "file_size", "creation_date",
+    "last_modified_date", "last_accessed_date"
+}
+
 
 class NadavBotKnowledgeGraph:
     """
@@ -39,7 +144,19 @@ class NadavBotKnowledgeGraph:
 
         # Initialize LLM and embedding model
         self.llm = OpenAI(model="gpt-3.5-turbo", temperature=0.1)
-        self.embed_model = OpenAIEmbedding(model="text-embedding-ada-002")
+
+        # Embeddings are memoized on disk, so rebuilds and restarts only pay
+        # for text that has never been embedded before
+        self.embedding_cache = EmbeddingCache(
+            self.storage_dir / "embedding_cache",
+            model_name=EMBEDDING_MODEL,
+            max_entries=EMBEDDING_CACHE_MAX_ENTRIES,
+            read_only=EMBEDDING_CACHE_READ_ONLY
+        )
+        self.embed_model = CachedEmbedding(
+            OpenAIEmbedding(model=EMBEDDING_MODEL),
+            self.embedding_cache
+        )
 
         # Initialize storage components
         self.storage_context = self._init_storage_context()
@@ -50,16 +167,88 @@ class NadavBotKnowledgeGraph:
 
         self.kg_index = None
         self.vector_index = None
+        # Built from projects.yaml and timeline.json whenever they are loaded
+        self.structured_index: Optional[StructuredIndex] = None
+
+        # Long-lived query engines keyed by (mode, similarity_top_k, response_mode, sources)
+        self._query_engines: Dict[Tuple, Any] = {}
+        self._query_engine_lock = threading.Lock()
+        self._query_engine_stats: Dict[str, Any] = {
+            "builds": 0,
+            "hits": 0,
+            "invalidations": 0,
+            "build_seconds_total": 0.0,
+            "build_seconds_by_key": {}
+        }
+
+    def new_generation(self) -> "NadavBotKnowledgeGraph":
+        """
+        A builder over the same data and storage directories that shares this
+        one's LLM, embedding model and embedding cache but none of its indices.
+
+        Rebuilding the copy leaves this builder's in-memory indices untouched,
+        so requests still running against it are unaffected until the caller
+        swaps the new builder in.
+        """
+        builder = copy.copy(self)
+        builder.storage_context = builder._init_storage_context()
+        builder.kg_index = None
+        builder.vector_index = None
+        builder.structured_index = None
+        builder._query_engines = {}
+        builder._query_engine_lock = threading.Lock()
+        builder._query_engine_stats = copy.deepcopy(self._query_engine_stats)
+        return builder
+
+    @property
+    def index_dir(self) -> Path:
+        """Where both indices are persisted."""
+        return self.storage_dir / INDEX_STORAGE_DIR
 
     def _init_storage_context(self) -> StorageContext:
         """Initialize storage context for persistent storage."""
         return StorageContext.from_defaults(
             docstore=SimpleDocumentStore(),
-            vector_store=SimpleVectorStore(),
+            vector_store=self._create_vector_store(),
             index_store=SimpleIndexStore(),
-            graph_store=SimpleGraphStore()
+            graph_store=self._create_graph_store()
         )
 
+    def _create_vector_store(self):
+        """Create an empty vector store of the configured backend."""
+        if VECTOR_STORE_BACKEND == "numpy":
+            return NumpyVectorStore(ann=VECTOR_ANN, ann_min_size=VECTOR_ANN_MIN_SIZE)
+        return SimpleVectorStore()
+
+    def _create_graph_store(self):
+        """Create an empty graph store of the configured backend."""
+        if GRAPH_STORE_BACKEND == "indexed":
+            return IndexedGraphStore()
+        return SimpleGraphStore()
+
+    def _load_storage_context(self, persist_dir: Path) -> StorageContext:
+        """Load a persisted storage context in whichever format it was saved in."""
+        indexed_graph = GRAPH_STORE_BACKEND == "indexed"
+        if is_snapshot(persist_dir):
+            return load_snapshot(
+                persist_dir,
+                ann=VECTOR_ANN,
+                ann_min_size=VECTOR_ANN_MIN_SIZE,
+                indexed_graph=indexed_graph
+            )
+
+        stores = {}
+        if indexed_graph:
+            stores["graph_store"] = IndexedGraphStore.from_persist_dir(str(persist_dir))
+        vector_store_path = persist_dir / VECTOR_STORE_FILE
+        if NumpyVectorStore.is_persisted_at(str(vector_store_path)):
+            stores["vector_store"] = NumpyVectorStore.from_persist_path(
+                str(vector_store_path),
+                ann=VECTOR_ANN,
+                ann_min_size=VECTOR_ANN_MIN_SIZE
+            )
+        return StorageContext.from_defaults(persist_dir=str(persist_dir), **stores)
+
     def load_structured_data(self) -> Dict[str, Any]:
         """Load structured data from YAML and JSON files."""
         structured_data = {}
@@ -78,61 +267,287 @@ class NadavBotKnowledgeGraph:
 
         return structured_data
 
-    def build_knowledge_graph(self):
-        """Build the complete knowledge graph from all data sources."""
-        print("Building NadavBot Knowledge Graph...")
-
+    def load_documents(self) -> List:
+        """Load every source document, including structured project and timeline entries."""
         # Load documents from markdown and text files
         documents = SimpleDirectoryReader(
             input_dir=str(self.data_dir),
             required_exts=[".md", ".txt"]
         ).load_data()
+        self._assign_stable_ids(documents)
 
         # Load structured data
         structured_data = self.load_structured_data()
+        self.structured_index = StructuredIndex.from_data(structured_data)
 
         # Enhance documents with structured data context
-        enhanced_docs = self._enhance_documents_with_structured_data(
+        return self._enhance_documents_with_structured_data(
             documents, structured_data
         )
 
-        # Build Knowledge Graph Index
-        print("Creating Knowledge Graph Index...")
-        self.kg_index = KnowledgeGraphIndex.from_documents(
-            enhanced_docs,
-            storage_context=self.storage_context,
-            service_context=self.service_context,
-            max_triplets_per_chunk=3,
-            show_progress=True
-        )
+    def build_knowledge_graph(self, incremental: bool = False):
+        """
+        Build the complete knowledge graph from all data sources.
+
+        With ``incremental=True`` and a manifest from a previous build, only
+        documents whose content hash changed are re-chunked, re-embedded and
+        re-extracted; removed documents have their nodes and triplets deleted.
+        """
+        print("Building NadavBot Knowledge Graph...")
+
+        enhanced_docs = self.load_documents()
 
-        # Build Vector Index for semantic search
-        print("Creating Vector Index...")
-        self.vector_index = VectorStoreIndex.from_documents(
-            enhanced_docs,
-            storage_context=self.storage_context,
-            service_context=self.service_context,
-            show_progress=True
+        manifest = self._load_manifest() if incremental else None
+        updating = manifest is not None and (
+            (self.kg_index and self.vector_index) or self.load_existing_indices()
         )
+        if updating:
+            print("Updating existing indices incrementally...")
+        else:
+            manifest = {"version": MANIFEST_VERSION, "documents": {}}
+
+            # Start from empty indices and insert every document below
+            print("Creating Knowledge Graph and Vector Indices...")
+            self.storage_context = self._init_storage_context()
+            self.kg_index = KnowledgeGraphIndex(
+                nodes=[],
+                storage_context=self.storage_context,
+                service_context=self.service_context,
+                max_triplets_per_chunk=MAX_TRIPLETS_PER_CHUNK
+            )
+            self.vector_index = VectorStoreIndex(
+                nodes=[],
+                storage_context=self.storage_context,
+                service_context=self.service_context
+            )
+
+        changes = self._apply_document_changes(enhanced_docs, manifest)
+        print(f"Document changes: {changes}")
+
+        if updating and not (changes["added"] or changes["updated"] or changes["removed"]):
+            # Nothing to write; a new snapshot would only make followers reload
+            print("Indices are already up to date.")
+            return self.kg_index, self.vector_index
 
         # Persist the indices
         self._persist_indices()
+        self._save_manifest(manifest)
+
+        # New indices mean any cached engines point at stale data
+        self.invalidate_query_engines()
+        self.warm_query_engines()
 
         print("Knowledge Graph built successfully!")
         return self.kg_index, self.vector_index
 
+    def watch_data(self, interval_seconds: float = 5.0):
+        """
+        Rebuild incrementally whenever the data files change, until interrupted.
+
+        Meant for a single builder process next to server workers that follow
+        the persisted snapshot (NADAVBOT_HOT_RELOAD=follow). A change is acted
+        on once the files have been quiet for a full interval.
+        """
+        changes = ChangeDetector(self.data_dir)
+        print(f"Watching {self.data_dir} for changes every {interval_seconds}s...")
+        while True:
+            time.sleep(interval_seconds)
+            if not changes.poll():
+                continue
+            try:
+                self.build_knowledge_graph(incremental=True)
+            except Exception as e:
+                print(f"Error rebuilding knowledge graph: {e}")
+
+    def _assign_stable_ids(self, documents: List):
+        """Give file documents IDs that survive re-reading, e.g. "file:skills.txt"."""
+        seen: Dict[str, int] = {}
+        for doc in documents:
+            base_id = f"file:{doc.metadata.get('file_name', 'unknown')}"
+            count = seen.get(base_id, 0)
+            seen[base_id] = count + 1
+            doc.id_ = base_id if count == 0 else f"{base_id}#{count}"
+
+    def _document_hash(self, doc) -> str:
+        """Hash a document's text and stable metadata."""
+        metadata = {
+            key: value for key, value in doc.metadata.items()
+            if key not in VOLATILE_METADATA_KEYS
+        }
+        payload = doc.text + "\n" + json.dumps(metadata, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _apply_document_changes(self, documents: List, manifest: Dict[str, Any]) -> Dict[str, int]:
+        """Bring the indices in line with ``documents``, updating ``manifest`` in place."""
+        entries = manifest["documents"]
+        current = {doc.doc_id: (doc, self._document_hash(doc)) for doc in documents}
+
+        stale = [
+            doc_id for doc_id, entry in entries.items()
+            if doc_id not in current or current[doc_id][1] != entry["hash"]
+        ]
+        fresh = [
+            doc_id for doc_id, (_, doc_hash) in current.items()
+            if entries.get(doc_id, {}).get("hash") != doc_hash
+        ]
+        changes = {
+            "added": len([doc_id for doc_id in fresh if doc_id not in entries]),
+            "updated": len([doc_id for doc_id in fresh if doc_id in entries]),
+            "removed": len([doc_id for doc_id in stale if doc_id not in current]),
+            "unchanged": len(current) - len(fresh)
+        }
+
+        for doc_id in stale:
+            self._remove_document(doc_id, entries)
+            del entries[doc_id]
+
+        fresh_triplets, failed = self._insert_documents(
+            [current[doc_id][0] for doc_id in fresh])
+        for doc_id in fresh:
+            entries[doc_id] = {
+                # A document with failed extractions is recorded without a
+                # hash, so the next incremental build replaces it
+                "hash": None if doc_id in failed else current[doc_id][1],
+                "triplets": fresh_triplets[doc_id]
+            }
+        changes["failed"] = len(failed)
+
+        return changes
+
+    def _insert_documents(
+        self, documents: List
+    ) -> Tuple[Dict[str, List[List[str]]], Set[str]]:
+        """
+        Chunk, embed and extract triplets for new documents.
+
+        Triplet extraction for all chunks runs concurrently; results are then
+        merged into the graph store in document and chunk order, so the
+        outcome does not depend on which LLM call finished first.
+        Returns the triplets added for each document ID, and the IDs of
+        documents with a chunk whose extraction gave up.
+        """
+        nodes = []
+        for doc in documents:
+            print(f"Indexing {doc.doc_id}...")
+            # Chunk once and give the same nodes to both indices, so the
+            # shared docstore holds a single copy of every chunk
+            doc_nodes = self.service_context.node_parser.get_nodes_from_documents([doc])
+            self.vector_index.insert_nodes(doc_nodes)
+            self.vector_index.docstore.set_document_hash(doc.doc_id, doc.hash)
+            nodes.extend(doc_nodes)
+
+        print(f"Extracting triplets from {len(nodes)} chunks "
+              f"(concurrency {KG_EXTRACT_CONCURRENCY})...")
+        node_triplets = extract_triplets_parallel(
+            [node.get_content(metadata_mode=MetadataMode.LLM) for node in nodes],
+            self.kg_index._extract_triplets,
+            max_concurrency=KG_EXTRACT_CONCURRENCY,
+            max_retries=KG_EXTRACT_RETRIES,
+            rate_limiter=RateLimiter(KG_REQUESTS_PER_MINUTE)
+        )
+
+        triplets_by_doc: Dict[str, List[List[str]]] = {
+            doc.doc_id: [] for doc in documents}
+        failed: Set[str] = set()
+        for node, triplets in zip(nodes, node_triplets):
+            if triplets is None:
+                failed.add(node.ref_doc_id)
+                triplets = []
+            for triplet in triplets:
+                self.kg_index.upsert_triplet_and_node(triplet, node)
+                triplets_by_doc[node.ref_doc_id].append(list(triplet))
+            self.kg_index.docstore.add_documents([node], allow_update=True)
+
+        self.kg_index.storage_context.index_store.add_index_struct(
+            self.kg_index.index_struct)
+        if failed:
+            print(f"Triplet extraction failed for {len(failed)} documents; "
+                  f"they will be retried on the next incremental build")
+        return triplets_by_doc, failed
+
+    def _remove_document(self, doc_id: str, entries: Dict[str, Any]):
+        """Delete a document's nodes, embeddings and triplets no other document shares."""
+        ref_doc_info = self.kg_index.docstore.get_ref_doc_info(doc_id)
+        node_ids = set(ref_doc_info.node_ids) if ref_doc_info else set()
+
+        # First, while the (possibly shared) docstore still knows the
+        # document's nodes, so the vector index struct is cleaned up too
+        self.vector_index.delete_ref_doc(doc_id, delete_from_docstore=True)
+
+        table = self.kg_index.index_struct.table
+        for keyword in list(table.keys()):
+            remaining = set(table[keyword]) - node_ids
+            if remaining:
+                table[keyword] = remaining
+            else:
+                del table[keyword]
+
+        shared_triplets = {
+            tuple(triplet)
+            for other_id, entry in entries.items() if other_id != doc_id
+            for triplet in entry["triplets"]
+        }
+        for triplet in entries[doc_id]["triplets"]:
+            if tuple(triplet) not in shared_triplets:
+                self._delete_triplet(*triplet)
+
+        self.kg_index.docstore.delete_ref_doc(doc_id, raise_error=False)
+        self.kg_index.storage_context.index_store.add_index_struct(
+            self.kg_index.index_struct)
+
+    def _delete_triplet(self, subj: str, rel: str, obj: str):
+        """Remove one triplet from the graph store."""
+        graph_store = self.kg_index.graph_store
+        if not isinstance(graph_store, SimpleGraphStore):
+            graph_store.delete(subj, rel, obj)
+            return
+
+        # SimpleGraphStore.delete looks for a (rel, obj) tuple among the
+        # stored [rel, obj] lists, so it never finds anything
+        graph_dict = graph_store._data.graph_dict
+        remaining = [pair for pair in graph_dict.get(subj, []) if list(pair) != [rel, obj]]
+        if remaining:
+            graph_dict[subj] = remaining
+        else:
+            graph_dict.pop(subj, None)
+
+    def _load_manifest(self) -> Optional[Dict[str, Any]]:
+        """Load the build manifest, or None if missing or from another version."""
+        manifest_file = self.storage_dir / MANIFEST_FILE
+        if not manifest_file.exists():
+            return None
+
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        if manifest.get("version") != MANIFEST_VERSION:
+            return None
+        return manifest
+
+    def _save_manifest(self, manifest: Dict[str, Any]):
+        """Write the build manifest next to the persisted indices."""
+        with open(self.storage_dir / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
     def _enhance_documents_with_structured_data(
         self, documents: List, structured_data: Dict[str, Any]
     ) -> List:
         """Enhance documents with structured data for better graph construction."""
         enhanced_docs = documents.copy()
 
+        # Tag raw files with a source name ("resume", "skills") so retrieval
+        # can be restricted to them the same way as projects and timeline
+        for doc in documents:
+            doc.metadata.setdefault(
+                'source', Path(doc.metadata.get('file_name', '')).stem)
+
         # Add project information as structured text
         if 'projects' in structured_data:
             for project in structured_data['projects']['projects']:
                 project_text = self._format_project_text(project)
                 # Create a document-like object for the project
                 enhanced_docs.append(type(documents[0])(
+                    id_=f"project:{project['name']}",
                     text=project_text,
                     metadata={
                         'source': 'projects',
@@ -147,6 +562,7 @@ class NadavBotKnowledgeGraph:
             for event in structured_data['timeline']['timeline']:
                 event_text = self._format_timeline_event(event)
                 enhanced_docs.append(type(documents[0])(
+                    id_=f"timeline:{event['year']}-{event.get('month', 'Unknown')}:{event['title']}",
                     text=event_text,
                     metadata={
                         'source': 'timeline',
@@ -190,45 +606,64 @@ class NadavBotKnowledgeGraph:
         return text
 
     def _persist_indices(self):
-        """Persist indices to storage."""
-        kg_storage_dir = self.storage_dir / "kg_index"
-        vector_storage_dir = self.storage_dir / "vector_index"
+        """
+        Persist indices to storage.
+
+        Both indices live in one storage context, so documents, nodes,
+        embeddings and the graph are written once and referenced by both
+        index structs.
+        """
+        index_dir = self.index_dir
+        index_dir.mkdir(exist_ok=True)
+        self._persist_storage_context(self.storage_context, index_dir)
 
-        kg_storage_dir.mkdir(exist_ok=True)
-        vector_storage_dir.mkdir(exist_ok=True)
+        # Per-index copies from older builds are superseded
+        for legacy_dir in LEGACY_STORAGE_DIRS:
+            shutil.rmtree(self.storage_dir / legacy_dir, ignore_errors=True)
 
-        # Save indices
-        self.kg_index.storage_context.persist(persist_dir=str(kg_storage_dir))
-        self.vector_index.storage_context.persist(
-            persist_dir=str(vector_storage_dir))
+        self.embedding_cache.flush()
 
         print(f"Indices saved to {self.storage_dir}")
 
+    def _persist_storage_context(self, storage_context: StorageContext, persist_dir: Path):
+        """Persist one storage context as a binary snapshot or as LlamaIndex JSON."""
+        if STORAGE_FORMAT == "snapshot" and isinstance(
+                storage_context.vector_store, NumpyVectorStore):
+            save_snapshot(storage_context, persist_dir)
+            return
+
+        # A storage context loaded from a snapshot persists every node here, not
+        # just the ones changed since (see SnapshotKVStore.persist)
+        storage_context.persist(persist_dir=str(persist_dir))
+        # A leftover snapshot would shadow the JSON files on the next load
+        remove_snapshot(persist_dir)
+
     def load_existing_indices(self):
         """Load existing indices from storage."""
-        kg_storage_dir = self.storage_dir / "kg_index"
-        vector_storage_dir = self.storage_dir / "vector_index"
+        index_dir = self.index_dir
+        if not index_dir.exists():
+            # Older builds persisted the same shared storage context once per
+            # index, so either copy holds both indices
+            index_dir = self.storage_dir / LEGACY_STORAGE_DIRS[-1]
 
-        if kg_storage_dir.exists() and vector_storage_dir.exists():
+        if index_dir.exists():
             print("Loading existing indices...")
+            self.structured_index = StructuredIndex.from_data(self.load_structured_data())
 
-            # Load Knowledge Graph Index
-            kg_storage_context = StorageContext.from_defaults(
-                persist_dir=str(kg_storage_dir)
-            )
-            self.kg_index = KnowledgeGraphIndex.load_from_storage(
-                storage_context=kg_storage_context,
+            # One storage context (docstore, vector store, graph store) backs both indices
+            self.storage_context = self._load_storage_context(index_dir)
+            indices = load_indices_from_storage(
+                self.storage_context,
                 service_context=self.service_context
             )
+            self.kg_index = next(
+                index for index in indices if isinstance(index, KnowledgeGraphIndex))
+            self.kg_index.max_triplets_per_chunk = MAX_TRIPLETS_PER_CHUNK
+            self.vector_index = next(
+                index for index in indices if isinstance(index, VectorStoreIndex))
 
-            # Load Vector Index
-            vector_storage_context = StorageContext.from_defaults(
-                persist_dir=str(vector_storage_dir)
-            )
-            self.vector_index = VectorStoreIndex.load_from_storage(
-                storage_context=vector_storage_context,
-                service_context=self.service_context
-            )
+            self.invalidate_query_engines()
+            self.warm_query_engines()
 
             print("Indices loaded successfully!")
             return True
@@ -236,31 +671,409 @@ class NadavBotKnowledgeGraph:
             print("No existing indices found. Will build new ones.")
             return False
 
-    def query_graph(self, query: str, mode: str = "hybrid") -> str:
-        """Query the knowledge graph."""
+    def _create_query_engine(
+        self,
+        mode: str,
+        similarity_top_k: Optional[int] = None,
+        response_mode: Optional[str] = None,
+        sources: Optional[Tuple[str, ...]] = None
+    ):
+        """Construct a new query engine for the given mode and parameters."""
+        engine_kwargs = {}
+        if similarity_top_k is not None:
+            engine_kwargs["similarity_top_k"] = similarity_top_k
+        if response_mode is not None:
+            engine_kwargs["response_mode"] = response_mode
+
+        if mode == "hybrid":
+            # One fused retrieval pass, then a single synthesis over the result
+            return RetrieverQueryEngine.from_args(
+                self._create_hybrid_retriever(
+                    similarity_top_k or DEFAULT_RETRIEVAL_TOP_K, sources),
+                service_context=self.service_context,
+                **({"response_mode": response_mode} if response_mode else {})
+            )
+
+        if sources:
+            if mode != "vector":
+                raise ValueError(
+                    "Filtering by source is only supported in vector and hybrid modes.")
+            engine_kwargs["filters"] = self._source_filters(sources)
+
+        if mode == "graph":
+            return self.kg_index.as_query_engine(**engine_kwargs)
+        return self.vector_index.as_query_engine(**engine_kwargs)
+
+    def _create_hybrid_retriever(
+        self,
+        similarity_top_k: int,
+        sources: Optional[Tuple[str, ...]] = None
+    ) -> HybridFusionRetriever:
+        """Construct a graph + vector fusion retriever."""
+        vector_kwargs: Dict[str, Any] = {"similarity_top_k": similarity_top_k}
+        if sources:
+            vector_kwargs["filters"] = self._source_filters(sources)
+
+        return HybridFusionRetriever(
+            graph_retrieve=lambda query: self._graph_matches(
+                query, similarity_top_k, sources)[0],
+            vector_retriever=self.vector_index.as_retriever(**vector_kwargs),
+            graph_weight=HYBRID_GRAPH_WEIGHT,
+            vector_weight=HYBRID_VECTOR_WEIGHT,
+            rrf_k=HYBRID_RRF_K,
+            similarity_top_k=similarity_top_k
+        )
+
+    @staticmethod
+    def _source_filters(sources: Tuple[str, ...]) -> MetadataFilters:
+        """Match nodes whose ``source`` metadata is any of ``sources``."""
+        return MetadataFilters(
+            filters=[MetadataFilter(key="source", value=source)
+                     for source in sources],
+            condition=FilterCondition.OR
+        )
+
+    def get_query_engine(
+        self,
+        mode: str = "hybrid",
+        similarity_top_k: Optional[int] = None,
+        response_mode: Optional[str] = None,
+        sources: Optional[Tuple[str, ...]] = None
+    ):
+        """Return a cached query engine, building it on first use."""
         if not self.kg_index or not self.vector_index:
             raise ValueError(
                 "Indices not built or loaded. Call build_knowledge_graph() first.")
 
-        if mode == "graph":
-            query_engine = self.kg_index.as_query_engine()
-        elif mode == "vector":
-            query_engine = self.vector_index.as_query_engine()
-        else:  # hybrid
-            # Create a hybrid query engine (implementation would depend on specific needs)
-            query_engine = self.kg_index.as_query_engine()
+        sources = tuple(sorted(sources)) if sources else None
+        return self._get_or_build(
+            (mode, similarity_top_k, response_mode, sources),
+            lambda: self._create_query_engine(
+                mode, similarity_top_k, response_mode, sources)
+        )
+
+    def get_vector_retriever(
+        self,
+        similarity_top_k: int = DEFAULT_RETRIEVAL_TOP_K,
+        sources: Optional[Tuple[str, ...]] = None
+    ):
+        """Return a cached vector retriever; it embeds the query but never calls the LLM."""
+        if not self.vector_index:
+            raise ValueError(
+                "Indices not built or loaded. Call build_knowledge_graph() first.")
+
+        sources = tuple(sorted(sources)) if sources else None
+        retriever_kwargs: Dict[str, Any] = {"similarity_top_k": similarity_top_k}
+        if sources:
+            retriever_kwargs["filters"] = self._source_filters(sources)
+
+        return self._get_or_build(
+            ("retriever", "vector", similarity_top_k, sources),
+            lambda: self.vector_index.as_retriever(**retriever_kwargs)
+        )
+
+    def get_hybrid_retriever(
+        self,
+        similarity_top_k: int = DEFAULT_RETRIEVAL_TOP_K,
+        sources: Optional[Tuple[str, ...]] = None
+    ) -> HybridFusionRetriever:
+        """Return a cached graph + vector fusion retriever."""
+        if not self.kg_index or not self.vector_index:
+            raise ValueError(
+                "Indices not built or loaded. Call build_knowledge_graph() first.")
+
+        sources = tuple(sorted(sources)) if sources else None
+        return self._get_or_build(
+            ("retriever", "hybrid", similarity_top_k, sources),
+            lambda: self._create_hybrid_retriever(similarity_top_k, sources)
+        )
+
+    def _get_or_build(self, key: Tuple, build):
+        """Look ``key`` up in the engine registry, building and timing it on a miss."""
+        with self._query_engine_lock:
+            engine = self._query_engines.get(key)
+            if engine is not None:
+                self._query_engine_stats["hits"] += 1
+                return engine
+
+            start = time.perf_counter()
+            engine = build()
+            elapsed = time.perf_counter() - start
+
+            self._query_engines[key] = engine
+            self._query_engine_stats["builds"] += 1
+            self._query_engine_stats["build_seconds_total"] += elapsed
+            self._query_engine_stats["build_seconds_by_key"][
+                ":".join(str(part) for part in key)] = elapsed
+
+            return engine
+
+    def warm_query_engines(self, modes: Tuple[str, ...] = ("graph", "vector", "hybrid")):
+        """Build the default engine for each mode so requests never pay for it."""
+        for mode in modes:
+            self.get_query_engine(mode)
+        self.get_vector_retriever()
+        self.get_hybrid_retriever()
+
+    def invalidate_query_engines(self):
+        """Drop all cached query engines; call whenever the indices change."""
+        with self._query_engine_lock:
+            self._query_engines.clear()
+            self._query_engine_stats["invalidations"] += 1
+
+    def get_query_engine_stats(self) -> Dict[str, Any]:
+        """Return engine registry metrics, including construction times."""
+        with self._query_engine_lock:
+            return {
+                "cached_engines": len(self._query_engines),
+                **self._query_engine_stats,
+                "build_seconds_by_key": dict(
+                    self._query_engine_stats["build_seconds_by_key"])
+            }
+
+    def query_graph(
+        self,
+        query: str,
+        mode: str = "hybrid",
+        similarity_top_k: Optional[int] = None,
+        response_mode: Optional[str] = None,
+        sources: Optional[Tuple[str, ...]] = None
+    ) -> str:
+        """
+        Query the knowledge graph.
+
+        Hybrid mode fuses graph and vector retrieval into one ranked node
+        list before a single synthesis. ``sources`` restricts vector and
+        hybrid retrieval to documents whose ``source`` metadata matches one
+        of the given names (e.g. "projects", "skills").
+        """
+        query_engine = self.get_query_engine(
+            mode, similarity_top_k, response_mode, sources)
 
         response = query_engine.query(query)
         return str(response)
 
+    async def aquery_graph(
+        self,
+        query: str,
+        mode: str = "hybrid",
+        similarity_top_k: Optional[int] = None,
+        response_mode: Optional[str] = None,
+        sources: Optional[Tuple[str, ...]] = None
+    ) -> str:
+        """Async variant of query_graph()."""
+        query_engine = self.get_query_engine(
+            mode, similarity_top_k, response_mode, sources)
+
+        if mode in ("vector", "hybrid"):
+            response = await query_engine.aquery(query)
+        else:
+            # LlamaIndex's KG retriever has no async path and would run its
+            # keyword-extraction LLM call on the event loop, so keep it on a thread
+            response = await asyncio.to_thread(query_engine.query, query)
+        return str(response)
+
+    def retrieve_nodes(
+        self,
+        query: str,
+        mode: str = "hybrid",
+        similarity_top_k: int = DEFAULT_RETRIEVAL_TOP_K,
+        sources: Optional[Tuple[str, ...]] = None
+    ) -> Dict[str, Any]:
+        """
+        Retrieve scored source chunks and triplets without synthesizing an answer.
+
+        Unlike query_graph(), this makes no LLM calls: the vector side only
+        embeds the query (served from the embedding cache when possible) and
+        the graph side matches query terms against entity names locally.
+        In hybrid mode both run and their chunks are merged into one ranking
+        with reciprocal rank fusion.
+
+        Returns ``{"nodes": [...], "triplets": [...]}`` where each node is a
+        dict with ``node_id``, ``text``, ``score``, ``metadata`` and
+        ``retriever``, and each triplet is a ``(subject, relation, object)``.
+        """
+        if not self.kg_index or not self.vector_index:
+            raise ValueError(
+                "Indices not built or loaded. Call build_knowledge_graph() first.")
+
+        graph_nodes, triplets, vector_nodes = [], [], []
+        if mode in ("graph", "hybrid"):
+            graph_nodes, triplets = self._graph_matches(query, similarity_top_k, sources)
+        if mode in ("vector", "hybrid"):
+            vector_nodes = self.get_vector_retriever(
+                similarity_top_k, sources).retrieve(query)
+
+        return self._retrieval_result(
+            mode, similarity_top_k, sources, graph_nodes, triplets, vector_nodes)
+
+    async def aretrieve_nodes(
+        self,
+        query: str,
+        mode: str = "hybrid",
+        similarity_top_k: int = DEFAULT_RETRIEVAL_TOP_K,
+        sources: Optional[Tuple[str, ...]] = None
+    ) -> Dict[str, Any]:
+        """Async variant of retrieve_nodes()."""
+        if not self.kg_index or not self.vector_index:
+            raise ValueError(
+                "Indices not built or loaded. Call build_knowledge_graph() first.")
+
+        graph_nodes, triplets, vector_nodes = [], [], []
+        if mode in ("graph", "hybrid"):
+            # Pure in-memory lookups, cheap enough to run on the event loop
+            graph_nodes, triplets = self._graph_matches(query, similarity_top_k, sources)
+        if mode in ("vector", "hybrid"):
+            vector_nodes = await self.get_vector_retriever(
+                similarity_top_k, sources).aretrieve(query)
+
+        return self._retrieval_result(
+            mode, similarity_top_k, sources, graph_nodes, triplets, vector_nodes)
+
+    def _retrieval_result(
+        self,
+        mode: str,
+        similarity_top_k: int,
+        sources: Optional[Tuple[str, ...]],
+        graph_nodes: List[NodeWithScore],
+        triplets: List[Tuple[str, str, str]],
+        vector_nodes: List[NodeWithScore]
+    ) -> Dict[str, Any]:
+        """Shape graph and vector results into the retrieve_nodes() return value."""
+        if mode == "hybrid":
+            fused = self.get_hybrid_retriever(
+                similarity_top_k, sources).fuse(graph_nodes, vector_nodes)
+            nodes = self._node_dicts(fused, "hybrid")
+        else:
+            nodes = (self._node_dicts(graph_nodes, "graph") +
+                     self._node_dicts(vector_nodes, "vector"))
+        return {"nodes": nodes, "triplets": triplets}
+
+    def _graph_matches(
+        self,
+        query: str,
+        similarity_top_k: int,
+        sources: Optional[Tuple[str, ...]] = None
+    ) -> Tuple[List[NodeWithScore], List[Tuple[str, str, str]]]:
+        """
+        Match query terms against knowledge graph entities.
+
+        Chunks are scored by the fraction of query terms their entities
+        matched. Triplets are the relations within GRAPH_TRAVERSAL_DEPTH
+        hops of the matched entities (direct relations only with the
+        simple graph store), nearest first.
+        """
+        terms = _query_terms(query)
+        if not terms:
+            return [], []
+
+        table = self.kg_index.index_struct.table
+        graph_store = self.kg_index.graph_store
+        if isinstance(graph_store, IndexedGraphStore):
+            matched_entities = graph_store.find_mentions(terms)
+            triplets = graph_store.traverse(
+                matched_entities,
+                depth=GRAPH_TRAVERSAL_DEPTH,
+                limit=MAX_RETRIEVED_TRIPLETS
+            )
+        else:
+            query_text = " ".join(terms)
+            matched_entities = [
+                entity for entity in table
+                if entity.lower() in terms or (
+                    " " in entity and f" {entity.lower()} " in f" {query_text} ")
+            ]
+            triplets = [
+                (entity, relation, obj)
+                for entity in matched_entities
+                for relation, obj in graph_store.get(entity)
+            ][:MAX_RETRIEVED_TRIPLETS]
+
+        node_hits: Dict[str, int] = {}
+        for entity in matched_entities:
+            for node_id in table.get(entity, ()):
+                node_hits[node_id] = node_hits.get(node_id, 0) + 1
+
+        ranked_ids = sorted(node_hits, key=node_hits.get, reverse=True)
+        nodes = []
+        for node in self.kg_index.docstore.get_nodes(ranked_ids, raise_error=False):
+            if node is None:
+                continue
+            if sources and node.metadata.get("source") not in sources:
+                continue
+            nodes.append(NodeWithScore(
+                node=node, score=node_hits[node.node_id] / len(terms)))
+            if len(nodes) >= similarity_top_k:
+                break
+
+        return nodes, triplets
+
+    def lookup_structured(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Look the query up in the structured project/timeline index; no
+        embedding or LLM call is made.
+
+        Returns {"facts", "filters", "complete"}, where "complete" means the
+        query asks for nothing beyond the facts, or None when the query names
+        no known technology, year, category or status.
+        """
+        if self.structured_index is None:
+            self.structured_index = StructuredIndex.from_data(self.load_structured_data())
+
+        match = self.structured_index.lookup(query)
+        if match is None:
+            return None
+
+        facts = match.facts(STRUCTURED_MAX_FACTS)
+        return {
+            "facts": facts,
+            "filters": match.filters,
+            "complete": match.complete and bool(facts)
+        }
+
+    @staticmethod
+    def _node_dicts(nodes_with_scores: List[NodeWithScore], retriever: str) -> List[Dict[str, Any]]:
+        """Convert LlamaIndex NodeWithScore results to plain dicts."""
+        return [
+            {
+                "node_id": result.node.node_id,
+                "text": result.node.get_content(metadata_mode=MetadataMode.NONE),
+                "score": result.score,
+                "metadata": dict(result.node.metadata),
+                "retriever": retriever
+            }
+            for result in nodes_with_scores
+        ]
+
+
+def _query_terms(query: str) -> List[str]:
+    """Lowercased query words with punctuation and stopwords removed."""
+    words = (word.strip(".,!?;:()\"'") for word in query.lower().split())
+    return [word for word in words if word and word not in QUERY_STOPWORDS]
+
 
 def main():
     """Main function to build the knowledge graph."""
     # Load environment variables
+    import argparse
     import os
     from dotenv import load_dotenv
     load_dotenv()
 
+    parser = argparse.ArgumentParser(description="Build the NadavBot knowledge graph")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-index documents that changed since the last build"
+    )
+    parser.add_argument(
+        "--watch",
+        type=float,
+        metavar="SECONDS",
+        help="Keep running and rebuild incrementally when data/ changes, polling every SECONDS"
+    )
+    args = parser.parse_args()
+
     if not os.getenv("OPENAI_API_KEY"):
         print("Warning: OPENAI_API_KEY not found in environment variables.")
         print("Please set your OpenAI API key in .env file")
@@ -270,9 +1083,15 @@ def main():
     kg_builder = NadavBotKnowledgeGraph()
 
     # Try to load existing indices, otherwise build new ones
-    if not kg_builder.load_existing_indices():
+    if args.incremental:
+        kg_builder.build_knowledge_graph(incremental=True)
+    elif not kg_builder.load_existing_indices():
         kg_builder.build_knowledge_graph()
 
+    if args.watch:
+        kg_builder.watch_data(args.watch)
+        return
+
     # Test the graph with some sample queries
     test_queries = [
         "What are Nadav's main technical skills?",
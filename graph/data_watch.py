@@ -0,0 +1,60 @@
+"""
+Change detection for NadavBot's data and storage directories
+A cheap fingerprint of a directory tree, shared by the response cache, the
+background index builder and the server's hot reload.
+"""
+
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+
+def data_fingerprint(directory: Path) -> Optional[Tuple]:
+    """
+    Path, mtime and size of every file under ``directory``, or None if it is
+    missing. Builders replace and delete files while this runs, so anything
+    that vanishes between listing and stat is skipped rather than raised.
+    """
+    directory = Path(directory)
+    if not directory.exists():
+        return None
+
+    entries = []
+    # os.walk ignores directories that disappear mid-walk
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(entries))
+
+
+class ChangeDetector:
+    """
+    Debounced change detection for a directory, polled by the caller.
+
+    poll() reports a change only once the fingerprint has differed from the
+    last acted-on one and then stayed the same for a further poll, so a burst
+    of edits (or a build still writing files) is reported once, settled.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.fingerprint = data_fingerprint(self.directory)
+        # A new fingerprint seen on the last poll and waiting to settle
+        self.pending: Optional[Tuple] = None
+
+    def poll(self) -> bool:
+        """Return True if the directory changed and has since been quiet."""
+        current = data_fingerprint(self.directory)
+        if current == self.fingerprint:
+            self.pending = None
+            return False
+        if current != self.pending:
+            self.pending = current
+            return False
+        self.fingerprint, self.pending = current, None
+        return True
@@ -0,0 +1,350 @@
+"""
+Persistent embedding cache for NadavBot
+Content-addressed store shared by index builds and query-time retrieval.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.bridge.pydantic import PrivateAttr
+
+VECTORS_FILE = "vectors.f32"
+INDEX_FILE = "index.json"
+LOG_FILE = "index.log"
+# Log entries after which index.json is rewritten and the log truncated
+CHECKPOINT_ENTRIES = 1000
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache keyed by (model, text hash).
+
+    Vectors live in a flat float32 file that is memory-mapped for reads and
+    appended to on writes; ``index.json`` maps each key to its row and last-use
+    tick. New keys are appended to ``index.log`` as one JSON line each, and
+    the log is folded into ``index.json`` every ``CHECKPOINT_ENTRIES`` entries,
+    so a write costs one short append rather than rewriting the whole index.
+    When the entry count passes ``max_entries`` the least recently used rows
+    are dropped and the vector file is compacted.
+
+    With ``read_only=True`` the files are never written, so several server
+    processes can share a cache that one builder process owns. New embeddings
+    are then kept in memory for the life of the process.
+    """
+
+    def __init__(self, cache_dir: Path, model_name: str, max_entries: int = 100000,
+                 read_only: bool = False):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.read_only = read_only
+
+        self._lock = threading.Lock()
+        self._dim: Optional[int] = None
+        self._rows: Dict[str, List[int]] = {}  # key -> [row, last_used_tick]
+        self._tick = 0
+        self._vectors: Optional[np.ndarray] = None
+        self._dirty = False
+        # Bumped by every compaction, which renumbers rows; log lines from an
+        # older generation are ignored when loading
+        self._generation = 0
+        self._log_entries = 0
+        # Embeddings added to a read-only cache
+        self._memory: Dict[str, List[float]] = {}
+
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._load()
+        if self.read_only and self._rows:
+            # Map now, so a compaction by the writer cannot shift rows under us
+            self._mapped_vectors()
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(
+            f"{self.model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """Return the cached embedding for ``text`` or None."""
+        key = self._key(text)
+        with self._lock:
+            entry = self._rows.get(key)
+            if entry is None:
+                if key in self._memory:
+                    self.stats["hits"] += 1
+                    return self._memory[key]
+                self.stats["misses"] += 1
+                return None
+
+            self._tick += 1
+            entry[1] = self._tick
+            self._dirty = True
+            self.stats["hits"] += 1
+            return self._mapped_vectors()[entry[0]].tolist()
+
+    def put_many(self, texts: List[str], embeddings: List[List[float]]):
+        """Append new embeddings and log their keys."""
+        with self._lock:
+            if self.read_only:
+                if len(self._memory) + len(texts) > self.max_entries:
+                    self._memory.clear()
+                for text, embedding in zip(texts, embeddings):
+                    self._memory[self._key(text)] = embedding
+                return
+
+            new_keys, new_rows = [], []
+            for text, embedding in zip(texts, embeddings):
+                key = self._key(text)
+                if key in self._rows:
+                    continue
+                if self._dim is None:
+                    self._dim = len(embedding)
+                self._tick += 1
+                self._rows[key] = [len(self._rows), self._tick]
+                new_keys.append(key)
+                new_rows.append(embedding)
+
+            if not new_rows:
+                return
+
+            # Vectors first: a reader may see rows the log does not mention
+            # yet, never log entries without their rows
+            with open(self.cache_dir / VECTORS_FILE, "ab") as f:
+                np.asarray(new_rows, dtype=np.float32).tofile(f)
+            self._vectors = None
+
+            if len(self._rows) > self.max_entries:
+                self._evict()
+                self._write_index()
+            elif (self._log_entries + len(new_keys) >= CHECKPOINT_ENTRIES
+                    or not (self.cache_dir / INDEX_FILE).exists()):
+                self._write_index()
+            else:
+                self._append_log(new_keys)
+
+    def flush(self):
+        """Persist last-use ticks so eviction order survives restarts."""
+        with self._lock:
+            if self._dirty and not self.read_only:
+                self._write_index()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit-rate and size statistics."""
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            vectors_file = self.cache_dir / VECTORS_FILE
+            return {
+                **self.stats,
+                "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._rows) + len(self._memory),
+                "read_only": self.read_only,
+                "max_entries": self.max_entries,
+                "bytes": vectors_file.stat().st_size if vectors_file.exists() else 0
+            }
+
+    def _mapped_vectors(self) -> np.ndarray:
+        if self._vectors is None:
+            self._vectors = np.memmap(
+                self.cache_dir / VECTORS_FILE,
+                dtype=np.float32,
+                mode="r",
+                shape=(len(self._rows), self._dim)
+            )
+        return self._vectors
+
+    def _evict(self):
+        """Keep the most recently used three quarters of max_entries and compact."""
+        keep = max(1, (self.max_entries * 3) // 4)
+        # Release the mapping first; Windows cannot replace a mapped file
+        self._vectors = None
+        survivors = sorted(
+            self._rows.items(), key=lambda item: item[1][1], reverse=True)[:keep]
+
+        vectors = np.fromfile(self.cache_dir / VECTORS_FILE, dtype=np.float32)
+        vectors = vectors.reshape(-1, self._dim)
+        kept = vectors[[entry[0] for _, entry in survivors]]
+
+        tmp_file = self.cache_dir / (VECTORS_FILE + ".tmp")
+        kept.tofile(tmp_file)
+        os.replace(tmp_file, self.cache_dir / VECTORS_FILE)
+
+        self.stats["evictions"] += len(self._rows) - len(survivors)
+        self._rows = {
+            key: [row, entry[1]] for row, (key, entry) in enumerate(survivors)
+        }
+        self._generation += 1
+        self._vectors = None
+
+    def _append_log(self, keys: List[str]):
+        lines = "".join(
+            json.dumps({"gen": self._generation, "key": key, "entry": self._rows[key]}) + "\n"
+            for key in keys
+        )
+        with open(self.cache_dir / LOG_FILE, "a", encoding="utf-8") as f:
+            f.write(lines)
+        self._log_entries += len(keys)
+
+    def _write_index(self):
+        """Checkpoint every entry to index.json and empty the log."""
+        tmp_file = self.cache_dir / (INDEX_FILE + ".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({
+                "model": self.model_name,
+                "dim": self._dim,
+                "tick": self._tick,
+                "generation": self._generation,
+                "rows": self._rows
+            }, f)
+        os.replace(tmp_file, self.cache_dir / INDEX_FILE)
+        # Replaying the log over the new checkpoint would be harmless, so a
+        # crash before this truncation loses nothing
+        open(self.cache_dir / LOG_FILE, "w").close()
+        self._log_entries = 0
+        self._dirty = False
+
+    def _replay_log(self, rows: Dict[str, List[int]], generation: int) -> int:
+        """Add logged entries of ``generation`` to ``rows``; returns the highest tick."""
+        log_file = self.cache_dir / LOG_FILE
+        tick = 0
+        if not log_file.exists():
+            return tick
+        with open(log_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line still being written by another process
+                    break
+                if record["gen"] == generation:
+                    rows[record["key"]] = record["entry"]
+                    tick = max(tick, record["entry"][1])
+                    self._log_entries += 1
+        return tick
+
+    def _load(self):
+        index_file = self.cache_dir / INDEX_FILE
+        vectors_file = self.cache_dir / VECTORS_FILE
+        if not index_file.exists() or not vectors_file.exists():
+            # Start clean; a vector file without an index is unusable
+            if not self.read_only:
+                vectors_file.unlink(missing_ok=True)
+            return
+
+        with open(index_file, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        generation = index.get("generation", 0)
+        rows = index["rows"]
+        tick = max(index.get("tick", 0), self._replay_log(rows, generation))
+
+        expected_bytes = len(rows) * (index["dim"] or 0) * 4
+        size = vectors_file.stat().st_size
+        if self.read_only:
+            # The writer appends vectors before it logs them, so the file may
+            # run ahead of the index we just read
+            if index.get("model") != self.model_name or size < expected_bytes:
+                print("Embedding cache is not usable read-only; starting empty.")
+                return
+        elif index.get("model") != self.model_name or size < expected_bytes:
+            print("Embedding cache does not match the current model; starting fresh.")
+            vectors_file.unlink()
+            index_file.unlink()
+            (self.cache_dir / LOG_FILE).unlink(missing_ok=True)
+            return
+        elif size > expected_bytes:
+            # Rows appended by a writer that stopped before logging them
+            with open(vectors_file, "r+b") as f:
+                f.truncate(expected_bytes)
+
+        self._dim = index["dim"]
+        self._tick = tick
+        self._generation = generation
+        self._rows = rows
+
+
+class CachedEmbedding(BaseEmbedding):
+    """
+    LlamaIndex embedding model that consults an EmbeddingCache before calling
+    the wrapped model. Used for both document and query embeddings, so the
+    wrapped model must embed queries and documents the same way (true for
+    text-embedding-ada-002).
+    """
+
+    _embed_model: BaseEmbedding = PrivateAttr()
+    _cache: EmbeddingCache = PrivateAttr()
+
+    def __init__(self, embed_model: BaseEmbedding, cache: EmbeddingCache, **kwargs: Any):
+        super().__init__(
+            model_name=embed_model.model_name,
+            embed_batch_size=embed_model.embed_batch_size,
+            **kwargs
+        )
+        self._embed_model = embed_model
+        self._cache = cache
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    @property
+    def cache(self) -> EmbeddingCache:
+        return self._cache
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        cached = self._cache.get(query)
+        if cached is not None:
+            return cached
+
+        embedding = self._embed_model.get_query_embedding(query)
+        self._cache.put_many([query], [embedding])
+        return embedding
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        cached = self._cache.get(query)
+        if cached is not None:
+            return cached
+
+        embedding = await self._embed_model.aget_query_embedding(query)
+        # Writes touch the disk (and occasionally compact); keep them off the loop
+        await asyncio.get_event_loop().run_in_executor(
+            None, self._cache.put_many, [query], [embedding])
+        return embedding
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._get_text_embeddings([text])[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        results = [self._cache.get(text) for text in texts]
+        missing = [i for i, result in enumerate(results) if result is None]
+
+        if missing:
+            embeddings = self._embed_model.get_text_embedding_batch(
+                [texts[i] for i in missing])
+            for i, embedding in zip(missing, embeddings):
+                results[i] = embedding
+            self._cache.put_many([texts[i] for i in missing], embeddings)
+
+        return results
+
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        return (await self._aget_text_embeddings([text]))[0]
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        results = [self._cache.get(text) for text in texts]
+        missing = [i for i, result in enumerate(results) if result is None]
+
+        if missing:
+            embeddings = await self._embed_model.aget_text_embedding_batch(
+                [texts[i] for i in missing])
+            for i, embedding in zip(missing, embeddings):
+                results[i] = embedding
+            await asyncio.get_event_loop().run_in_executor(
+                None, self._cache.put_many, [texts[i] for i in missing], embeddings)
+
+        return results
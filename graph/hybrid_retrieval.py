@@ -0,0 +1,104 @@
+"""
+Hybrid retrieval for NadavBot
+Merges knowledge graph matches and vector similarity results into one ranked
+list with weighted reciprocal rank fusion.
+"""
+
+import hashlib
+from typing import Callable, Dict, List, Optional
+
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import MetadataMode, NodeWithScore, QueryBundle
+
+
+def _fusion_key(result: NodeWithScore) -> str:
+    """
+    Identify a chunk by its normalized text, so the same passage found by
+    both retrievers (under different node ids) is fused into one entry.
+    """
+    text = result.node.get_content(metadata_mode=MetadataMode.NONE)
+    return hashlib.sha1(" ".join(text.lower().split()).encode("utf-8")).hexdigest()
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Dict[str, List[NodeWithScore]],
+    weights: Optional[Dict[str, float]] = None,
+    rrf_k: int = 60,
+    top_k: Optional[int] = None
+) -> List[NodeWithScore]:
+    """
+    Fuse ranked result lists with weighted reciprocal rank fusion.
+
+    Each result scores ``weight / (rrf_k + rank)`` per list it appears in,
+    with ranks starting at 1. Only ranks are used, so retrievers with
+    incomparable score scales (keyword hit ratios vs cosine similarity) can be
+    mixed. The returned nodes carry the fused score.
+    """
+    weights = weights or {}
+    fused_scores: Dict[str, float] = {}
+    representatives: Dict[str, NodeWithScore] = {}
+
+    for name, results in ranked_lists.items():
+        weight = weights.get(name, 1.0)
+        for rank, result in enumerate(results, start=1):
+            key = _fusion_key(result)
+            fused_scores[key] = fused_scores.get(key, 0.0) + weight / (rrf_k + rank)
+            representatives.setdefault(key, result)
+
+    ranked_keys = sorted(fused_scores, key=fused_scores.get, reverse=True)
+    if top_k is not None:
+        ranked_keys = ranked_keys[:top_k]
+
+    return [
+        NodeWithScore(node=representatives[key].node, score=fused_scores[key])
+        for key in ranked_keys
+    ]
+
+
+class HybridFusionRetriever(BaseRetriever):
+    """
+    Runs graph keyword matching and vector similarity for a query and returns
+    one fused ranking, so callers need a single retrieval call.
+    """
+
+    def __init__(
+        self,
+        graph_retrieve: Callable[[str], List[NodeWithScore]],
+        vector_retriever: BaseRetriever,
+        graph_weight: float = 1.0,
+        vector_weight: float = 1.0,
+        rrf_k: int = 60,
+        similarity_top_k: int = 4
+    ):
+        super().__init__()
+        self._graph_retrieve = graph_retrieve
+        self._vector_retriever = vector_retriever
+        self._weights = {"graph": graph_weight, "vector": vector_weight}
+        self._rrf_k = rrf_k
+        self._similarity_top_k = similarity_top_k
+
+    def fuse(
+        self,
+        graph_results: List[NodeWithScore],
+        vector_results: List[NodeWithScore]
+    ) -> List[NodeWithScore]:
+        """Fuse already-retrieved graph and vector results."""
+        return reciprocal_rank_fusion(
+            {"graph": graph_results, "vector": vector_results},
+            weights=self._weights,
+            rrf_k=self._rrf_k,
+            top_k=self._similarity_top_k
+        )
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        return self.fuse(
+            self._graph_retrieve(query_bundle.query_str),
+            self._vector_retriever.retrieve(query_bundle)
+        )
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        # Graph matching is in-memory; only the vector side awaits an embedding
+        return self.fuse(
+            self._graph_retrieve(query_bundle.query_str),
+            await self._vector_retriever.aretrieve(query_bundle)
+        )
@@ -0,0 +1,377 @@
+"""
+Indexed graph store for NadavBot
+Drop-in replacement for SimpleGraphStore that interns entity and relation
+names as integers and keeps forward and reverse adjacency arrays, so entity
+lookups and bounded multi-hop traversals touch only the edges they follow.
+"""
+
+import json
+import os
+import threading
+from array import array
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import fsspec
+import numpy as np
+from llama_index.core.graph_stores.types import (
+    DEFAULT_PERSIST_DIR,
+    DEFAULT_PERSIST_FNAME,
+    GraphStore
+)
+
+DIRECTIONS = ("out", "in", "both")
+
+
+def normalize_name(name: str) -> str:
+    """Case- and whitespace-insensitive key for entity name lookups."""
+    return " ".join(name.lower().split())
+
+
+def _row_keys(edges: np.ndarray) -> np.ndarray:
+    """View each (subj, rel, obj) row of an int32 edge array as one comparable value."""
+    edges = np.ascontiguousarray(edges, dtype=np.int32)
+    return edges.view(np.dtype((np.void, edges.dtype.itemsize * 3))).ravel()
+
+
+def _csr(keys: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Offsets and a stable edge order grouping edges by ``keys`` (entity ids)."""
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=size), out=offsets[1:])
+    return offsets, np.argsort(keys, kind="stable")
+
+
+class IndexedGraphStore(GraphStore):
+    """
+    Triplet store with interned entity ids and CSR adjacency arrays.
+
+    Every entity's outgoing edges are one contiguous slice of the forward
+    arrays (relation id, object id) and its incoming edges one slice of the
+    reverse arrays, both in insertion order, so a lookup costs one dict probe
+    plus the entity's degree and a k-hop traversal is a breadth-first walk
+    over integer slices. Entity names are also indexed case-insensitively.
+
+    Upserts and deletes are logged and folded into the arrays (deduplicated)
+    on the next read, keeping writes O(1) during builds. Persists in
+    SimpleGraphStore's JSON format, so either store can load the other's files.
+    """
+
+    def __init__(self, graph_dict: Optional[Dict[str, List[List[str]]]] = None):
+        self._lock = threading.RLock()
+        self._names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._by_normalized: Dict[str, List[int]] = {}
+        self._max_name_words = 1
+        self._relations: List[str] = []
+        self._relation_ids: Dict[str, int] = {}
+
+        empty = np.empty(0, dtype=np.int32)
+        self._fwd_offsets = np.zeros(1, dtype=np.int64)
+        self._fwd_rel, self._fwd_obj = empty, empty
+        self._rev_offsets = np.zeros(1, dtype=np.int64)
+        self._rev_rel, self._rev_subj = empty, empty
+
+        # Writes since the arrays were last rebuilt
+        self._pending = array("i")
+        self._pending_deletes = set()
+
+        for subj, relations in (graph_dict or {}).items():
+            for rel, obj in relations:
+                self.upsert_triplet(subj, rel, obj)
+
+    @property
+    def client(self) -> None:
+        """Not applicable for this store."""
+        return None
+
+    # Interning
+
+    def _entity_id(self, name: str) -> int:
+        entity_id = self._ids.get(name)
+        if entity_id is None:
+            entity_id = len(self._names)
+            self._names.append(name)
+            self._ids[name] = entity_id
+            key = normalize_name(name)
+            self._by_normalized.setdefault(key, []).append(entity_id)
+            self._max_name_words = max(self._max_name_words, len(key.split()))
+        return entity_id
+
+    def _relation_id(self, rel: str) -> int:
+        relation_id = self._relation_ids.get(rel)
+        if relation_id is None:
+            relation_id = len(self._relations)
+            self._relations.append(rel)
+            self._relation_ids[rel] = relation_id
+        return relation_id
+
+    # Adjacency arrays
+
+    def _compact(self):
+        """Fold logged writes into the adjacency arrays. Call with the lock held."""
+        if not self._pending and not self._pending_deletes:
+            return
+
+        # Existing edges grouped by subject, then new ones in insertion order
+        subjects = np.repeat(
+            np.arange(len(self._fwd_offsets) - 1, dtype=np.int32), np.diff(self._fwd_offsets))
+        edges = np.concatenate([
+            np.column_stack([subjects, self._fwd_rel, self._fwd_obj]),
+            np.frombuffer(self._pending, dtype=np.int32).reshape(-1, 3)
+        ]).astype(np.int32)
+
+        if self._pending_deletes:
+            deleted = np.array(sorted(self._pending_deletes), dtype=np.int32)
+            edges = edges[~np.isin(_row_keys(edges), _row_keys(deleted))]
+        if len(edges):
+            _, first = np.unique(edges, axis=0, return_index=True)
+            edges = edges[np.sort(first)]
+
+        size = len(self._names)
+        self._fwd_offsets, order = _csr(edges[:, 0], size)
+        self._fwd_rel = np.ascontiguousarray(edges[order, 1])
+        self._fwd_obj = np.ascontiguousarray(edges[order, 2])
+        self._rev_offsets, order = _csr(edges[:, 2], size)
+        self._rev_rel = np.ascontiguousarray(edges[order, 1])
+        self._rev_subj = np.ascontiguousarray(edges[order, 0])
+
+        self._pending = array("i")
+        self._pending_deletes = set()
+
+    def _out_edges(self, entity_id: int) -> Iterable[Tuple[int, int]]:
+        start, end = self._fwd_offsets[entity_id], self._fwd_offsets[entity_id + 1]
+        return zip(self._fwd_rel[start:end].tolist(), self._fwd_obj[start:end].tolist())
+
+    def _in_edges(self, entity_id: int) -> Iterable[Tuple[int, int]]:
+        start, end = self._rev_offsets[entity_id], self._rev_offsets[entity_id + 1]
+        return zip(self._rev_rel[start:end].tolist(), self._rev_subj[start:end].tolist())
+
+    def _degree(self, entity_id: int) -> int:
+        return int(self._fwd_offsets[entity_id + 1] - self._fwd_offsets[entity_id]
+                   + self._rev_offsets[entity_id + 1] - self._rev_offsets[entity_id])
+
+    # GraphStore protocol
+
+    def get(self, subj: str) -> List[List[str]]:
+        """Outgoing ``[rel, obj]`` pairs of ``subj``, in insertion order."""
+        with self._lock:
+            self._compact()
+            entity_id = self._ids.get(subj)
+            if entity_id is None:
+                return []
+            return [
+                [self._relations[rel], self._names[obj]]
+                for rel, obj in self._out_edges(entity_id)
+            ]
+
+    def get_rel_map(
+        self, subjs: Optional[List[str]] = None, depth: int = 2, limit: int = 30
+    ) -> Dict[str, List[List[str]]]:
+        """
+        Outgoing ``[subj, rel, obj]`` paths up to ``depth`` hops from each
+        subject, at most ``limit`` triplets in total (SimpleGraphStore semantics).
+        """
+        with self._lock:
+            self._compact()
+            if subjs is None:
+                subjs = [
+                    self._names[entity_id]
+                    for entity_id in np.flatnonzero(np.diff(self._fwd_offsets)).tolist()
+                ]
+
+            rel_map = {}
+            remaining = limit
+            for subj in subjs:
+                if remaining <= 0:
+                    break
+                triplets = self.traverse([subj], depth=depth, direction="out", limit=remaining)
+                rel_map[subj] = [list(triplet) for triplet in triplets]
+                remaining -= len(triplets)
+            return rel_map
+
+    def upsert_triplet(self, subj: str, rel: str, obj: str) -> None:
+        """Add a triplet; adding one that already exists is a no-op."""
+        with self._lock:
+            key = (self._entity_id(subj), self._relation_id(rel), self._entity_id(obj))
+            self._pending_deletes.discard(key)
+            self._pending.extend(key)
+
+    def delete(self, subj: str, rel: str, obj: str) -> None:
+        """Remove a triplet if present. Interned ids are kept."""
+        with self._lock:
+            key = (self._ids.get(subj), self._relation_ids.get(rel), self._ids.get(obj))
+            if None not in key:
+                self._pending_deletes.add(key)
+
+    def persist(
+        self,
+        persist_path: str = os.path.join(DEFAULT_PERSIST_DIR, DEFAULT_PERSIST_FNAME),
+        fs: Optional[fsspec.AbstractFileSystem] = None
+    ) -> None:
+        """Write the triplets as SimpleGraphStore JSON."""
+        fs = fs or fsspec.filesystem("file")
+        dirpath = os.path.dirname(persist_path)
+        if not fs.exists(dirpath):
+            fs.makedirs(dirpath)
+
+        with fs.open(persist_path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    def get_schema(self, refresh: bool = False) -> str:
+        raise NotImplementedError("IndexedGraphStore does not support get_schema")
+
+    def query(self, query: str, param_map: Optional[Dict[str, Any]] = {}) -> Any:
+        raise NotImplementedError("IndexedGraphStore does not support query")
+
+    # Lookups and traversal
+
+    def find_entities(self, name: str) -> List[str]:
+        """Entities whose name matches ``name`` ignoring case and spacing."""
+        with self._lock:
+            self._compact()
+            return [
+                self._names[entity_id]
+                for entity_id in self._by_normalized.get(normalize_name(name), [])
+                if self._degree(entity_id)
+            ]
+
+    def find_mentions(self, terms: List[str]) -> List[str]:
+        """
+        Entities named by a word or run of consecutive words in ``terms``,
+        in order of first mention. Only n-grams up to the longest entity
+        name are looked up, so this never scans the entity list.
+        """
+        with self._lock:
+            mentions = []
+            seen = set()
+            for start in range(len(terms)):
+                for end in range(start + 1, min(len(terms), start + self._max_name_words) + 1):
+                    for entity in self.find_entities(" ".join(terms[start:end])):
+                        if entity not in seen:
+                            seen.add(entity)
+                            mentions.append(entity)
+            return mentions
+
+    def neighbors(self, entity: str, direction: str = "out") -> List[Tuple[str, str, str]]:
+        """Triplets one hop from ``entity``: ``out`` where it is the subject, ``in`` the object."""
+        return self.traverse([entity], depth=1, direction=direction)
+
+    def traverse(
+        self,
+        entities: Iterable[str],
+        depth: int = 2,
+        direction: str = "both",
+        limit: Optional[int] = None
+    ) -> List[Tuple[str, str, str]]:
+        """
+        Breadth-first walk from ``entities`` for at most ``depth`` hops.
+
+        Returns each triplet crossed, once, as ``(subj, rel, obj)`` and
+        nearest first, stopping after ``limit`` triplets. ``direction``
+        chooses which edges to follow: ``out`` (subject to object), ``in``
+        (object to subject) or ``both``, e.g. "2021" <-learned in- "Python"
+        <-uses- "NadavBot" is two ``in`` hops.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be one of {DIRECTIONS}, got {direction!r}")
+
+        with self._lock:
+            self._compact()
+            start = [self._ids[name] for name in entities if name in self._ids]
+            visited = set(start)
+            frontier = deque((entity_id, 0) for entity_id in start)
+            crossed = set()
+            triplets: List[Tuple[str, str, str]] = []
+
+            while frontier:
+                entity_id, hops = frontier.popleft()
+                if hops >= depth:
+                    continue
+
+                edges = []
+                if direction in ("out", "both"):
+                    edges.extend(
+                        (entity_id, rel, other) for rel, other in self._out_edges(entity_id))
+                if direction in ("in", "both"):
+                    edges.extend(
+                        (other, rel, entity_id) for rel, other in self._in_edges(entity_id))
+
+                for key in edges:
+                    if key in crossed:
+                        continue
+                    crossed.add(key)
+                    subj_id, relation_id, obj_id = key
+                    triplets.append((
+                        self._names[subj_id], self._relations[relation_id], self._names[obj_id]))
+                    if limit is not None and len(triplets) >= limit:
+                        return triplets
+
+                    other_id = obj_id if subj_id == entity_id else subj_id
+                    if other_id not in visited:
+                        visited.add(other_id)
+                        frontier.append((other_id, hops + 1))
+
+            return triplets
+
+    def reachable(
+        self,
+        entities: Iterable[str],
+        depth: int = 2,
+        direction: str = "both"
+    ) -> Dict[str, int]:
+        """Entities within ``depth`` hops of ``entities``, mapped to their hop distance."""
+        distances = {name: 0 for name in entities if name in self._ids}
+        for subj, _, obj in self.traverse(list(distances), depth=depth, direction=direction):
+            for near, far in ((subj, obj), (obj, subj)):
+                if near in distances and far not in distances:
+                    distances[far] = distances[near] + 1
+        return distances
+
+    # Serialization
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same shape as SimpleGraphStore.to_dict()."""
+        with self._lock:
+            self._compact()
+            graph_dict = {}
+            for entity_id in np.flatnonzero(np.diff(self._fwd_offsets)).tolist():
+                graph_dict[self._names[entity_id]] = [
+                    [self._relations[rel], self._names[obj]]
+                    for rel, obj in self._out_edges(entity_id)
+                ]
+            return {"graph_dict": graph_dict}
+
+    @classmethod
+    def from_dict(cls, save_dict: Dict[str, Any]) -> "IndexedGraphStore":
+        return cls(save_dict.get("graph_dict", {}))
+
+    @classmethod
+    def from_persist_path(
+        cls, persist_path: str, fs: Optional[fsspec.AbstractFileSystem] = None
+    ) -> "IndexedGraphStore":
+        """Load SimpleGraphStore-format JSON; a missing file gives an empty store."""
+        fs = fs or fsspec.filesystem("file")
+        if not fs.exists(persist_path):
+            return cls()
+        with fs.open(persist_path, "rb") as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def from_persist_dir(
+        cls,
+        persist_dir: str = DEFAULT_PERSIST_DIR,
+        fs: Optional[fsspec.AbstractFileSystem] = None
+    ) -> "IndexedGraphStore":
+        return cls.from_persist_path(os.path.join(persist_dir, DEFAULT_PERSIST_FNAME), fs=fs)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._compact()
+            return {
+                "entities": len(self._names),
+                "relations": len(self._relations),
+                "triplets": len(self._fwd_rel),
+                "adjacency_bytes": sum(values.nbytes for values in (
+                    self._fwd_offsets, self._fwd_rel, self._fwd_obj,
+                    self._rev_offsets, self._rev_rel, self._rev_subj))
+            }
@@ -0,0 +1,246 @@
+"""
+NumPy-backed LlamaIndex vector store for NadavBot
+Drop-in replacement for SimpleVectorStore that scores queries with one
+matrix product (or an HNSW index) instead of a Python loop.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.schema import BaseNode
+from llama_index.core.vector_stores.types import (
+    BasePydanticVectorStore,
+    FilterCondition,
+    FilterOperator,
+    MetadataFilters,
+    VectorStoreQuery,
+    VectorStoreQueryResult
+)
+
+try:
+    from .vector_search import EmbeddingMatrix
+except ImportError:
+    from vector_search import EmbeddingMatrix
+
+# Written next to the records file StorageContext.persist() asks for
+EMBEDDINGS_SUFFIX = ".npy"
+FORMAT_NAME = "numpy"
+
+
+class _CodedColumn:
+    """
+    One metadata key (or the source document id) for every matrix row, as
+    integer codes aligned with the rows, so filters are vectorized compares.
+    A node without the key stores the code of None, matching ``dict.get``.
+    """
+
+    def __init__(self, size: int = 0):
+        self._codes: Dict[Any, int] = {None: 0}
+        self.values = np.zeros(size, dtype=np.int32)
+
+    def append(self, values: Iterable[Any]):
+        codes = [self._codes.setdefault(value, len(self._codes)) for value in values]
+        self.values = np.concatenate([self.values, np.asarray(codes, dtype=np.int32)])
+
+    def compact(self, keep: np.ndarray):
+        self.values = self.values[keep]
+
+    def isin(self, values: Iterable[Any]) -> np.ndarray:
+        codes = [self._codes[value] for value in values if value in self._codes]
+        return np.isin(self.values, codes)
+
+
+class NumpyVectorStore(BasePydanticVectorStore):
+    """
+    Vector store that keeps embeddings in an EmbeddingMatrix.
+
+    Like SimpleVectorStore it stores no text (nodes come from the docstore),
+    only node ids, their source document ids and flat metadata for filtering.
+    Metadata and document ids are also kept as coded columns aligned with the
+    matrix rows, so a filter becomes a boolean row mask and the query scans
+    just the matching rows; unfiltered queries may use the HNSW index when
+    ``ann`` is enabled.
+    """
+
+    stores_text: bool = False
+
+    _matrix: EmbeddingMatrix = PrivateAttr()
+    _ref_doc_ids: Dict[str, str] = PrivateAttr()
+    _metadata: Dict[str, Dict[str, Any]] = PrivateAttr()
+    _columns: Dict[str, _CodedColumn] = PrivateAttr()
+    _doc_column: _CodedColumn = PrivateAttr()
+    _lock: threading.RLock = PrivateAttr()
+
+    def __init__(self, ann: bool = False, ann_min_size: int = 20000, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._matrix = EmbeddingMatrix(ann=ann, ann_min_size=ann_min_size)
+        self._ref_doc_ids = {}
+        self._metadata = {}
+        self._columns = {}
+        self._doc_column = _CodedColumn()
+        self._lock = threading.RLock()
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "NumpyVectorStore"
+
+    @property
+    def client(self) -> EmbeddingMatrix:
+        return self._matrix
+
+    def add(self, nodes: Sequence[BaseNode], **add_kwargs: Any) -> List[str]:
+        if not nodes:
+            return []
+
+        ids = [node.node_id for node in nodes]
+        with self._lock:
+            # Replaced nodes leave their rows first, as EmbeddingMatrix.add does
+            self._delete_nodes([node_id for node_id in ids if node_id in self._ref_doc_ids])
+            self._matrix.add(ids, [node.get_embedding() for node in nodes])
+            for node in nodes:
+                self._ref_doc_ids[node.node_id] = node.ref_doc_id
+                self._metadata[node.node_id] = {
+                    key: value for key, value in node.metadata.items()
+                    if isinstance(value, (str, int, float, bool)) or value is None
+                }
+            self._append_columns(ids)
+        return ids
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        with self._lock:
+            self._delete_nodes([
+                node_id for node_id, doc_id in self._ref_doc_ids.items()
+                if doc_id == ref_doc_id
+            ])
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        if query.query_embedding is None:
+            raise ValueError("NumpyVectorStore only supports embedding queries.")
+
+        with self._lock:
+            candidate_rows = None
+            if query.filters is not None or query.node_ids or query.doc_ids:
+                mask = self._filter_mask(query.filters)
+                if query.doc_ids:
+                    mask &= self._doc_column.isin(query.doc_ids)
+                if query.node_ids:
+                    node_mask = np.zeros(len(self._matrix), dtype=bool)
+                    rows = [self._matrix.row(node_id) for node_id in query.node_ids]
+                    node_mask[[row for row in rows if row is not None]] = True
+                    mask &= node_mask
+                candidate_rows = np.flatnonzero(mask)
+                if not len(candidate_rows):
+                    return VectorStoreQueryResult(similarities=[], ids=[])
+
+            ids, similarities = self._matrix.search(
+                query.query_embedding, query.similarity_top_k, candidate_rows)
+        return VectorStoreQueryResult(similarities=similarities, ids=ids)
+
+    def _filter_mask(self, filters: Optional[MetadataFilters]) -> np.ndarray:
+        """Rows whose metadata passes ``filters`` (equality and membership operators)."""
+        size = len(self._matrix)
+        if filters is None or not filters.filters:
+            return np.ones(size, dtype=bool)
+
+        masks = []
+        for metadata_filter in filters.filters:
+            if isinstance(metadata_filter, MetadataFilters):
+                masks.append(self._filter_mask(metadata_filter))
+                continue
+
+            column = self._columns.get(metadata_filter.key) or _CodedColumn(size)
+            operator = metadata_filter.operator
+            if operator in (FilterOperator.EQ, FilterOperator.NE):
+                mask = column.isin([metadata_filter.value])
+            elif operator in (FilterOperator.IN, FilterOperator.NIN):
+                mask = column.isin(metadata_filter.value)
+            else:
+                raise ValueError(f"Unsupported metadata filter operator: {operator}")
+            masks.append(~mask if operator in (FilterOperator.NE, FilterOperator.NIN) else mask)
+
+        if filters.condition == FilterCondition.OR:
+            return np.logical_or.reduce(masks)
+        return np.logical_and.reduce(masks)
+
+    def _append_columns(self, node_ids: List[str]):
+        """Extend every column with the rows just added for ``node_ids``."""
+        size = len(self._doc_column.values)
+        self._doc_column.append(self._ref_doc_ids[node_id] for node_id in node_ids)
+        keys = {key for node_id in node_ids for key in self._metadata[node_id]}
+        for key in keys - self._columns.keys():
+            self._columns[key] = _CodedColumn(size)
+        for key, column in self._columns.items():
+            column.append(self._metadata[node_id].get(key) for node_id in node_ids)
+
+    def _delete_nodes(self, node_ids: List[str]):
+        rows = [self._matrix.row(node_id) for node_id in node_ids]
+        rows = [row for row in rows if row is not None]
+        if rows:
+            # EmbeddingMatrix.delete keeps the order of the remaining rows
+            keep = np.ones(len(self._matrix), dtype=bool)
+            keep[rows] = False
+            self._doc_column.compact(keep)
+            for column in self._columns.values():
+                column.compact(keep)
+        self._matrix.delete(node_ids)
+        for node_id in node_ids:
+            del self._ref_doc_ids[node_id]
+            self._metadata.pop(node_id, None)
+
+    def persist(self, persist_path: str, fs: Optional[Any] = None) -> None:
+        """Write node records to ``persist_path`` and embeddings to a sibling .npy file."""
+        persist_path = Path(persist_path)
+        persist_path.parent.mkdir(parents=True, exist_ok=True)
+
+        ids = self._matrix.ids
+        tmp_embeddings = persist_path.with_suffix(".tmp.npy")
+        np.save(tmp_embeddings, self._matrix.vectors)
+        os.replace(tmp_embeddings, persist_path.with_suffix(EMBEDDINGS_SUFFIX))
+
+        tmp_records = persist_path.with_suffix(".tmp")
+        with open(tmp_records, "w", encoding="utf-8") as f:
+            json.dump({
+                "format": FORMAT_NAME,
+                "ids": ids,
+                "ref_doc_ids": [self._ref_doc_ids.get(node_id) for node_id in ids],
+                "metadata": [self._metadata.get(node_id, {}) for node_id in ids]
+            }, f)
+        os.replace(tmp_records, persist_path)
+
+    @classmethod
+    def is_persisted_at(cls, persist_path: str) -> bool:
+        return Path(persist_path).with_suffix(EMBEDDINGS_SUFFIX).exists()
+
+    @classmethod
+    def from_persist_path(
+        cls,
+        persist_path: str,
+        ann: bool = False,
+        ann_min_size: int = 20000,
+        mmap: bool = False
+    ) -> "NumpyVectorStore":
+        """
+        Load a persisted store. With ``mmap=True`` the embedding matrix is
+        memory-mapped read-only instead of read into memory.
+        """
+        persist_path = Path(persist_path)
+        with open(persist_path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+
+        store = cls(ann=ann, ann_min_size=ann_min_size)
+        if records["ids"]:
+            # Rows were normalized before they were saved
+            store._matrix.load(records["ids"], np.load(
+                persist_path.with_suffix(EMBEDDINGS_SUFFIX),
+                mmap_mode="r" if mmap else None
+            ))
+        store._ref_doc_ids = dict(zip(records["ids"], records["ref_doc_ids"]))
+        store._metadata = dict(zip(records["ids"], records["metadata"]))
+        store._append_columns(records["ids"])
+        return store
@@ -0,0 +1,103 @@
+"""
+Concurrent triplet extraction for NadavBot
+Runs per-chunk LLM extraction calls in parallel with retries and rate limiting.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+Triplet = Tuple[str, str, str]
+
+
+class RateLimiter:
+    """
+    Spaces calls evenly to stay under ``requests_per_minute`` and lets any
+    worker impose a shared cooldown after the API reports a rate limit.
+    A limit of 0 disables spacing but keeps cooldowns.
+    """
+
+    def __init__(self, requests_per_minute: int = 0):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def acquire(self):
+        """Block until the caller may send its next request."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._next_slot - now)
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait:
+            time.sleep(wait)
+
+    def cooldown(self, seconds: float):
+        """Hold back every worker for at least ``seconds``."""
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    status = getattr(error, "status_code", None) or getattr(
+        getattr(error, "response", None), "status_code", None)
+    return status == 429 or "RateLimit" in type(error).__name__
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read a Retry-After header from an API error, if there is one."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def extract_triplets_parallel(
+    texts: List[str],
+    extract_fn: Callable[[str], List[Triplet]],
+    max_concurrency: int = 8,
+    max_retries: int = 4,
+    base_delay: float = 1.0,
+    rate_limiter: Optional[RateLimiter] = None
+) -> List[Optional[List[Triplet]]]:
+    """
+    Extract triplets for every text concurrently.
+
+    Results are returned in the same order as ``texts`` regardless of which
+    call finishes first, so merging them into a graph store is deterministic.
+    Failed calls are retried with exponential backoff and jitter; rate-limit
+    errors also pause all workers for the advertised Retry-After. A text that
+    still fails after ``max_retries`` yields None rather than aborting the
+    build, so the caller can tell it apart from a chunk with no triplets and
+    retry it later.
+    """
+    rate_limiter = rate_limiter or RateLimiter()
+
+    def extract_with_retry(index_and_text: Tuple[int, str]) -> Optional[List[Triplet]]:
+        index, text = index_and_text
+        for attempt in range(max_retries + 1):
+            rate_limiter.acquire()
+            try:
+                return list(extract_fn(text))
+            except Exception as e:
+                if attempt == max_retries:
+                    print(f"Giving up on triplet extraction for chunk {index}: {e}")
+                    return None
+
+                delay = base_delay * (2 ** attempt) * (1 + random.random())
+                if _is_rate_limit_error(e):
+                    delay = max(delay, _retry_after_seconds(e) or 0.0)
+                    rate_limiter.cooldown(delay)
+                time.sleep(delay)
+        return None
+
+    if not texts:
+        return []
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, max_concurrency),
+        thread_name_prefix="nadavbot-kg-extract"
+    ) as executor:
+        return list(executor.map(extract_with_retry, enumerate(texts)))
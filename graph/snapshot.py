@@ -0,0 +1,299 @@
+"""
+Binary index snapshots for NadavBot
+Persists a storage context as memory-mappable files instead of large JSON
+documents, so loading touches only what queries actually read.
+
+Layout of a snapshot directory, where N is the snapshot generation:
+    snapshot.json         format version, generation, index structs and small
+                          docstore tables
+    nodes-N.rec/.idx      node records (length-prefixed JSON) and their offsets
+    graph-N.rec/.idx      one record per graph subject with its relations
+    vector_store-N.json   vector store ids and filter metadata
+    vector_store-N.npy    normalized float32 embeddings, memory-mapped on load
+
+Each save writes a new generation and then replaces snapshot.json, so readers
+never see a half-written snapshot and files still mapped by a running process
+are never overwritten. The previous generation is kept until the next save, so
+a process that read snapshot.json just before a save can still open its files.
+"""
+
+import json
+import mmap
+import os
+import struct
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from llama_index.core import StorageContext
+from llama_index.core.graph_stores import SimpleGraphStore
+from llama_index.core.graph_stores.simple import SimpleGraphStoreData
+from llama_index.core.storage.docstore import SimpleDocumentStore
+from llama_index.core.storage.index_store import SimpleIndexStore
+from llama_index.core.storage.kvstore.simple_kvstore import SimpleKVStore
+from llama_index.core.storage.kvstore.types import DEFAULT_COLLECTION
+
+try:
+    from .indexed_graph_store import IndexedGraphStore
+    from .numpy_vector_store import NumpyVectorStore
+except ImportError:
+    from indexed_graph_store import IndexedGraphStore
+    from numpy_vector_store import NumpyVectorStore
+
+SNAPSHOT_FILE = "snapshot.json"
+SNAPSHOT_VERSION = 1
+NODES_FILE = "nodes"
+GRAPH_FILE = "graph"
+VECTOR_STORE_FILE = "vector_store"
+
+_LENGTH = struct.Struct("<I")
+
+
+def write_records(path: Path, records: Iterable[Tuple[str, Any]]):
+    """
+    Write ``(key, value)`` pairs as ``<path>.rec`` (each value a uint32 length
+    followed by its JSON bytes) and ``<path>.idx`` (key -> byte offset).
+    Both files are replaced atomically.
+    """
+    offsets: Dict[str, int] = {}
+    tmp_records = path.with_suffix(".rec.tmp")
+    with open(tmp_records, "wb") as f:
+        for key, value in records:
+            payload = json.dumps(value, separators=(",", ":")).encode("utf-8")
+            offsets[key] = f.tell()
+            f.write(_LENGTH.pack(len(payload)))
+            f.write(payload)
+
+    tmp_index = path.with_suffix(".idx.tmp")
+    with open(tmp_index, "w", encoding="utf-8") as f:
+        json.dump(offsets, f, separators=(",", ":"))
+
+    os.replace(tmp_records, path.with_suffix(".rec"))
+    os.replace(tmp_index, path.with_suffix(".idx"))
+
+
+class RecordFile:
+    """
+    Read-only, memory-mapped view of a file written by write_records().
+    Values are decoded on each access and never kept, so resident memory is
+    whatever the page cache holds - shared by every process mapping the file.
+    """
+
+    def __init__(self, path: Path):
+        with open(path.with_suffix(".idx"), "r", encoding="utf-8") as f:
+            self._offsets: Dict[str, int] = json.load(f)
+
+        self._file = open(path.with_suffix(".rec"), "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def keys(self) -> List[str]:
+        return list(self._offsets)
+
+    def get(self, key: str) -> Optional[Any]:
+        offset = self._offsets.get(key)
+        if offset is None:
+            return None
+        (length,) = _LENGTH.unpack_from(self._map, offset)
+        start = offset + _LENGTH.size
+        return json.loads(self._map[start:start + length])
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        for key in self._offsets:
+            yield key, self.get(key)
+
+
+class SnapshotKVStore(SimpleKVStore):
+    """
+    SimpleKVStore whose large collections are served from RecordFiles.
+
+    Reads fall through to the record file; writes and deletes are kept in
+    memory on top of it until the next snapshot is written, so incremental
+    updates work exactly as with the JSON-backed store.
+    """
+
+    def __init__(self, data: Optional[Dict[str, Dict[str, Any]]] = None,
+                 lazy_collections: Optional[Dict[str, RecordFile]] = None):
+        super().__init__(data)
+        self._lazy = lazy_collections or {}
+        self._deleted = {collection: set() for collection in self._lazy}
+
+    def put(self, key: str, val: dict, collection: str = DEFAULT_COLLECTION) -> None:
+        super().put(key, val, collection)
+        if collection in self._deleted:
+            self._deleted[collection].discard(key)
+
+    def get(self, key: str, collection: str = DEFAULT_COLLECTION) -> Optional[dict]:
+        value = super().get(key, collection)
+        if value is not None or collection not in self._lazy:
+            return value
+        if key in self._deleted[collection]:
+            return None
+        return self._lazy[collection].get(key)
+
+    def get_all(self, collection: str = DEFAULT_COLLECTION) -> Dict[str, dict]:
+        values = {}
+        if collection in self._lazy:
+            deleted = self._deleted[collection]
+            values = {
+                key: value for key, value in self._lazy[collection].items()
+                if key not in deleted
+            }
+        values.update(super().get_all(collection))
+        return values
+
+    def delete(self, key: str, collection: str = DEFAULT_COLLECTION) -> bool:
+        removed = super().delete(key, collection)
+        if collection in self._lazy and key in self._lazy[collection] \
+                and key not in self._deleted[collection]:
+            self._deleted[collection].add(key)
+            removed = True
+        return removed
+
+    def to_dict(self) -> dict:
+        """Every collection, with the lazy ones read in from their record files."""
+        data = {collection: dict(values) for collection, values in self._data.items()}
+        for collection in self._lazy:
+            data[collection] = self.get_all(collection)
+        return data
+
+    def persist(self, persist_path: str, fs=None) -> None:
+        """Persist as a plain SimpleKVStore, so JSON storage gets every node."""
+        SimpleKVStore(self.to_dict()).persist(persist_path, fs=fs)
+
+    async def aput(self, key: str, val: dict, collection: str = DEFAULT_COLLECTION) -> None:
+        self.put(key, val, collection)
+
+    async def aget(self, key: str, collection: str = DEFAULT_COLLECTION) -> Optional[dict]:
+        return self.get(key, collection)
+
+    async def aget_all(self, collection: str = DEFAULT_COLLECTION) -> Dict[str, dict]:
+        return self.get_all(collection)
+
+    async def adelete(self, key: str, collection: str = DEFAULT_COLLECTION) -> bool:
+        return self.delete(key, collection)
+
+
+def is_snapshot(snapshot_dir: Path) -> bool:
+    return (Path(snapshot_dir) / SNAPSHOT_FILE).exists()
+
+
+def save_snapshot(storage_context: StorageContext, snapshot_dir: Path):
+    """Write ``storage_context`` to ``snapshot_dir`` in the binary snapshot format."""
+    snapshot_dir = Path(snapshot_dir)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+    vector_store = storage_context.vector_store
+    if not isinstance(vector_store, NumpyVectorStore):
+        raise ValueError("Binary snapshots require the numpy vector store.")
+
+    generation = _read_manifest(snapshot_dir).get("generation", 0) + 1 \
+        if is_snapshot(snapshot_dir) else 1
+
+    # LlamaIndex keeps docstore tables in a kvstore under per-namespace collections
+    docstore = storage_context.docstore
+    kvstore = docstore._kvstore
+    node_collection = docstore._node_collection
+
+    write_records(
+        snapshot_dir / f"{NODES_FILE}-{generation}",
+        kvstore.get_all(node_collection).items()
+    )
+    write_records(
+        snapshot_dir / f"{GRAPH_FILE}-{generation}",
+        storage_context.graph_store.to_dict()["graph_dict"].items()
+    )
+    vector_store.persist(str(snapshot_dir / f"{VECTOR_STORE_FILE}-{generation}.json"))
+
+    # Everything except node bodies is small and loaded eagerly
+    tmp_file = snapshot_dir / (SNAPSHOT_FILE + ".tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": SNAPSHOT_VERSION,
+            "generation": generation,
+            "docstore_namespace": docstore._namespace,
+            "docstore": {
+                collection: kvstore.get_all(collection)
+                for collection in (docstore._ref_doc_collection, docstore._metadata_collection)
+            },
+            "index_store": storage_context.index_store.to_dict()
+        }, f)
+    os.replace(tmp_file, snapshot_dir / SNAPSHOT_FILE)
+
+    _remove_old_generations(snapshot_dir, generation)
+
+
+def _read_manifest(snapshot_dir: Path) -> Dict[str, Any]:
+    with open(snapshot_dir / SNAPSHOT_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def remove_snapshot(snapshot_dir: Path):
+    """Delete a snapshot: the manifest first, so no reader opens a partial one."""
+    snapshot_dir = Path(snapshot_dir)
+    (snapshot_dir / SNAPSHOT_FILE).unlink(missing_ok=True)
+    _remove_generations(snapshot_dir, keep=set())
+
+
+def _remove_old_generations(snapshot_dir: Path, generation: int):
+    """
+    Delete files older than the previous generation; ones still mapped
+    elsewhere are retried next save.
+    """
+    _remove_generations(snapshot_dir, keep={str(generation), str(generation - 1)})
+
+
+def _remove_generations(snapshot_dir: Path, keep: set):
+    for path in snapshot_dir.iterdir():
+        base, _, file_generation = path.name.split(".")[0].rpartition("-")
+        if base in (NODES_FILE, GRAPH_FILE, VECTOR_STORE_FILE) \
+                and file_generation not in keep:
+            with suppress(OSError):
+                path.unlink()
+
+
+def load_snapshot(
+    snapshot_dir: Path,
+    ann: bool = False,
+    ann_min_size: int = 20000,
+    indexed_graph: bool = False
+) -> StorageContext:
+    """
+    Open a snapshot as a StorageContext. Embeddings and node records are
+    memory-mapped rather than read, so this takes roughly constant time.
+    With ``indexed_graph=True`` the graph is loaded into an IndexedGraphStore.
+    """
+    snapshot_dir = Path(snapshot_dir)
+    snapshot = _read_manifest(snapshot_dir)
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {snapshot.get('version')}")
+    generation = snapshot["generation"]
+
+    namespace = snapshot["docstore_namespace"]
+    kvstore = SnapshotKVStore(
+        data=snapshot["docstore"],
+        lazy_collections={
+            f"{namespace}/data": RecordFile(snapshot_dir / f"{NODES_FILE}-{generation}")
+        }
+    )
+    graph_dict = dict(RecordFile(snapshot_dir / f"{GRAPH_FILE}-{generation}").items())
+    graph_store = IndexedGraphStore(graph_dict) if indexed_graph \
+        else SimpleGraphStore(data=SimpleGraphStoreData(graph_dict=graph_dict))
+
+    return StorageContext.from_defaults(
+        docstore=SimpleDocumentStore(simple_kvstore=kvstore, namespace=namespace),
+        index_store=SimpleIndexStore.from_dict(snapshot["index_store"]),
+        vector_store=NumpyVectorStore.from_persist_path(
+            str(snapshot_dir / f"{VECTOR_STORE_FILE}-{generation}.json"),
+            ann=ann,
+            ann_min_size=ann_min_size,
+            mmap=True
+        ),
+        graph_store=graph_store
+    )
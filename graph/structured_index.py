@@ -0,0 +1,235 @@
+"""
+Structured portfolio index for NadavBot
+Typed in-memory lookups over projects.yaml and timeline.json (technology,
+year, category and status), so factual questions such as "what did you build
+with React" or "what happened in 2023" are grounded without an embedding or
+LLM call.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# Words a purely structured question may contain besides the values it asks
+# about; a query made only of these and matched values is fully answered by
+# the index, so graph and vector retrieval can be skipped
+QUESTION_WORDS = {
+    "a", "about", "all", "an", "and", "any", "app", "apps", "are", "built",
+    "build", "create", "created", "current", "currently", "develop",
+    "developed", "did", "do", "does", "during", "event", "events", "for",
+    "happen", "happened", "has", "have", "i", "in", "is", "list", "made",
+    "make", "me", "nadav", "nadav's", "of", "on", "or", "project", "projects",
+    "show", "stack", "still", "tech", "technologies", "technology", "tell",
+    "the", "things", "use", "used", "uses", "using", "was", "were", "what",
+    "when", "which", "with", "work", "worked", "year", "you", "your"
+}
+
+_TOKEN_PUNCTUATION = ".,!?;:()\"'"
+
+
+def _key(name: str) -> str:
+    """Lookup key that ignores case, spacing and punctuation ("Node.js" -> "nodejs")."""
+    return re.sub(r"[^a-z0-9+#]", "", name.lower())
+
+
+def _sentence(text: str) -> str:
+    text = text.strip()
+    return text if not text or text[-1] in ".!?" else text + "."
+
+
+@dataclass(frozen=True)
+class Project:
+    name: str
+    description: str
+    technologies: Tuple[str, ...]
+    year: Optional[int]
+    status: str
+    category: str
+    highlights: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Project":
+        return cls(
+            name=data["name"],
+            description=data.get("description", ""),
+            technologies=tuple(data.get("technologies", [])),
+            year=data.get("year"),
+            status=data.get("status", ""),
+            category=data.get("category", ""),
+            highlights=tuple(data.get("highlights", []))
+        )
+
+    def fact(self) -> str:
+        details = ", ".join(str(value) for value in (self.year, self.category, self.status) if value)
+        text = f"Project {self.name} ({details}): {_sentence(self.description)}"
+        if self.technologies:
+            text += f" Technologies: {', '.join(self.technologies)}."
+        return text
+
+
+@dataclass(frozen=True)
+class TimelineEvent:
+    year: int
+    month: Optional[int]
+    type: str
+    title: str
+    description: str
+    category: str
+    technologies: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TimelineEvent":
+        return cls(
+            year=data["year"],
+            month=data.get("month"),
+            type=data.get("type", ""),
+            title=data["title"],
+            description=data.get("description", ""),
+            category=data.get("category", ""),
+            technologies=tuple(data.get("technologies", []))
+        )
+
+    def fact(self) -> str:
+        date = f"{self.year}-{self.month:02d}" if self.month else str(self.year)
+        text = f"Timeline {date} ({self.type}): {self.title} - {_sentence(self.description)}"
+        if self.technologies:
+            text += f" Technologies: {', '.join(self.technologies)}."
+        return text
+
+
+@dataclass
+class StructuredMatch:
+    """Projects and events matching every value kind named in a query."""
+    filters: Dict[str, List[str]]
+    projects: List[Project] = field(default_factory=list)
+    events: List[TimelineEvent] = field(default_factory=list)
+    complete: bool = False
+
+    def facts(self, limit: Optional[int] = None) -> List[str]:
+        facts = [project.fact() for project in self.projects]
+        facts += [event.fact() for event in self.events]
+        return facts[:limit] if limit is not None else facts
+
+
+class StructuredIndex:
+    """
+    Inverted indices from technology, year, category and status to projects
+    and timeline events. Values in a query are found by greedy longest-match
+    over its words, so "React Native" is not also read as "React".
+    """
+
+    def __init__(self, projects: List[Project], events: List[TimelineEvent]):
+        self.projects = projects
+        self.events = sorted(events, key=lambda event: (event.year, event.month or 0), reverse=True)
+
+        # kind -> key -> (display value, matching projects, matching events)
+        self._index: Dict[str, Dict[str, Tuple[str, List[Project], List[TimelineEvent]]]] = {
+            "technology": {}, "year": {}, "category": {}, "status": {}
+        }
+        for project in self.projects:
+            for technology in project.technologies:
+                self._add("technology", technology, project=project)
+            if project.year is not None:
+                self._add("year", str(project.year), project=project)
+            self._add("category", project.category, project=project)
+            self._add("status", project.status, project=project)
+        for event in self.events:
+            for technology in event.technologies:
+                self._add("technology", technology, event=event)
+            self._add("year", str(event.year), event=event)
+            self._add("category", event.category, event=event)
+
+        self._max_words = max(
+            (len(value.split()) for values in self._index.values()
+             for value, _, _ in values.values()),
+            default=1
+        )
+
+    @classmethod
+    def from_data(cls, structured_data: Dict[str, Any]) -> "StructuredIndex":
+        """Build from the dict NadavBotKnowledgeGraph.load_structured_data() returns."""
+        projects = (structured_data.get("projects") or {}).get("projects", [])
+        events = (structured_data.get("timeline") or {}).get("timeline", [])
+        return cls(
+            [Project.from_dict(project) for project in projects],
+            [TimelineEvent.from_dict(event) for event in events]
+        )
+
+    def _add(self, kind: str, value: str, project: Optional[Project] = None,
+             event: Optional[TimelineEvent] = None):
+        if not _key(value):
+            return
+        entry = self._index[kind].setdefault(_key(value), (value, [], []))
+        if project is not None and project not in entry[1]:
+            entry[1].append(project)
+        if event is not None and event not in entry[2]:
+            entry[2].append(event)
+
+    def _lookup_value(self, words: List[str]) -> Optional[Tuple[str, str]]:
+        """The (kind, key) of the value spelled by ``words``, if any."""
+        key = _key(" ".join(words))
+        for kind, values in self._index.items():
+            entry = values.get(key)
+            if entry is None:
+                continue
+            # Two-letter names like "Go" are common words; only match their exact case
+            if len(key) <= 2 and kind != "year" and " ".join(words) != entry[0]:
+                continue
+            return kind, key
+        return None
+
+    def lookup(self, query: str) -> Optional[StructuredMatch]:
+        """
+        Projects and events matching the technologies, years, categories and
+        statuses named in ``query``, or None when it names none. Values of
+        one kind are alternatives (React or Vue.js); different kinds must all
+        match (React and 2022).
+        """
+        words = [word.strip(_TOKEN_PUNCTUATION) for word in query.split()]
+        words = [word for word in words if word]
+
+        matched: Dict[str, List[str]] = {}
+        unmatched = []
+        position = 0
+        while position < len(words):
+            for length in range(min(self._max_words, len(words) - position), 0, -1):
+                found = self._lookup_value(words[position:position + length])
+                if found is not None:
+                    kind, key = found
+                    if key not in matched.setdefault(kind, []):
+                        matched[kind].append(key)
+                    position += length
+                    break
+            else:
+                unmatched.append(words[position].lower())
+                position += 1
+
+        if not matched:
+            return None
+
+        projects = self._filter(matched, 1, self.projects)
+        events = self._filter(matched, 2, self.events)
+        return StructuredMatch(
+            filters={
+                kind: [self._index[kind][key][0] for key in keys]
+                for kind, keys in matched.items()
+            },
+            projects=projects,
+            events=events,
+            complete=all(word in QUESTION_WORDS for word in unmatched)
+        )
+
+    def _filter(self, matched: Dict[str, List[str]], slot: int, items: List) -> List:
+        """Items (in index order) present under at least one key of every matched kind."""
+        allowed = None
+        for kind, keys in matched.items():
+            found = {id(item) for key in keys for item in self._index[kind][key][slot]}
+            allowed = found if allowed is None else allowed & found
+        return [item for item in items if id(item) in allowed]
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "projects": len(self.projects),
+            "events": len(self.events),
+            **{f"{kind}_values": len(values) for kind, values in self._index.items()}
+        }
@@ -0,0 +1,234 @@
+"""
+Vectorized similarity search for NadavBot
+Exact top-k over a contiguous float32 matrix, with an optional HNSW index
+(via hnswlib) for corpora too large to scan on every query.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:  # optional; exact search is used without it
+    hnswlib = None
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _as_matrix(embeddings, rows: int) -> np.ndarray:
+    if not isinstance(embeddings, np.ndarray):
+        embeddings = list(embeddings)
+    return np.asarray(embeddings, dtype=np.float32).reshape(rows, -1)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores along the last axis, best first."""
+    k = min(k, scores.shape[-1])
+    if k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.int64)
+    if k < scores.shape[-1]:
+        candidates = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[-1]), scores.shape)
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=-1), axis=-1)
+    return np.take_along_axis(candidates, order, axis=-1)
+
+
+class EmbeddingMatrix:
+    """
+    Embeddings stored as rows of one normalized float32 matrix, so a query is
+    a single matrix-vector product instead of a Python loop over vectors.
+
+    Capacity doubles as rows are added; deletes compact the matrix. With
+    ``ann=True`` and hnswlib installed, unfiltered queries against at least
+    ``ann_min_size`` rows go through an HNSW graph instead of a full scan.
+    The graph is extended on add and rebuilt lazily after deletes.
+    """
+
+    def __init__(
+        self,
+        dim: Optional[int] = None,
+        ann: bool = False,
+        ann_min_size: int = 20000,
+        ann_m: int = 16,
+        ann_ef_construction: int = 200,
+        ann_ef_search: int = 64
+    ):
+        if ann and hnswlib is None:
+            print("hnswlib is not installed; using exact vector search.")
+            ann = False
+
+        self.dim = dim
+        self.ann = ann
+        self.ann_min_size = ann_min_size
+        self.ann_m = ann_m
+        self.ann_ef_construction = ann_ef_construction
+        self.ann_ef_search = ann_ef_search
+
+        self._lock = threading.RLock()
+        self._matrix = np.empty((0, dim or 0), dtype=np.float32)
+        self._size = 0
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._ann_index = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self._ids)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """The normalized embeddings, one row per id (a view, do not modify)."""
+        return self._matrix[:self._size]
+
+    def row(self, id_: str) -> Optional[int]:
+        return self._rows.get(id_)
+
+    def load(self, ids: Sequence[str], vectors: np.ndarray):
+        """
+        Adopt already-normalized ``vectors`` (e.g. a read-only memory map)
+        without copying. The first add or delete moves them into memory.
+        """
+        with self._lock:
+            self._matrix = vectors
+            self.dim = vectors.shape[1] if vectors.ndim == 2 else self.dim
+            self._ids = list(ids)
+            self._rows = {id_: row for row, id_ in enumerate(self._ids)}
+            self._size = len(self._ids)
+            self._ann_index = None
+
+    def add(self, ids: Sequence[str], embeddings: Iterable[Sequence[float]]):
+        """Add or replace embeddings."""
+        if not len(ids):
+            return
+        vectors = _normalize(_as_matrix(embeddings, len(ids)))
+
+        with self._lock:
+            if self.dim is None or self._size == 0:
+                self.dim = vectors.shape[1]
+                if self._matrix.shape[1] != self.dim:
+                    self._matrix = np.empty((0, self.dim), dtype=np.float32)
+            if vectors.shape[1] != self.dim:
+                raise ValueError(
+                    f"Expected {self.dim}-dimensional embeddings, got {vectors.shape[1]}.")
+
+            replaced = [id_ for id_ in ids if id_ in self._rows]
+            if replaced:
+                self.delete(replaced)
+
+            self._reserve(self._size + len(ids))
+            start = self._size
+            self._matrix[start:start + len(ids)] = vectors
+            for offset, id_ in enumerate(ids):
+                self._rows[id_] = start + offset
+            self._ids.extend(ids)
+            self._size += len(ids)
+
+            if self._ann_index is not None:
+                self._ann_index.resize_index(max(self._size, self._ann_index.get_max_elements()))
+                self._ann_index.add_items(vectors, np.arange(start, self._size))
+
+    def delete(self, ids: Iterable[str]):
+        """Remove embeddings by id and compact the matrix."""
+        with self._lock:
+            rows = [self._rows[id_] for id_ in ids if id_ in self._rows]
+            if not rows:
+                return
+
+            keep = np.ones(self._size, dtype=bool)
+            keep[rows] = False
+            kept = self._matrix[:self._size][keep]
+            if self._matrix.flags.writeable:
+                self._matrix[:len(kept)] = kept
+            else:
+                self._matrix = kept
+            self._ids = [id_ for id_, kept_row in zip(self._ids, keep) if kept_row]
+            self._rows = {id_: row for row, id_ in enumerate(self._ids)}
+            self._size = len(self._ids)
+            # Row numbers changed, so the HNSW labels are stale
+            self._ann_index = None
+
+    def search(
+        self,
+        query: Sequence[float],
+        top_k: int,
+        candidate_rows: Optional[np.ndarray] = None
+    ) -> Tuple[List[str], List[float]]:
+        """
+        Return the ids and cosine similarities of the ``top_k`` closest rows.
+        ``candidate_rows`` restricts the search to those rows (exact search).
+        """
+        ids, scores = self.search_batch([query], top_k, candidate_rows)
+        return ids[0], scores[0]
+
+    def search_batch(
+        self,
+        queries: Sequence[Sequence[float]],
+        top_k: int,
+        candidate_rows: Optional[np.ndarray] = None
+    ) -> Tuple[List[List[str]], List[List[float]]]:
+        """Top-k search for several queries at once, one matrix product for all."""
+        query_matrix = _normalize(_as_matrix(queries, len(queries)))
+
+        with self._lock:
+            if self._size == 0 or top_k <= 0:
+                return [[] for _ in queries], [[] for _ in queries]
+
+            if candidate_rows is None and self._use_ann():
+                return self._ann_search(query_matrix, top_k)
+
+            if candidate_rows is None:
+                # A slice is a view; fancy indexing would copy the whole matrix
+                rows = None
+                scores = query_matrix @ self._matrix[:self._size].T
+            else:
+                rows = np.asarray(candidate_rows)
+                scores = query_matrix @ self._matrix[rows].T
+            best = _top_k(scores, top_k)
+
+            ids = [
+                [self._ids[i if rows is None else rows[i]] for i in hits]
+                for hits in best
+            ]
+            similarities = np.take_along_axis(scores, best, axis=-1).tolist()
+            return ids, similarities
+
+    def _use_ann(self) -> bool:
+        return self.ann and self._size >= self.ann_min_size
+
+    def _ann_search(self, query_matrix: np.ndarray, top_k: int):
+        if self._ann_index is None:
+            self._build_ann_index()
+
+        top_k = min(top_k, self._size)
+        self._ann_index.set_ef(max(self.ann_ef_search, top_k))
+        labels, distances = self._ann_index.knn_query(query_matrix, k=top_k)
+        ids = [[self._ids[label] for label in row] for row in labels]
+        # hnswlib reports inner-product distance as 1 - similarity
+        return ids, (1.0 - distances).tolist()
+
+    def _build_ann_index(self):
+        index = hnswlib.Index(space="ip", dim=self.dim)
+        index.init_index(
+            max_elements=max(self._size, 1),
+            ef_construction=self.ann_ef_construction,
+            M=self.ann_m
+        )
+        index.add_items(self._matrix[:self._size], np.arange(self._size))
+        self._ann_index = index
+
+    def _reserve(self, capacity: int):
+        if capacity <= self._matrix.shape[0]:
+            return
+        grown = np.empty((max(capacity, self._matrix.shape[0] * 2, 64), self.dim), dtype=np.float32)
+        grown[:self._size] = self._matrix[:self._size]
+        self._matrix = grown
@@ -4,6 +4,7 @@ Convenience script to run the NadavBot backend.
 This script handles the setup and starts the FastAPI server.
 """
 
+import argparse
 import os
 import sys
 import subprocess
@@ -61,6 +62,16 @@ def build_knowledge_graph():
 
 def main():
     """Main function to start the backend."""
+    parser = argparse.ArgumentParser(description="Run the NadavBot backend")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("NADAVBOT_WORKERS", "1")),
+        help="Server processes; more than one disables code reloading and "
+             "shares one memory-mapped copy of the indices between them"
+    )
+    args = parser.parse_args()
+
     print("🚀 Starting NadavBot Backend")
     print("=" * 40)
 
@@ -85,12 +96,20 @@ def main():
 
     try:
         os.chdir("backend")
-        subprocess.run([
-            sys.executable, "-m", "uvicorn", "main:app",
-            "--host", "0.0.0.0",
-            "--port", "8000",
-            "--reload"
-        ])
+        if args.workers > 1:
+            # main.py also starts the single builder process the workers follow
+            print(f"👥 Serving with {args.workers} workers")
+            subprocess.run(
+                [sys.executable, "main.py"],
+                env={**os.environ, "NADAVBOT_WORKERS": str(args.workers)}
+            )
+        else:
+            subprocess.run([
+                sys.executable, "-m", "uvicorn", "main:app",
+                "--host", "0.0.0.0",
+                "--port", "8000",
+                "--reload"
+            ])
     except KeyboardInterrupt:
         print("\n👋 Server stopped")
     except Exception as e: